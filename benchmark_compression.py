@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la politique de compression des CBZ
+Compare l'ancien comportement (DEFLATE partout, re-zip niveau 9) avec la
+politique actuelle (ZIP_STORED pour les médias déjà compressés).
+
+Usage:
+    python benchmark_compression.py                      # Chapitre synthétique
+    python benchmark_compression.py --pages 60 --page-kb 400
+    python benchmark_compression.py --input-dir ./pages  # Vrai chapitre (images)
+"""
+
+import os
+import sys
+import time
+import zipfile
+import argparse
+import tempfile
+from utils.compression_policy import compress_type_for_bytes, compress_type_for_file
+
+
+def build_sample_chapter(directory, pages, page_kb):
+    """
+    Génère un chapitre synthétique : des JPEG dont le corps est aléatoire,
+    ce qui reproduit l'entropie des données JPEG réelles
+    """
+    paths = []
+    for page_number in range(1, pages + 1):
+        path = os.path.join(directory, f"page_{page_number:03d}.jpg")
+        with open(path, 'wb') as f:
+            f.write(b'\xff\xd8\xff\xe0' + os.urandom(page_kb * 1024 - 6) + b'\xff\xd9')
+        paths.append(path)
+    return paths
+
+
+def load_chapter(directory):
+    """Liste les images d'un vrai chapitre, triées par nom"""
+    extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'}
+    names = sorted(
+        name for name in os.listdir(directory)
+        if os.path.splitext(name)[1].lower() in extensions
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+def timed(function):
+    """Exécute function et retourne (temps CPU en secondes, résultat)"""
+    start = time.process_time()
+    result = function()
+    return time.process_time() - start, result
+
+
+def write_cbz(page_paths, output_path, use_policy):
+    """Crée un CBZ, en DEFLATE partout ou selon la politique de compression"""
+    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as cbz_file:
+        for path in page_paths:
+            with open(path, 'rb') as f:
+                data = f.read()
+            compress_type = compress_type_for_bytes(data) if use_policy else zipfile.ZIP_DEFLATED
+            cbz_file.writestr(os.path.basename(path), data, compress_type=compress_type)
+    return os.path.getsize(output_path)
+
+
+def rezip(cbz_path, output_path, use_policy):
+    """Re-zippe un CBZ comme ZipCompressor.compress_file (niveau 9)"""
+    compress_type = compress_type_for_file(cbz_path) if use_policy else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=9) as zip_file:
+        zip_file.write(cbz_path, os.path.basename(cbz_path), compress_type=compress_type)
+    return os.path.getsize(output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la politique de compression CBZ")
+    parser.add_argument('--pages', type=int, default=40, help="Nombre de pages synthétiques (défaut: 40)")
+    parser.add_argument('--page-kb', type=int, default=300, help="Taille d'une page synthétique en KB (défaut: 300)")
+    parser.add_argument('--input-dir', help="Répertoire contenant les images d'un vrai chapitre")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        if args.input_dir:
+            page_paths = load_chapter(args.input_dir)
+            if not page_paths:
+                print(f"❌ Aucune image trouvée dans {args.input_dir}")
+                return 1
+        else:
+            page_paths = build_sample_chapter(work_dir, args.pages, args.page_kb)
+
+        raw_size = sum(os.path.getsize(path) for path in page_paths)
+        print(f"📚 Chapitre: {len(page_paths)} pages, {raw_size / (1024 * 1024):.1f} MB")
+        print("=" * 72)
+        print(f"{'Étape':<34}{'CPU (s)':>10}{'Taille (MB)':>14}{'Gain CPU':>14}")
+        print("-" * 72)
+
+        results = {}
+        for label, use_policy in (('avant', False), ('après', True)):
+            cbz_path = os.path.join(work_dir, f"chapter_{label}.cbz")
+            zip_path = os.path.join(work_dir, f"chapter_{label}.zip")
+            results[label] = {
+                'cbz': timed(lambda: write_cbz(page_paths, cbz_path, use_policy)),
+                'zip': timed(lambda: rezip(cbz_path, zip_path, use_policy)),
+            }
+
+        for step, step_label in (('cbz', "Création CBZ"), ('zip', "Re-zip ZipCompressor")):
+            before_cpu, before_size = results['avant'][step]
+            after_cpu, after_size = results['après'][step]
+            speedup = f"x{before_cpu / after_cpu:.1f}" if after_cpu > 0 else "∞"
+            print(f"{step_label + ' (DEFLATE)':<34}{before_cpu:>10.3f}{before_size / (1024 * 1024):>14.2f}{'':>14}")
+            print(f"{step_label + ' (politique)':<34}{after_cpu:>10.3f}{after_size / (1024 * 1024):>14.2f}{speedup:>14}")
+
+        print("=" * 72)
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
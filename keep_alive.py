@@ -1,53 +1,149 @@
+#!/usr/bin/env python3
+"""
+Routes de santé du bot (/, /health, /status)
+Servies par le serveur asyncio du bot (utils.web_server), dans sa boucle d'événements :
+/health mesure la vraie vivacité (retard de la boucle, file de jobs, dernier succès)
+"""
 
-from flask import Flask
-from threading import Thread
+import os
 import time
+import asyncio
+from utils.beautiful_progress import BeautifulLogger
 
-app = Flask('')
-
-@app.route('/')
-def home():
-    return "🤖 Bot Telegram Anime-Sama est en ligne !"
-
-@app.route('/health')
-def health():
-    import json
-    return json.dumps({
-        "status": "healthy",
-        "service": "anime-sama-telegram-bot", 
-        "timestamp": time.time()
-    })
-
-@app.route('/status')
-def status():
-    import json
-    return json.dumps({
-        "bot": "running",
-        "platform": "replit",
-        "version": "1.0.0"
-    })
-
-def run():
-    try:
-        # Port pour Railway (utilise la variable d'environnement PORT)
-        import os
-        port = int(os.getenv('PORT', 5000))
-        print(f"🌐 Serveur Flask démarré sur le port {port}")
-        app.run(host='0.0.0.0', port=port, use_reloader=False, debug=False)
-    except OSError as e:
-        if "Address already in use" in str(e):
-            print("⚠️ Port déjà utilisé - tentative avec port alternatif")
-            try:
-                app.run(host='0.0.0.0', port=8080, use_reloader=False, debug=False)
-            except:
-                print("❌ Impossible de démarrer le serveur Flask")
+VERSION = "1.0.0"
+
+
+class LoopLagMonitor:
+    """
+    Mesure le retard de la boucle d'événements : un réveil programmé toutes les
+    interval secondes, le dépassement observé est le temps pendant lequel la boucle était bloquée
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag = max(0.0, loop.time() - scheduled)
+            self.max_lag = max(self.max_lag, self.lag)
+
+
+class HealthMonitor:
+    """
+    État de santé du bot : prêt (Application démarrée, webhook ou polling actif),
+    retard de la boucle, profondeur de la file et dernier job réussi
+    """
+
+    def __init__(self, download_queue=None, sender=None, max_loop_lag=5.0, lag_interval=1.0):
+        self.download_queue = download_queue
+        self.sender = sender
+        self.max_loop_lag = max_loop_lag
+        self.lag_monitor = LoopLagMonitor(lag_interval)
+
+        self.started_at = time.time()
+        self.ready_at = None
+        self.mode = None
+
+    def start(self):
+        """Démarre la mesure du retard de boucle (à appeler dans la boucle du bot)"""
+        self.lag_monitor.start()
+
+    async def stop(self):
+        await self.lag_monitor.stop()
+
+    def mark_ready(self, mode):
+        """Le bot reçoit les mises à jour ('webhook' ou 'polling')"""
+        self.mode = mode
+        self.ready_at = time.time()
+
+    @property
+    def ready(self):
+        return self.ready_at is not None
+
+    def health_payload(self):
+        """
+        Returns:
+            tuple: (statut HTTP, corps) ; 503 tant que le bot n'est pas prêt ou si la boucle est bloquée
+        """
+        lag = self.lag_monitor.lag
+        if not self.ready:
+            status = "starting"
+        elif lag > self.max_loop_lag:
+            status = "degraded"
         else:
-            raise e
-
-def keep_alive():
-    t = Thread(target=run)
-    t.daemon = True
-    t.start()
-    # Attendre que le serveur soit prêt
-    import time
-    time.sleep(1)
+            status = "healthy"
+
+        queue_stats = self.download_queue.get_stats() if self.download_queue else {}
+        last_success_at = queue_stats.get('last_success_at')
+        body = {
+            "status": status,
+            "service": "anime-sama-telegram-bot",
+            "timestamp": time.time(),
+            "loop_lag_ms": round(lag * 1000, 1),
+            "max_loop_lag_ms": round(self.lag_monitor.max_lag * 1000, 1),
+            "queue": {
+                "queued": queue_stats.get('queued', 0),
+                "running": queue_stats.get('running', 0),
+            },
+            "last_success_at": last_success_at,
+            "last_success_age": round(time.time() - last_success_at, 1) if last_success_at else None,
+        }
+        return (200 if status == "healthy" else 503), body
+
+    def status_payload(self):
+        body = {
+            "bot": "running" if self.ready else "starting",
+            "mode": self.mode,
+            "version": VERSION,
+            "uptime": round(time.time() - self.started_at, 1),
+            "startup_seconds": round(self.ready_at - self.started_at, 2) if self.ready else None,
+        }
+        if self.download_queue:
+            body["queue"] = self.download_queue.get_stats()
+        if self.sender:
+            body["telegram"] = self.sender.get_stats()
+        return body
+
+
+def add_health_routes(server, health):
+    """Enregistre /, /health et /status sur un WebServer (utils.web_server)"""
+    async def home_route(request):
+        return 200, "🤖 Bot Telegram Anime-Sama est en ligne !"
+
+    async def health_route(request):
+        return health.health_payload()
+
+    async def status_route(request):
+        return 200, health.status_payload()
+
+    server.route('GET', '/', home_route)
+    server.route('GET', '/health', health_route)
+    server.route('GET', '/status', status_route)
+
+
+def create_health_monitor(download_queue=None, sender=None):
+    """
+    HealthMonitor configuré depuis l'environnement
+    HEALTH_MAX_LOOP_LAG : retard de boucle (secondes) au-delà duquel /health répond 503
+    """
+    max_loop_lag = float(os.getenv('HEALTH_MAX_LOOP_LAG', 5))
+    if max_loop_lag <= 0:
+        BeautifulLogger.warning("HEALTH_MAX_LOOP_LAG invalide, valeur par défaut utilisée")
+        max_loop_lag = 5.0
+    return HealthMonitor(download_queue, sender, max_loop_lag=max_loop_lag)
@@ -36,6 +36,10 @@ Examples:
                        help='Temporary directory for images (default: ./temp)')
     parser.add_argument('--keep-temp', action='store_true',
                        help='Keep temporary files after conversion')
+    parser.add_argument('--workers', '-w', type=int, default=4,
+                       help='Number of pages downloaded in parallel (default: 4)')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                       help='HTTP engine for pages: threads (requests) or async (httpx) (default: threads)')
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Enable verbose output')
     
@@ -49,7 +53,9 @@ Examples:
         scraper = AnimeSamaScraper(
             output_dir=args.output,
             temp_dir=args.temp,
-            verbose=args.verbose
+            verbose=args.verbose,
+            max_workers=args.workers,
+            http_engine=args.engine
         )
         
         print(f"🔍 Starting download of '{args.manga_name}' chapter {args.chapter}")
@@ -5,16 +5,21 @@ Main scraper class for anime-sama.fr
 import os
 import re
 import json
-import time
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
-import tempfile
 import shutil
+import zipfile
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from .url_builder import URLBuilder
 from .image_downloader import ImageDownloader
-from .cbz_converter import CBZConverter
+from .async_image_downloader import AsyncImageDownloader
+from .async_engine import AsyncEngine
+from .cbz_converter import CBZConverter, StreamingCBZWriter
+from .episodes_parser import EpisodesParser
 from utils.headers import get_random_headers
 from utils.beautiful_progress import BeautifulProgress, BeautifulLogger, MultiChapterProgress
 # Cookie system removed - using only residential proxies and advanced headers
@@ -22,9 +27,24 @@ from utils.proxy_manager import ResidentialProxyManager, RailwayOptimizer
 from utils.advanced_bypass import AdvancedAntiDetectionBypass
 from utils.railway_bypass import RailwayOptimizedBypass
 from utils.hybrid_breakthrough import HybridBreakthroughSystem
+from utils.episodes_cache import EpisodesCache, get_shared_episodes_cache
+from utils.rate_limiter import HostRateLimiter
+from utils.page_cache import get_shared_page_cache
+from utils.drive_route_cache import get_shared_drive_route_cache
+from utils.chapter_manifest import ChapterManifestStore
+from utils.retry_policy import get_shared_retry_policy, retry_after_from
+from utils.circuit_breaker import CircuitOpenError, MISSING_STATUS_CODES
+from utils.single_flight import SingleFlight
+from utils.http_pool import create_pooled_session
+from utils.http_transport import HttpxTransport
+
+# Attente minimale après un blocage 403 et le renouvellement de la session
+BLOCKED_RETRY_DELAY = 2.0
+# Plafond des délais entre tentatives de episodes.js (la commande attend cette réponse)
+EPISODES_MAX_DELAY = 8.0
 
 class AnimeSamaScraper:
-    def __init__(self, output_dir="./downloads", temp_dir="./temp", verbose=False, use_residential_proxy=True, use_advanced_bypass=True, use_railway_bypass=True, use_hybrid_system=True):
+    def __init__(self, output_dir="./downloads", temp_dir="./temp", verbose=False, use_residential_proxy=True, use_advanced_bypass=True, use_railway_bypass=True, use_hybrid_system=True, use_episodes_cache=True, use_page_cache=True, max_workers=4, min_request_interval=0.2, max_parallel_chapters=2, http_engine="threads", max_async_in_flight=64, resume_dir=None, async_engine=None):
         self.output_dir = output_dir
         self.temp_dir = temp_dir
         self.verbose = verbose
@@ -38,6 +58,32 @@ class AnimeSamaScraper:
         self.railway_bypass = None
         self.hybrid_system = None
         
+        # Téléchargement concurrent des pages, espacé par hôte
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = HostRateLimiter(min_request_interval)
+        
+        # Chapitres traités en pipeline ; le nombre de requêtes de pages en vol
+        # reste borné par max_workers, tous chapitres confondus
+        self.max_parallel_chapters = max(1, max_parallel_chapters)
+        self._page_slots = threading.BoundedSemaphore(self.max_workers)
+        self._session_lock = threading.Lock()
+        # Incrémenté à chaque renouvellement : un 403 ne renouvelle que la session qui l'a reçu
+        self.session_generation = 0
+        
+        # Moteur HTTP des pages : 'threads' (requests, un thread par requête)
+        # ou 'async' (httpx, les requêtes de tous les chapitres sur une seule boucle)
+        if http_engine not in ("threads", "async"):
+            raise ValueError(f"Moteur HTTP inconnu: {http_engine}")
+        if http_engine == "async" and not HttpxTransport.is_available():
+            BeautifulLogger.warning("httpx non installé, moteur HTTP 'threads' utilisé")
+            http_engine = "threads"
+        self.http_engine = http_engine
+        self.max_async_in_flight = max(1, max_async_in_flight)
+        # Boucle et client httpx partagés : fournis par ScraperService, sinon propres au scraper
+        self.async_engine = None
+        if http_engine == "async":
+            self.async_engine = async_engine or AsyncEngine(self.max_async_in_flight)
+        
         # Détection automatique Railway
         self.is_railway = os.environ.get('RAILWAY_ENVIRONMENT') is not None
         
@@ -50,8 +96,33 @@ class AnimeSamaScraper:
         
         # Initialize other components
         self.url_builder = URLBuilder()
-        self.image_downloader = ImageDownloader(self.session, verbose, scraper_instance=self)
+        self.page_cache = get_shared_page_cache() if use_page_cache else None
+        # Stratégies Google Drive gagnantes, partagées entre pages, chapitres et jobs
+        self.drive_route_cache = get_shared_drive_route_cache()
+        # Délais de reprise communs ; chaque job dispose d'un budget d'attente
+        self.retry_policy = get_shared_retry_policy()
+        # Demandes identiques simultanées (plusieurs jobs, même chapitre) fusionnées :
+        # un seul episodes.js, un seul téléchargement par page et un seul CBZ construit
+        self.episodes_flight = SingleFlight()
+        self.page_flight = SingleFlight()
+        self.chapter_flight = SingleFlight()
+        self.image_downloader = ImageDownloader(
+            self.session, verbose, scraper_instance=self,
+            page_cache=self.page_cache, rate_limiter=self.rate_limiter,
+            route_cache=self.drive_route_cache, retry_policy=self.retry_policy,
+            page_flight=self.page_flight
+        )
         self.cbz_converter = CBZConverter(verbose)
+        
+        # Pages déjà téléchargées des chapitres incomplets : le manifeste pointe vers le cache de pages
+        self.manifest_store = ChapterManifestStore(
+            resume_dir or os.path.join(self.temp_dir, "resume"), page_cache=self.page_cache,
+            page_key=self.image_downloader.gdrive_downloader.page_key, verbose=verbose
+        )
+        self.episodes_parser = EpisodesParser(verbose)
+        
+        # Cache episodes.js partagé entre toutes les instances du processus
+        self.episodes_cache = get_shared_episodes_cache() if use_episodes_cache else None
     
     def _setup_enhanced_session(self):
         """
@@ -62,8 +133,10 @@ class AnimeSamaScraper:
         """
         # Système hybride révolutionnaire (priorité max)
         if self.use_hybrid_system:
-            self.hybrid_system = HybridBreakthroughSystem(verbose=self.verbose)
-            session = requests.Session()  # Session de base, le hybride gère tout
+            # Conservé lors d'un renouvellement : ses sessions et leurs connexions restent chaudes
+            if self.hybrid_system is None:
+                self.hybrid_system = HybridBreakthroughSystem(verbose=self.verbose)
+            session = create_pooled_session()  # Session de base, le hybride gère tout
             if self.verbose:
                 BeautifulLogger.info("Système hybride révolutionnaire activé", "🔥")
                 
@@ -82,7 +155,7 @@ class AnimeSamaScraper:
             if self.verbose:
                 BeautifulLogger.info("Système de contournement avancé activé", "🥷")
         else:
-            session = requests.Session()
+            session = create_pooled_session()
         
         # Initialize Railway optimizer
         self.railway_optimizer = RailwayOptimizer(verbose=self.verbose)
@@ -145,34 +218,41 @@ class AnimeSamaScraper:
         
         return session
     
-    def refresh_session_on_block(self):
+    def refresh_session_on_block(self, seen_generation=None):
         """
         Refresh the session when blocked (403 errors).
         This creates a new session with fresh residential identity and headers.
         
+        Args:
+            seen_generation (int): session_generation captured before the blocked
+                request; if another worker has refreshed the session since, it is kept
+        
         Returns:
-            bool: True if session was refreshed successfully
+            bool: True if session was refreshed successfully (or already refreshed)
         """
         try:
-            if self.verbose:
-                BeautifulLogger.warning("Renouvellement de la session suite à un blocage...")
-            
-            # Create a new enhanced session
-            old_session = self.session
-            self.session = self._setup_enhanced_session()
-            
-            # Update the image downloader with the new session
-            self.image_downloader.session = self.session
-            
-            # Close the old session
-            old_session.close()
+            # Les workers de pages peuvent recevoir un 403 en même temps : un seul renouvellement
+            with self._session_lock:
+                if seen_generation is not None and seen_generation != self.session_generation:
+                    return True
+                
+                if self.verbose:
+                    BeautifulLogger.warning("Renouvellement de la session suite à un blocage...")
+                
+                # Create a new enhanced session
+                self.session = self._setup_enhanced_session()
+                self.session_generation += 1
+                
+                # Update the image downloader with the new session
+                self.image_downloader.session = self.session
+                self.image_downloader.gdrive_downloader.session = self.session
+                # L'ancienne session n'est pas fermée : d'autres workers peuvent encore
+                # l'utiliser, ses connexions sont libérées avec elle
             
             if self.verbose:
                 BeautifulLogger.success("Session renouvelée avec succès")
             
-            # Wait a moment before continuing
-            time.sleep(2.0)
-            
+            # L'attente avant la tentative suivante relève de la politique de reprise de l'appelant
             return True
             
         except Exception as e:
@@ -180,17 +260,84 @@ class AnimeSamaScraper:
                 BeautifulLogger.error(f"Erreur lors du renouvellement de la session: {str(e)}")
             return False
         
-    def download_chapter(self, manga_name, chapter_number):
+    def download_chapter(self, manga_name, chapter_number, episodes_index=None, progress_callback=None, output_dir=None, retry_budget=None):
         """
         Download a manga chapter and convert it to CBZ format.
+        Concurrent requests for the same chapter share one build: the other
+        callers get a link (or copy) of the CBZ in their own output directory.
         
         Args:
             manga_name (str): Name of the manga
             chapter_number (int): Chapter number to download
+            episodes_index (dict): Pre-built episodes.js index (fetched if None)
+            progress_callback (callable): Receives progress event dicts (see _emit_progress),
+                called from the download threads
+            output_dir (str): Directory receiving the CBZ (defaults to self.output_dir)
+            retry_budget (RetryBudget): Sleep budget of the job (a new one if None)
             
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if every page was downloaded and the CBZ written, False otherwise
+                (the pages of an incomplete chapter are kept for the next attempt)
+            
+        Raises:
+            CircuitOpenError: If anime-sama.fr is known to be unavailable
         """
+        cbz_path = self.get_cbz_path(manga_name, chapter_number, output_dir)
+        
+        def build():
+            success = self._build_chapter(
+                manga_name, chapter_number, episodes_index, progress_callback, output_dir, retry_budget
+            )
+            return success, cbz_path
+        
+        chapter_key = (self.url_builder.sanitize_name(manga_name), chapter_number)
+        success, built_path = self.chapter_flight.do(chapter_key, build)
+        if not success or built_path == cbz_path:
+            return success
+        
+        if self._share_built_chapter(built_path, cbz_path, chapter_number, progress_callback):
+            return True
+        # Le CBZ partagé a déjà été supprimé par son job : construction propre à ce job
+        return self._build_chapter(
+            manga_name, chapter_number, episodes_index, progress_callback, output_dir, retry_budget
+        )
+    
+    def _share_built_chapter(self, built_path, cbz_path, chapter_number, progress_callback):
+        """
+        Give a caller the CBZ built by a concurrent request for the same chapter.
+        
+        Returns:
+            bool: True if the CBZ is now available at cbz_path
+        """
+        try:
+            if os.path.exists(cbz_path):
+                os.remove(cbz_path)
+            try:
+                os.link(built_path, cbz_path)
+            except OSError:
+                # Systèmes de fichiers différents ou sans liens physiques
+                shutil.copyfile(built_path, cbz_path)
+            with zipfile.ZipFile(cbz_path) as cbz:
+                pages = len(cbz.namelist())
+        except (OSError, zipfile.BadZipFile) as e:
+            if self.verbose:
+                BeautifulLogger.warning(f"CBZ partagé indisponible pour le chapitre {chapter_number}: {e}")
+            return False
+        
+        BeautifulLogger.success(f"Chapitre {chapter_number} partagé avec un téléchargement en cours")
+        # Le CBZ partagé est complet : ce job reçoit aussi le nombre de pages annoncé
+        self._emit_progress(progress_callback, 'pages_found', chapter_number, total=pages)
+        self._emit_progress(
+            progress_callback, 'cbz_finished', chapter_number,
+            success=True, pages=pages, bytes=os.path.getsize(cbz_path)
+        )
+        return True
+    
+    def _build_chapter(self, manga_name, chapter_number, episodes_index, progress_callback, output_dir, retry_budget):
+        """Download the pages of a chapter and write its CBZ (see download_chapter)"""
+        if retry_budget is None:
+            retry_budget = self.retry_policy.new_budget()
+        
         try:
             # Initialiser les logs du chapitre
             BeautifulLogger.chapter_start(manga_name, chapter_number)
@@ -202,23 +349,20 @@ class AnimeSamaScraper:
             
             # Get image URLs from the chapter page
             BeautifulLogger.info("Analyse de la page du chapitre...")
-            image_urls = self._extract_image_urls(chapter_url, chapter_number)
+            if episodes_index is not None:
+                image_urls = self.episodes_parser.get_chapter_urls(episodes_index, chapter_number)
+            else:
+                image_urls = self._extract_image_urls(chapter_url, chapter_number, retry_budget=retry_budget)
             if not image_urls:
+                self._emit_progress(progress_callback, 'cbz_finished', chapter_number, success=False, pages=0, bytes=0)
                 BeautifulLogger.error("Aucune image trouvée pour ce chapitre")
                 return False
             
             BeautifulLogger.chapter_found(len(image_urls))
-            
-            # Create temporary directory for this chapter
-            chapter_temp_dir = os.path.join(
-                self.temp_dir, 
-                f"{self.url_builder.sanitize_name(manga_name)}_ch{chapter_number}"
-            )
-            os.makedirs(chapter_temp_dir, exist_ok=True)
+            self._emit_progress(progress_callback, 'pages_found', chapter_number, total=len(image_urls))
             
             # Download all images with beautiful progress
             BeautifulLogger.downloading_start(len(image_urls))
-            downloaded_files = []
             
             # Créer la barre de progression
             progress = BeautifulProgress(
@@ -227,52 +371,237 @@ class AnimeSamaScraper:
                 show_speed=True
             )
             
-            for i, img_url in enumerate(image_urls, 1):
-                filename = f"page_{i:03d}.jpg"
-                filepath = os.path.join(chapter_temp_dir, filename)
-                
-                # Mettre à jour la progression avec le nom de la page
-                page_name = f"Page {i}"
-                
-                if self.image_downloader.download_image(img_url, filepath):
-                    downloaded_files.append(filepath)
-                    progress.update(item_name=f"{page_name} ✓")
-                else:
-                    progress.update(item_name=f"{page_name} ✗")
-                    if self.verbose:
-                        BeautifulLogger.warning(f"Échec téléchargement page {i}")
-                    
-                # Add delay to avoid being detected
-                time.sleep(0.5)
+            # Pages conservées par une tentative précédente : seules les manquantes sont téléchargées
+            manifest = self.manifest_store.open(manga_name, chapter_number, image_urls)
+            if manifest.completed_pages:
+                BeautifulLogger.info(f"Reprise: {manifest.completed_pages}/{len(image_urls)} pages déjà téléchargées", "♻️")
             
-            progress.finish(f"Téléchargement terminé ({len(downloaded_files)}/{len(image_urls)} pages)")
+            # Les pages sont écrites directement dans le CBZ, sans répertoire temporaire
+            cbz_path = self.get_cbz_path(manga_name, chapter_number, output_dir)
+            cbz_writer = StreamingCBZWriter(cbz_path, self.verbose)
             
-            if not downloaded_files:
+            try:
+                downloaded_count = self._download_pages(
+                    image_urls, cbz_writer, progress, chapter_number, progress_callback, manifest, retry_budget
+                )
+            except BaseException:
+                cbz_writer.abort()
+                raise
+            
+            progress.finish(f"Téléchargement terminé ({downloaded_count}/{len(image_urls)} pages)")
+            
+            if not downloaded_count:
+                cbz_writer.abort()
+                self._emit_progress(progress_callback, 'cbz_finished', chapter_number, success=False, pages=0, bytes=0)
                 BeautifulLogger.error("Aucune image téléchargée avec succès")
                 return False
             
-            # Convert to CBZ
-            cbz_filename = f"{self.url_builder.sanitize_name(manga_name)}_ch{chapter_number}.cbz"
-            cbz_path = os.path.join(self.output_dir, cbz_filename)
+            if downloaded_count < len(image_urls):
+                # Chapitre incomplet : pas de CBZ livré, les pages obtenues restent dans le
+                # manifeste et la prochaine tentative ne télécharge que les manquantes
+                cbz_writer.abort()
+                self._emit_progress(
+                    progress_callback, 'cbz_finished', chapter_number, success=False, pages=downloaded_count, bytes=0
+                )
+                BeautifulLogger.error(
+                    f"Chapitre incomplet: {len(image_urls) - downloaded_count} page(s) manquante(s), "
+                    f"conservées pour la prochaine tentative"
+                )
+                return False
             
+            manifest.discard()
+            
+            # Finalize the CBZ
             BeautifulLogger.conversion_start()
-            if self.cbz_converter.create_cbz(chapter_temp_dir, cbz_path):
+            self._emit_progress(progress_callback, 'cbz_started', chapter_number, pages=downloaded_count)
+            if cbz_writer.close():
                 # Calculer la taille du fichier
-                file_size_mb = os.path.getsize(cbz_path) / (1024 * 1024)
-                BeautifulLogger.chapter_complete(cbz_path, file_size_mb)
+                file_size = os.path.getsize(cbz_path)
+                self._emit_progress(
+                    progress_callback, 'cbz_finished', chapter_number,
+                    success=True, pages=downloaded_count, bytes=file_size
+                )
+                BeautifulLogger.chapter_complete(cbz_path, file_size / (1024 * 1024))
                 return True
             else:
+                self._emit_progress(progress_callback, 'cbz_finished', chapter_number, success=False, pages=0, bytes=0)
                 BeautifulLogger.error("Échec de la création du CBZ")
                 return False
+        
+        except CircuitOpenError as e:
+            # Source en panne : l'appelant répond immédiatement, sans nouvelle tentative
+            self._emit_progress(progress_callback, 'cbz_finished', chapter_number, success=False, pages=0, bytes=0)
+            BeautifulLogger.error(str(e))
+            raise
                 
         except Exception as e:
+            self._emit_progress(progress_callback, 'cbz_finished', chapter_number, success=False, pages=0, bytes=0)
             BeautifulLogger.error(f"Erreur lors du téléchargement: {str(e)}")
             if self.verbose:
                 import traceback
                 traceback.print_exc()
             return False
     
-    def download_multiple_chapters(self, manga_name, start_chapter, end_chapter):
+    def _download_pages(self, image_urls, cbz_writer, progress, chapter_number=None, progress_callback=None, manifest=None, retry_budget=None):
+        """
+        Download the pages of a chapter with a bounded pool of workers,
+        streaming each page into the CBZ writer as soon as it is available.
+        
+        Args:
+            image_urls (list): Image URLs in page order
+            cbz_writer (StreamingCBZWriter): Writer receiving the pages
+            progress (BeautifulProgress): Progress bar updated after each page
+            chapter_number (int): Chapter number reported in progress events
+            progress_callback (callable): Receives a 'page_done' event per page
+            manifest (ChapterManifest): Pages kept from previous attempts, updated
+                with every page downloaded
+            retry_budget (RetryBudget): Sleep budget shared by the retries of every page
+            
+        Returns:
+            int: Number of pages downloaded successfully
+        """
+        if self.http_engine == "async":
+            # Chapitres en pipeline : tous confiés à la même boucle, sous le même plafond
+            return self.async_engine.run(
+                self._download_pages_async,
+                image_urls, cbz_writer, progress, chapter_number, progress_callback, manifest, retry_budget
+            )
+        
+        def download_page(page_number, img_url):
+            data = manifest.read_page(page_number) if manifest else None
+            if data is None:
+                with self._page_slots:
+                    data = self.image_downloader.fetch_image(
+                        img_url, name=f"page_{page_number:03d}.jpg", retry_budget=retry_budget
+                    )
+                if data and manifest:
+                    manifest.record_page(page_number, data)
+            return self._store_page(page_number, data, cbz_writer, progress, chapter_number, progress_callback)
+        
+        page_numbers = range(1, len(image_urls) + 1)
+        workers = min(self.max_workers, len(image_urls))
+        
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(download_page, page_numbers, image_urls))
+        else:
+            results = [download_page(i, url) for i, url in zip(page_numbers, image_urls)]
+        
+        return sum(results)
+    
+    async def _download_pages_async(self, image_urls, cbz_writer, progress, chapter_number=None, progress_callback=None, manifest=None, retry_budget=None):
+        """
+        Download the pages of a chapter on the async engine loop (see _download_pages).
+        Page requests share the engine's transport and its global in-flight cap
+        with every other chapter on the loop.
+        
+        Returns:
+            int: Number of pages downloaded successfully
+        """
+        engine = self.async_engine
+        downloader = AsyncImageDownloader(
+            engine.transport, headers=self.session.headers, verbose=self.verbose,
+            page_cache=self.page_cache, rate_limiter=self.rate_limiter,
+            route_cache=self.drive_route_cache, retry_policy=self.retry_policy,
+            page_flight=self.page_flight
+        )
+        
+        async def download_page(page_number, img_url):
+            # Accès disque hors de la boucle : ils ne retardent pas les autres chapitres
+            data = await asyncio.to_thread(manifest.read_page, page_number) if manifest else None
+            if data is None:
+                async with engine.slots:
+                    data = await downloader.fetch_image(
+                        img_url, name=f"page_{page_number:03d}.jpg", retry_budget=retry_budget
+                    )
+                if data and manifest:
+                    await asyncio.to_thread(manifest.record_page, page_number, data)
+            return await asyncio.to_thread(
+                self._store_page, page_number, data, cbz_writer, progress, chapter_number, progress_callback
+            )
+        
+        results = await asyncio.gather(*(
+            download_page(page_number, img_url)
+            for page_number, img_url in enumerate(image_urls, 1)
+        ))
+        return sum(results)
+    
+    def _store_page(self, page_number, data, cbz_writer, progress, chapter_number, progress_callback):
+        """
+        Hand a downloaded page to the CBZ writer and report it (or its failure).
+        
+        Returns:
+            bool: True if the page was downloaded
+        """
+        page_name = f"Page {page_number}"
+        
+        if data:
+            cbz_writer.add_page(page_number, data)
+            progress.update(item_name=f"{page_name} ✓")
+            self._emit_progress(
+                progress_callback, 'page_done', chapter_number,
+                page=page_number, success=True, bytes=len(data)
+            )
+            return True
+        
+        progress.update(item_name=f"{page_name} ✗")
+        self._emit_progress(
+            progress_callback, 'page_done', chapter_number,
+            page=page_number, success=False, bytes=0
+        )
+        if self.verbose:
+            BeautifulLogger.warning(f"Échec téléchargement page {page_number}")
+        return False
+    
+    def _notify_chapter_done(self, chapter_callback, chapter_number, cbz_path):
+        """Hand a finished chapter to the caller without letting its errors stop the batch"""
+        try:
+            chapter_callback(chapter_number, cbz_path)
+        except Exception as e:
+            if self.verbose:
+                BeautifulLogger.warning(f"Callback de chapitre en erreur: {e}")
+    
+    def _emit_progress(self, progress_callback, event_type, chapter_number, **fields):
+        """
+        Send a structured progress event to the caller.
+        
+        Events: 'pages_found' (total), 'page_done' (page, success, bytes),
+        'cbz_started' (pages) and 'cbz_finished' (success, pages, bytes).
+        Every event also carries 'type' and 'chapter'.
+        
+        Args:
+            progress_callback (callable): Event consumer, or None
+            event_type (str): Type of the event
+            chapter_number (int): Chapter the event belongs to
+        """
+        if progress_callback is None:
+            return
+        
+        event = {'type': event_type, 'chapter': chapter_number}
+        event.update(fields)
+        try:
+            progress_callback(event)
+        except Exception as e:
+            # Un affichage défaillant ne doit jamais interrompre le téléchargement
+            if self.verbose:
+                BeautifulLogger.warning(f"Callback de progression en erreur: {e}")
+    
+    def get_cbz_path(self, manga_name, chapter_number, output_dir=None):
+        """
+        Path of the CBZ file produced for a chapter.
+        
+        Args:
+            manga_name (str): Name of the manga
+            chapter_number (int): Chapter number
+            output_dir (str): Output directory (defaults to self.output_dir)
+            
+        Returns:
+            str: Path of the CBZ file in the output directory
+        """
+        cbz_filename = f"{self.url_builder.sanitize_name(manga_name)}_ch{chapter_number}.cbz"
+        return os.path.join(output_dir or self.output_dir, cbz_filename)
+    
+    def download_multiple_chapters(self, manga_name, start_chapter, end_chapter, progress_callback=None, output_dir=None, chapter_callback=None):
         """
         Download multiple chapters with beautiful progress tracking
         
@@ -280,49 +609,125 @@ class AnimeSamaScraper:
             manga_name (str): Name of the manga
             start_chapter (int): First chapter to download
             end_chapter (int): Last chapter to download
+            progress_callback (callable): Receives the progress events of every chapter
+            output_dir (str): Directory receiving the CBZ files (defaults to self.output_dir)
+            chapter_callback (callable): Called as each chapter ends (see download_chapter_list)
+            
+        Returns:
+            tuple: (successful_chapters, failed_chapters)
+        """
+        return self.download_chapter_list(
+            manga_name, list(range(start_chapter, end_chapter + 1)), progress_callback, output_dir, chapter_callback
+        )
+    
+    def download_chapter_list(self, manga_name, chapter_numbers, progress_callback=None, output_dir=None, chapter_callback=None):
+        """
+        Download an arbitrary list of chapters with beautiful progress tracking
+        
+        Args:
+            manga_name (str): Name of the manga
+            chapter_numbers (list): Chapter numbers to download, in order
+            progress_callback (callable): Receives the progress events of every chapter
+            output_dir (str): Directory receiving the CBZ files (defaults to self.output_dir)
+            chapter_callback (callable): Called from the download threads as
+                chapter_callback(chapter_number, cbz_path) as soon as a chapter ends,
+                cbz_path being None if it failed; lets the caller deliver each CBZ
+                while the following chapters keep downloading
             
         Returns:
             tuple: (successful_chapters, failed_chapters)
+            
+        Raises:
+            CircuitOpenError: If anime-sama.fr is unavailable before any chapter starts
         """
-        total_chapters = end_chapter - start_chapter + 1
+        if not chapter_numbers:
+            return [], []
+        
+        total_chapters = len(chapter_numbers)
         multi_progress = MultiChapterProgress(total_chapters, manga_name)
         
         print(f"\n🚀 TÉLÉCHARGEMENT MULTIPLE - {manga_name}")
-        print(f"📚 Chapitres {start_chapter} à {end_chapter} ({total_chapters} chapitres)")
+        if chapter_numbers:
+            print(f"📚 Chapitres {chapter_numbers[0]} à {chapter_numbers[-1]} ({total_chapters} chapitres)")
         print("=" * 60)
         
-        successful_chapters = []
-        failed_chapters = []
+        # Un seul budget d'attente pour tout le job : une source en panne ne retient
+        # pas le job pendant max_retries × délai sur chaque page de chaque chapitre
+        retry_budget = self.retry_policy.new_budget()
+        # episodes.js contient tous les chapitres : une seule récupération pour toute la plage
+        episodes_index = self.get_episodes_index(manga_name, retry_budget=retry_budget)
         
-        for chapter_num in range(start_chapter, end_chapter + 1):
+        def build_chapter(chapter_num):
             try:
                 multi_progress.start_chapter(chapter_num)
                 
-                if self.download_chapter(manga_name, chapter_num):
+                if self.download_chapter(manga_name, chapter_num, episodes_index=episodes_index,
+                                         progress_callback=progress_callback, output_dir=output_dir,
+                                         retry_budget=retry_budget):
                     # Calculer la taille du fichier CBZ créé
-                    cbz_filename = f"{self.url_builder.sanitize_name(manga_name)}_ch{chapter_num}.cbz"
-                    cbz_path = os.path.join(self.output_dir, cbz_filename)
+                    cbz_path = self.get_cbz_path(manga_name, chapter_num, output_dir)
                     
                     if os.path.exists(cbz_path):
                         file_size_mb = os.path.getsize(cbz_path) / (1024 * 1024)
                         multi_progress.chapter_success(chapter_num, cbz_path, file_size_mb)
-                        successful_chapters.append(chapter_num)
-                    else:
-                        multi_progress.chapter_failed(chapter_num, "Fichier CBZ non trouvé")
-                        failed_chapters.append(chapter_num)
+                        return True
+                    multi_progress.chapter_failed(chapter_num, "Fichier CBZ non trouvé")
                 else:
                     multi_progress.chapter_failed(chapter_num, "Téléchargement échoué")
-                    failed_chapters.append(chapter_num)
+            
+            except CircuitOpenError:
+                # Les chapitres déjà terminés sont conservés, les suivants échouent sans attendre
+                multi_progress.chapter_failed(chapter_num, "Source indisponible")
                     
             except Exception as e:
                 error_msg = f"Erreur inattendue: {str(e)}"
                 multi_progress.chapter_failed(chapter_num, error_msg)
-                failed_chapters.append(chapter_num)
+            return False
+        
+        def run_chapter(chapter_num):
+            success = build_chapter(chapter_num)
+            if chapter_callback is not None:
+                cbz_path = self.get_cbz_path(manga_name, chapter_num, output_dir) if success else None
+                self._notify_chapter_done(chapter_callback, chapter_num, cbz_path)
+            return success
+        
+        chapter_workers = min(self.max_parallel_chapters, total_chapters)
+        if chapter_workers > 1:
+            # Pipeline : les pages du chapitre suivant se téléchargent pendant que le
+            # précédent finalise son CBZ ; _page_slots (ou le plafond du moteur async) borne les requêtes en vol
+            with ThreadPoolExecutor(max_workers=chapter_workers) as executor:
+                results = list(executor.map(run_chapter, chapter_numbers))
+        else:
+            results = [run_chapter(chapter_num) for chapter_num in chapter_numbers]
+        
+        successful_chapters = [n for n, ok in zip(chapter_numbers, results) if ok]
+        failed_chapters = [n for n, ok in zip(chapter_numbers, results) if not ok]
         
         multi_progress.finish()
         return successful_chapters, failed_chapters
     
-    def _extract_image_urls(self, chapter_url, chapter_number, max_retries=2):
+    def get_episodes_index(self, manga_name, max_retries=2, retry_budget=None):
+        """
+        Fetch episodes.js once for a manga and index every chapter it contains.
+        
+        Args:
+            manga_name (str): Name of the manga
+            max_retries (int): Maximum number of retries for 403 errors
+            retry_budget (RetryBudget): Sleep budget of the job (a new one if None)
+            
+        Returns:
+            dict: Mapping of chapter number to image URLs, or None if the fetch failed
+            
+        Raises:
+            CircuitOpenError: If anime-sama.fr is known to be unavailable
+        """
+        chapter_url = self.url_builder.build_chapter_url(manga_name, None)
+        episodes_content = self._fetch_episodes_js(chapter_url, max_retries, retry_budget)
+        if episodes_content is None:
+            return None
+        return self.episodes_parser.build_index(episodes_content)
+    
+    def _extract_image_urls(self, chapter_url, chapter_number, max_retries=2, retry_budget=None):
         """
         Extract image URLs from a chapter page with enhanced error handling.
         This method handles anime-sama.fr specific structure using episodes.js.
@@ -331,10 +736,51 @@ class AnimeSamaScraper:
             chapter_url (str): URL of the chapter page
             chapter_number (int): Chapter number to extract
             max_retries (int): Maximum number of retries for 403 errors
+            retry_budget (RetryBudget): Sleep budget of the job (a new one if None)
             
         Returns:
             list: List of image URLs
         """
+        episodes_content = self._fetch_episodes_js(chapter_url, max_retries, retry_budget)
+        if episodes_content is None:
+            return []
+        return self._parse_episodes_js(episodes_content, chapter_number)
+    
+    def _fetch_episodes_js(self, chapter_url, max_retries=2, retry_budget=None):
+        """
+        Download the episodes.js file of a manga with enhanced error handling.
+        Concurrent fetches of the same episodes.js wait for a single request.
+        
+        Args:
+            chapter_url (str): URL of the chapter page
+            max_retries (int): Maximum number of retries for 403 errors
+            retry_budget (RetryBudget): Sleep budget of the job, bounding every wait of
+                the fetch including the hybrid system's cycles (a new one if None)
+            
+        Returns:
+            str: Content of episodes.js, or None if it could not be retrieved
+        """
+        episodes_url = urljoin(chapter_url, 'episodes.js')
+        return self.episodes_flight.do(episodes_url, self._load_episodes_js, chapter_url, max_retries, retry_budget)
+    
+    def _load_episodes_js(self, chapter_url, max_retries, retry_budget=None):
+        """Serve episodes.js from the cache or download it (see _fetch_episodes_js)"""
+        if self.episodes_cache:
+            cached_entry, is_fresh = self.episodes_cache.lookup(chapter_url)
+            if is_fresh:
+                if self.verbose:
+                    BeautifulLogger.info("episodes.js servi depuis le cache", "⚡")
+                return cached_entry['content']
+            
+            if cached_entry:
+                episodes_content = self._revalidate_episodes_js(chapter_url, cached_entry)
+                if episodes_content is not None:
+                    return episodes_content
+        
+        if retry_budget is None:
+            retry_budget = self.retry_policy.new_budget()
+        retry = self.retry_policy.start(2.0, retry_budget, max_delay=EPISODES_MAX_DELAY)
+        
         for attempt in range(max_retries + 1):
             try:
                 if self.verbose and attempt > 0:
@@ -353,9 +799,11 @@ class AnimeSamaScraper:
                     if self.verbose:
                         BeautifulLogger.info("Utilisation système hybride révolutionnaire...", "🔥")
                     
-                    response = self.hybrid_system.breakthrough_request(episodes_url, max_global_retries=6)
+                    response = self.hybrid_system.breakthrough_request(
+                        episodes_url, max_global_retries=6, retry_budget=retry_budget
+                    )
                     
-                    if not response:
+                    if response is None:
                         if self.verbose:
                             BeautifulLogger.warning("Système hybride échoué - Fallback ultime")
                         response = self.session.get(episodes_url, timeout=30)
@@ -367,7 +815,7 @@ class AnimeSamaScraper:
                     
                     response = self.railway_bypass.railway_request(episodes_url, max_retries=3)
                     
-                    if not response:
+                    if response is None:
                         if self.verbose:
                             BeautifulLogger.warning("Railway bypass échoué - Fallback")
                         response = self.session.get(episodes_url, timeout=30)
@@ -378,7 +826,7 @@ class AnimeSamaScraper:
                     
                     response = self.advanced_bypass.bypass_request(episodes_url, max_retries=3)
                     
-                    if not response:
+                    if response is None:
                         if self.verbose:
                             BeautifulLogger.warning("Échec contournement - Fallback méthode standard")
                         response = self.session.get(episodes_url, timeout=45)
@@ -394,20 +842,22 @@ class AnimeSamaScraper:
                         
                         # Refresh session and try again
                         self.refresh_session_on_block()
-                        continue
+                        if retry.sleep(BLOCKED_RETRY_DELAY):
+                            continue
+                        return None
                     else:
                         BeautifulLogger.error("Échec persistant avec erreur 403 - Site bloque l'accès automatisé")
-                        return []
+                        return None
                 
                 response.raise_for_status()
                 
-                # Parse the JavaScript content to extract chapter data
-                episodes_content = response.text
-                
-                # Extract chapter number from chapter_url (need to get it from context)
-                manga_name = self.url_builder.extract_manga_name_from_url(chapter_url)
+                if self.episodes_cache:
+                    self.episodes_cache.store_response(chapter_url, response)
                 
-                return self._parse_episodes_js(episodes_content, chapter_number)
+                return response.text
+            
+            except CircuitOpenError:
+                raise
                 
             except requests.RequestException as e:
                 error_str = str(e)
@@ -416,28 +866,74 @@ class AnimeSamaScraper:
                         if self.verbose:
                             BeautifulLogger.warning(f"Erreur 403 détectée, renouvellement de la session...")
                         self.refresh_session_on_block()
-                        continue
+                        if retry.sleep(BLOCKED_RETRY_DELAY):
+                            continue
+                        return None
                     else:
                         BeautifulLogger.error("Échec persistant avec erreur 403 - Protections anti-bot du site")
-                        return []
+                        return None
+                elif e.response is not None and e.response.status_code in MISSING_STATUS_CODES:
+                    # Manga inexistant : inutile de réessayer
+                    BeautifulLogger.error(f"episodes.js introuvable ({e.response.status_code}) - vérifiez le nom du manga")
+                    return None
                 else:
                     BeautifulLogger.error(f"Erreur réseau lors de la récupération des données: {error_str}")
-                    if attempt < max_retries:
-                        time.sleep(3.0 * (attempt + 1))  # Délai progressif
+                    # Délai à gigue, au moins le Retry-After d'une réponse 429/503
+                    if attempt < max_retries and retry.sleep(retry_after_from(e.response)):
                         continue
-                    return []
+                    return None
                     
             except Exception as e:
                 BeautifulLogger.error(f"Erreur lors de l'extraction des URLs d'images: {str(e)}")
                 if self.verbose:
                     import traceback
                     traceback.print_exc()
-                if attempt < max_retries:
-                    time.sleep(2.0)
+                if attempt < max_retries and retry.sleep():
                     continue
-                return []
+                return None
+        
+        return None
+    
+    def _revalidate_episodes_js(self, chapter_url, cached_entry):
+        """
+        Revalidate an expired episodes.js cache entry with a conditional request.
+        
+        Args:
+            chapter_url (str): URL of the chapter page (cache key)
+            cached_entry (dict): Expired cache entry
+            
+        Returns:
+            str: Content of episodes.js, or None if a full fetch is required
+        """
+        conditional_headers = EpisodesCache.conditional_headers(cached_entry)
+        if not conditional_headers:
+            return None
+        
+        episodes_url = urljoin(chapter_url, 'episodes.js')
+        
+        # Réutiliser la dernière session qui a passé les protections du site
+        session = self.session
+        if self.hybrid_system and self.hybrid_system.current_session:
+            session = self.hybrid_system.current_session
+        
+        try:
+            response = session.get(episodes_url, headers=conditional_headers, timeout=30)
+        except requests.RequestException as e:
+            if self.verbose:
+                BeautifulLogger.warning(f"Revalidation episodes.js impossible: {str(e)}")
+            return None
         
-        return []
+        if response.status_code == 304:
+            if self.verbose:
+                BeautifulLogger.info("episodes.js inchangé (304), cache prolongé", "⚡")
+            self.episodes_cache.mark_revalidated(chapter_url)
+            return cached_entry['content']
+        
+        if response.status_code == 200 and response.text:
+            self.episodes_cache.store_response(chapter_url, response)
+            return response.text
+        
+        return None
     
     def _parse_episodes_js(self, episodes_content, chapter_number):
         """
@@ -454,69 +950,8 @@ class AnimeSamaScraper:
             if chapter_number is None:
                 return []
             
-            # Look for the variable corresponding to this chapter
-            # Try both formats: "var eps123=" and "var eps123 ="
-            chapter_var_formats = [
-                f"var eps{chapter_number}=",
-                f"var eps{chapter_number} ="
-            ]
-            
-            start_pos = -1
-            for var_format in chapter_var_formats:
-                start_pos = episodes_content.find(var_format)
-                if start_pos != -1:
-                    break
-            
-            if start_pos == -1:
-                if self.verbose:
-                    print(f"📋 Chapter variable eps{chapter_number} not found")
-                return []
-            
-            # Extract the array content
-            start_bracket = episodes_content.find('[', start_pos)
-            if start_bracket == -1:
-                return []
-            
-            # Find the matching closing bracket
-            bracket_count = 0
-            end_bracket = start_bracket
-            for i, char in enumerate(episodes_content[start_bracket:], start_bracket):
-                if char == '[':
-                    bracket_count += 1
-                elif char == ']':
-                    bracket_count -= 1
-                    if bracket_count == 0:
-                        end_bracket = i
-                        break
-            
-            # Extract the array content
-            array_content = episodes_content[start_bracket:end_bracket + 1]
-            
-            # Parse the JavaScript array to extract URLs
-            # Remove brackets and split by comma
-            content = array_content.strip('[]')
-            if not content.strip():
-                if self.verbose:
-                    print(f"📋 Chapter {chapter_number} appears to be empty")
-                return []
-            
-            # Split by comma and clean up the URLs
-            urls = []
-            for line in content.split(','):
-                line = line.strip()
-                if line.startswith("'") and line.endswith("'"):
-                    url = line[1:-1]  # Remove quotes
-                    if url and 'drive.google.com' in url:
-                        urls.append(url)
-            
-            if self.verbose:
-                print(f"📸 Extracted {len(urls)} image URLs from eps{chapter_number}")
-                for i, url in enumerate(urls[:3], 1):  # Show first 3 URLs
-                    print(f"   {i}. {url}")
-                if len(urls) > 3:
-                    print(f"   ... and {len(urls) - 3} more")
-            
-            return urls
+            index = self.episodes_parser.build_index(episodes_content)
+            return self.episodes_parser.get_chapter_urls(index, chapter_number)
             
         except Exception as e:
             print(f"❌ Error parsing episodes.js: {str(e)}")
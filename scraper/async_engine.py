@@ -0,0 +1,90 @@
+"""
+Long-lived event loop for the async HTTP engine
+"""
+
+import asyncio
+import threading
+
+from utils.http_transport import HttpxTransport
+
+
+class AsyncEngine:
+    """
+    One event loop running in a background thread, with one HttpxTransport
+    (one connection pool) shared by every chapter and job. Worker threads hand
+    their chapters over with run(); at most max_in_flight page requests are in
+    flight on the loop, all chapters and jobs combined.
+    """
+
+    def __init__(self, max_in_flight=64):
+        """
+        Args:
+            max_in_flight (int): Global cap on concurrent page requests
+        """
+        self.max_in_flight = max(1, max_in_flight)
+
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Created on the loop (asyncio objects belong to the loop that uses them)
+        self.transport = None
+        self.slots = None
+
+    def _ensure_started(self):
+        """Start the loop thread and open the transport on first use"""
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=self._run_loop, args=(loop,), name="scraper-async-engine", daemon=True)
+            thread.start()
+            asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+
+            self._loop = loop
+            self._thread = thread
+            return loop
+
+    @staticmethod
+    def _run_loop(loop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _open(self):
+        self.transport = HttpxTransport(max_connections=self.max_in_flight)
+        self.slots = asyncio.Semaphore(self.max_in_flight)
+
+    def run(self, coroutine_function, *args):
+        """
+        Run coroutine_function(*args) on the engine loop and wait for its result.
+        Called from worker threads, never from the engine loop itself.
+
+        Returns:
+            The coroutine's result (its exception is raised in the calling thread)
+        """
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(coroutine_function(*args), loop)
+        try:
+            return future.result()
+        except BaseException:
+            # Calling thread interrupted: the chapter stops on the loop as well
+            future.cancel()
+            raise
+
+    def close(self):
+        """Close the transport and stop the loop thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self.transport.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        self.transport = None
+        self.slots = None
@@ -0,0 +1,255 @@
+"""
+Asyncio image downloader
+Same cache, rate limiting, Google Drive strategies and retry policy as
+ImageDownloader, on top of a pluggable AsyncTransport
+"""
+
+import io
+import asyncio
+from utils.google_drive_downloader import (
+    GoogleDriveDownloader, MIN_IMAGE_SIZE, MAX_HTML_PAGE_SIZE, SNIFF_SIZE, CHUNK_SIZE, RETRY_BASE_DELAY
+)
+from utils.http_transport import TransportError
+from utils.headers import get_random_headers
+from utils.retry_policy import get_shared_retry_policy, retry_after_from, RetryAfterError, THROTTLING_STATUS_CODES
+from .image_downloader import is_cloud_environment, build_image_headers, retry_base_delay, blocked_delay
+
+
+async def _read_head(chunks, size, head=b''):
+    """Async counterpart of GoogleDriveDownloader.read_head"""
+    async for chunk in chunks:
+        head += chunk
+        if len(head) >= size:
+            return head, False
+    return head, True
+
+
+class AsyncImageDownloader:
+    def __init__(self, transport, headers=None, verbose=False, page_cache=None, rate_limiter=None, route_cache=None, retry_policy=None, page_flight=None):
+        """
+        Args:
+            transport (AsyncTransport): HTTP transport used for every request
+            headers (Mapping): Base headers of standard image requests
+            verbose (bool): Verbose logs
+            page_cache (PageCache): Persistent cache keyed by Google Drive file ID
+            rate_limiter (HostRateLimiter): Per-host spacing shared with the threaded engine
+            route_cache (DriveRouteCache): Google Drive routes that already worked
+            retry_policy (RetryPolicy): Backoff and sleep statistics (shared policy by default)
+            page_flight (SingleFlight): Merges concurrent fetches of the same page, across
+                event loops and with the threaded engine
+        """
+        self.transport = transport
+        self.headers = dict(headers or get_random_headers())
+        self.verbose = verbose
+        self.page_cache = page_cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or get_shared_retry_policy()
+        self.page_flight = page_flight
+
+        # Only the URL and header helpers are used, requests go through the transport
+        self.gdrive = GoogleDriveDownloader(None, verbose, route_cache=route_cache)
+
+    async def fetch_image(self, url, name="", max_retries=5, retry_budget=None):
+        """
+        Download an image into memory.
+
+        Args:
+            url (str): Image URL (supports Google Drive)
+            name (str): Page name used in log messages
+            max_retries (int): Maximum number of retry attempts
+            retry_budget (RetryBudget): Sleep budget of the job, shared by its pages
+
+        Returns:
+            bytes: Image content, or None if the download failed
+        """
+        if self.page_flight is None:
+            return await self._fetch_image(url, name, max_retries, retry_budget)
+        return await self.page_flight.do_async(
+            self.gdrive.page_key(url), self._fetch_image, url, name, max_retries, retry_budget
+        )
+
+    async def _fetch_image(self, url, name, max_retries, retry_budget):
+        buffer = io.BytesIO()
+        if await self.download_to_stream(url, buffer, name, max_retries, retry_budget):
+            return buffer.getvalue()
+        return None
+
+    async def download_to_stream(self, url, stream, name="", max_retries=5, retry_budget=None):
+        """
+        Download an image from URL into a writable binary stream
+        (see ImageDownloader.download_to_stream).
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        file_id = None
+
+        if self.gdrive.is_google_drive_url(url):
+            # Les IDs Google Drive sont stables : servir la page depuis le disque si possible
+            file_id = self.gdrive.extract_file_id(url)
+            # Accès disque hors de la boucle partagée par tous les chapitres
+            if self.page_cache and await asyncio.to_thread(self.page_cache.read_into, file_id, stream):
+                return True
+
+        # Seules les requêtes réseau sont espacées, pas les pages servies depuis le cache
+        if self.rate_limiter:
+            await self.rate_limiter.async_wait(url)
+
+        if file_id is not None:
+            if await self._download_gdrive(url, file_id, stream, max_retries, retry_budget):
+                if self.page_cache:
+                    await asyncio.to_thread(self.page_cache.store_stream, file_id, stream)
+                return True
+            if self.verbose:
+                print(f"   ⚠️ Échec Google Drive, tentative téléchargement standard...")
+
+        if await self._download_standard(url, stream, name, max_retries, retry_budget):
+            if self.page_cache and file_id:
+                await asyncio.to_thread(self.page_cache.store_stream, file_id, stream)
+            return True
+        return False
+
+    async def _download_gdrive(self, drive_url, file_id, stream, max_retries, retry_budget=None):
+        """Try the known route first, then every Google Drive strategy, max_retries rounds"""
+        retry = self.retry_policy.start(RETRY_BASE_DELAY, retry_budget)
+
+        route = self.gdrive.known_route(file_id)
+        if route:
+            try:
+                if await self._attempt_strategy(route[1], stream, route[0], file_id):
+                    return True
+                self.gdrive.forget_route(file_id)
+            except RetryAfterError as e:
+                if not await retry.async_sleep(e.retry_after):
+                    return False
+
+        strategies = self.gdrive.build_strategies(file_id, drive_url)
+
+        for attempt in range(max_retries):
+            retry_after = None
+            for strategy_name, url in strategies:
+                try:
+                    if strategy_name == 'view_page':
+                        resolved = await self._download_via_view_page(url, stream, file_id)
+                    else:
+                        resolved = await self._attempt_strategy(url, stream, strategy_name, file_id)
+                    if resolved:
+                        self.gdrive.remember_route(file_id, drive_url, strategy_name, resolved)
+                        return True
+                except RetryAfterError as e:
+                    # Google limite le débit : les autres stratégies échoueraient aussi
+                    retry_after = e.retry_after
+                    break
+                except Exception as e:
+                    if self.verbose:
+                        print(f"   ❌ Stratégie {strategy_name} échouée: {e}")
+
+            if attempt < max_retries - 1 and not await retry.async_sleep(retry_after):
+                break
+        return False
+
+    async def _attempt_strategy(self, url, stream, strategy_name, file_id, follow_html=True):
+        """
+        One Google Drive request. Small HTML answers are searched for a direct
+        download URL, followed once.
+        
+        Returns:
+            tuple: (strategy, url) of the request that delivered the image, or False
+        """
+        headers = self.gdrive.strategy_headers(strategy_name, file_id)
+
+        try:
+            async with self.transport.stream(url, headers=headers, timeout=30) as response:
+                if response.status_code in THROTTLING_STATUS_CODES:
+                    raise RetryAfterError(response.status_code, retry_after_from(response))
+                if self.gdrive.is_confirmation_page(response.url) or response.status_code != 200:
+                    return False
+
+                # Inspecter les premiers octets seulement (voir GoogleDriveDownloader)
+                chunks = response.aiter_bytes(CHUNK_SIZE)
+                head, finished = await _read_head(chunks, SNIFF_SIZE)
+                content_type = response.headers.get('Content-Type', '')
+
+                if self.gdrive.is_html_response(content_type, head):
+                    if not finished:
+                        head, finished = await _read_head(chunks, MAX_HTML_PAGE_SIZE, head)
+                    if not follow_html or not finished:
+                        return False
+                    html = head.decode('utf-8', errors='replace')
+                    if self.gdrive.is_confirmation_page(response.url, html):
+                        return False
+                    return await self._download_from_html(html, stream, file_id)
+
+                stream.seek(0)
+                stream.truncate()
+                stream.write(head)
+                async for chunk in chunks:
+                    stream.write(chunk)
+
+            if stream.tell() > MIN_IMAGE_SIZE:
+                return (strategy_name, url)
+            stream.seek(0)
+            stream.truncate()
+            return False
+
+        except TransportError as e:
+            if self.verbose:
+                print(f"   ❌ Erreur réseau {strategy_name}: {e}")
+            return False
+
+    async def _download_via_view_page(self, view_url, stream, file_id):
+        """Fetch the Drive view page and follow the download URL it contains"""
+        async with self.transport.stream(view_url, headers=self.gdrive.gdrive_headers, timeout=20) as response:
+            if response.status_code in THROTTLING_STATUS_CODES:
+                raise RetryAfterError(response.status_code, retry_after_from(response))
+            if response.status_code != 200:
+                return False
+            html = (await response.aread()).decode('utf-8', errors='replace')
+        return await self._download_from_html(html, stream, file_id)
+
+    async def _download_from_html(self, html, stream, file_id):
+        clean_url = self.gdrive.find_direct_download_url(html, file_id)
+        if clean_url:
+            return await self._attempt_strategy(clean_url, stream, 'extracted_url', file_id, follow_html=False)
+
+        base_url = self.gdrive.build_direct_download_url(file_id)
+        return await self._attempt_strategy(base_url, stream, 'base_download', file_id, follow_html=False)
+
+    async def _download_standard(self, url, stream, name, max_retries, retry_budget=None):
+        """Plain GET with the same retry policy as ImageDownloader"""
+        cloud_env = is_cloud_environment()
+        retry = self.retry_policy.start(retry_base_delay(cloud_env), retry_budget)
+
+        for attempt in range(max_retries):
+            min_delay = None
+            try:
+                headers = build_image_headers(self.headers, url, cloud_env)
+                async with self.transport.stream(url, headers=headers, timeout=45 if cloud_env else 30) as response:
+                    response.raise_for_status()
+                    stream.seek(0)
+                    stream.truncate()
+                    async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                        stream.write(chunk)
+
+                if stream.tell() > 0:
+                    if self.verbose:
+                        print(f"   ✅ Downloaded {name} ({stream.tell()} bytes)")
+                    return True
+                raise TransportError("Downloaded file is empty")
+
+            except Exception as e:
+                # Le serveur peut indiquer quand revenir (429/503)
+                min_delay = getattr(e, 'retry_after', None)
+                if getattr(e, 'status_code', None) == 403:
+                    # Nouvelle identité navigateur, comme refresh_session_on_block
+                    if self.verbose:
+                        print(f"   🚫 Accès refusé (403) pour {name} - Rotation des headers...")
+                    self.headers = get_random_headers()
+                    min_delay = blocked_delay(cloud_env)
+                elif self.verbose:
+                    print(f"   ❌ Erreur réseau pour {name}: {e}")
+
+            if attempt < max_retries - 1 and not await retry.async_sleep(min_delay):
+                break
+
+        return False
@@ -4,8 +4,9 @@ CBZ file creation utilities
 
 import os
 import zipfile
-import tempfile
+import threading
 from pathlib import Path
+from utils.compression_policy import compress_type_for_bytes, compress_type_for_file
 
 class CBZConverter:
     def __init__(self, verbose=False):
@@ -46,7 +47,8 @@ class CBZConverter:
                     image_path = os.path.join(images_dir, image_file)
                     
                     # Add the image to the CBZ with just the filename (no directory structure)
-                    cbz_file.write(image_path, image_file)
+                    # Already-compressed images are stored, deflating them only burns CPU
+                    cbz_file.write(image_path, image_file, compress_type=compress_type_for_file(image_path))
                     
                     if self.verbose:
                         print(f"   ✅ Added: {image_file}")
@@ -144,3 +146,71 @@ class CBZConverter:
                 return sorted(cbz_file.namelist())
         except Exception:
             return []
+
+
+class StreamingCBZWriter:
+    """
+    Write a CBZ file incrementally as pages are downloaded.
+    Pages are appended to the archive as they arrive, so none is held in
+    memory; the central directory is sorted by page number on close, which
+    is the order readers list the pages in.
+    """
+    
+    def __init__(self, output_path, verbose=False):
+        self.output_path = output_path
+        self.verbose = verbose
+        self.part_path = f"{output_path}.part"
+        
+        self._zip_file = zipfile.ZipFile(self.part_path, 'w', zipfile.ZIP_DEFLATED)
+        self._lock = threading.Lock()
+        
+        self.pages_written = 0
+    
+    def add_page(self, page_number, data, extension=".jpg"):
+        """
+        Append a downloaded page to the archive.
+        
+        Args:
+            page_number (int): 1-based page number
+            data (bytes): Image content
+            extension (str): File extension of the entry
+        """
+        filename = f"page_{page_number:03d}{extension}"
+        with self._lock:
+            self._zip_file.writestr(filename, data, compress_type=compress_type_for_bytes(data))
+            self.pages_written += 1
+        if self.verbose:
+            print(f"   ✅ Added: {filename}")
+    
+    def close(self):
+        """
+        Write the central directory in page order and publish the CBZ file.
+        
+        Returns:
+            bool: True if the CBZ contains at least one page
+        """
+        with self._lock:
+            # Entrées écrites dans l'ordre d'arrivée : seul le répertoire central est trié
+            self._zip_file.filelist.sort(key=lambda info: info.filename)
+            self._zip_file.close()
+        
+        if self.pages_written == 0:
+            os.remove(self.part_path)
+            print(f"❌ Failed to create CBZ file: {self.output_path}")
+            return False
+        
+        os.replace(self.part_path, self.output_path)
+        if self.verbose:
+            file_size = os.path.getsize(self.output_path)
+            print(f"✅ CBZ created successfully: {self.output_path} ({file_size} bytes)")
+        return True
+    
+    def abort(self):
+        """Discard the partially written CBZ file"""
+        with self._lock:
+            try:
+                self._zip_file.close()
+            except Exception:
+                pass
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
@@ -0,0 +1,94 @@
+"""
+Parsing utilities for anime-sama.fr episodes.js payloads
+"""
+
+import re
+
+class EpisodesParser:
+    # One match per "var epsN = [ ... ];" declaration, scanned left to right
+    EPISODES_VAR_PATTERN = re.compile(r"var\s+eps(\d+)\s*=\s*\[([^\]]*)\]")
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+
+    def build_index(self, episodes_content):
+        """
+        Parse a whole episodes.js payload into a chapter index in a single pass.
+
+        Args:
+            episodes_content (str): Content of the episodes.js file
+
+        Returns:
+            dict: Mapping of chapter number (int) to its list of image URLs
+        """
+        index = {}
+        if not episodes_content:
+            return index
+
+        for match in self.EPISODES_VAR_PATTERN.finditer(episodes_content):
+            chapter_number = int(match.group(1))
+
+            # Keep the first declaration, like the previous str.find lookup did
+            if chapter_number in index:
+                continue
+
+            index[chapter_number] = self._parse_array_items(match.group(2))
+
+        if self.verbose:
+            print(f"📋 Indexed {len(index)} chapters from episodes.js")
+
+        return index
+
+    def get_chapter_urls(self, index, chapter_number):
+        """
+        Look up the image URLs of a chapter in a previously built index.
+
+        Args:
+            index (dict): Index returned by build_index
+            chapter_number (int): Chapter number to extract
+
+        Returns:
+            list: List of image URLs for the chapter
+        """
+        if chapter_number is None:
+            return []
+
+        if chapter_number not in index:
+            if self.verbose:
+                print(f"📋 Chapter variable eps{chapter_number} not found")
+            return []
+
+        urls = list(index[chapter_number])
+        if not urls:
+            if self.verbose:
+                print(f"📋 Chapter {chapter_number} appears to be empty")
+            return []
+
+        if self.verbose:
+            print(f"📸 Extracted {len(urls)} image URLs from eps{chapter_number}")
+            for i, url in enumerate(urls[:3], 1):  # Show first 3 URLs
+                print(f"   {i}. {url}")
+            if len(urls) > 3:
+                print(f"   ... and {len(urls) - 3} more")
+
+        return urls
+
+    def _parse_array_items(self, array_body):
+        """
+        Extract the quoted Google Drive URLs from the body of a JavaScript array.
+
+        Args:
+            array_body (str): Text between the array brackets
+
+        Returns:
+            list: List of image URLs
+        """
+        urls = []
+        for item in array_body.split(','):
+            item = item.strip()
+            # Commented-out or unquoted entries are ignored
+            if len(item) >= 2 and item.startswith("'") and item.endswith("'"):
+                url = item[1:-1]
+                if url and 'drive.google.com' in url:
+                    urls.append(url)
+        return urls
@@ -3,22 +3,70 @@ Image downloading utilities with anti-detection measures
 Enhanced with Google Drive support
 """
 
+import io
 import os
-import time
 import requests
 from urllib.parse import urlparse
-import random
+from utils.headers import get_random_headers
 from utils.google_drive_downloader import GoogleDriveDownloader
+from utils.retry_policy import get_shared_retry_policy, retry_after_from
+from utils.image_format import detect_image_format
+
+# Extra headers avoiding blocks from cloud hosting IP ranges
+CLOUD_IMAGE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache',
+    'Sec-Fetch-Dest': 'image',
+    'Sec-Fetch-Mode': 'no-cors',
+    'Sec-Fetch-Site': 'cross-site'
+}
+
+def is_cloud_environment():
+    """True when running on a cloud host (Railway, Heroku, Render)"""
+    return bool(os.getenv('RAILWAY_ENVIRONMENT') or os.getenv('DYNO') or os.getenv('RENDER'))
+
+def build_image_headers(base_headers, url, cloud_env=False):
+    """
+    Headers of a standard image request.
+    Shared by ImageDownloader and AsyncImageDownloader.
+    
+    Args:
+        base_headers (Mapping): Session headers
+        url (str): Image URL
+        cloud_env (bool): Add the cloud anti-blocking headers
+        
+    Returns:
+        dict: Request headers
+    """
+    headers = dict(base_headers)
+    parsed = urlparse(url)
+    headers['Referer'] = f"{parsed.scheme}://{parsed.netloc}"
+    if cloud_env:
+        headers.update(CLOUD_IMAGE_HEADERS)
+    return headers
+
+def retry_base_delay(cloud_env=False):
+    """First retry delay of the standard download (longer on cloud hosts)"""
+    return 1.5 if cloud_env else 0.5
+
+def blocked_delay(cloud_env=False):
+    """Minimum delay before retrying after a 403"""
+    return 3.0 if cloud_env else 2.0
 
 class ImageDownloader:
-    def __init__(self, session, verbose=False, scraper_instance=None):
+    def __init__(self, session, verbose=False, scraper_instance=None, page_cache=None, rate_limiter=None, route_cache=None, retry_policy=None, page_flight=None):
         self.session = session
         self.verbose = verbose
         self.scraper_instance = scraper_instance  # Reference to main scraper for session refresh
-        self.download_delays = [0.3, 0.5, 0.7, 1.0]  # Random delays
+        self.page_cache = page_cache  # Persistent cache keyed by Google Drive file ID
+        self.rate_limiter = rate_limiter  # Per-host spacing shared by concurrent workers
+        self.retry_policy = retry_policy or get_shared_retry_policy()  # Backoff and sleep budget
+        self.page_flight = page_flight  # SingleFlight merging concurrent fetches of the same page
         
         # Initialiser le téléchargeur Google Drive
-        self.gdrive_downloader = GoogleDriveDownloader(session, verbose)
+        self.gdrive_downloader = GoogleDriveDownloader(
+            session, verbose, route_cache=route_cache, retry_policy=self.retry_policy
+        )
         
     def download_image(self, url, filepath, max_retries=5):
         """
@@ -33,17 +81,77 @@ class ImageDownloader:
         Returns:
             bool: True if successful, False otherwise
         """
-        import os
+        with open(filepath, 'wb') as f:
+            success = self.download_to_stream(url, f, os.path.basename(filepath), max_retries)
+        
+        if not success and os.path.exists(filepath):
+            os.remove(filepath)
+        return success
+    
+    def fetch_image(self, url, name="", max_retries=5, retry_budget=None):
+        """
+        Download an image from URL into memory.
+        
+        Args:
+            url (str): Image URL (supports Google Drive)
+            name (str): Page name used in log messages
+            max_retries (int): Maximum number of retry attempts
+            retry_budget (RetryBudget): Sleep budget of the job, shared by its pages
+            
+        Returns:
+            bytes: Image content, or None if the download failed
+        """
+        if self.page_flight is None:
+            return self._fetch_image(url, name, max_retries, retry_budget)
+        # Même page demandée par plusieurs jobs : un seul téléchargement, résultat partagé
+        return self.page_flight.do(
+            self.gdrive_downloader.page_key(url), self._fetch_image, url, name, max_retries, retry_budget
+        )
+    
+    def _fetch_image(self, url, name, max_retries, retry_budget):
+        buffer = io.BytesIO()
+        if self.download_to_stream(url, buffer, name, max_retries, retry_budget):
+            return buffer.getvalue()
+        return None
+    
+    def download_to_stream(self, url, stream, name="", max_retries=5, retry_budget=None):
+        """
+        Download an image from URL into a writable binary stream.
+        The stream is rewound and truncated before every attempt.
+        
+        Args:
+            url (str): Image URL (supports Google Drive)
+            stream (file-like): Seekable binary stream receiving the image
+            name (str): Page name used in log messages
+            max_retries (int): Maximum number of retry attempts
+            retry_budget (RetryBudget): Sleep budget of the job, or None
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        file_id = None
         
         # Vérifier si c'est une URL Google Drive
         if self.gdrive_downloader.is_google_drive_url(url):
             if self.verbose:
-                print(f"   🔗 Détection Google Drive: {os.path.basename(filepath)}")
+                print(f"   🔗 Détection Google Drive: {name}")
             
+            # Les IDs Google Drive sont stables : servir la page depuis le disque si possible
+            file_id = self.gdrive_downloader.extract_file_id(url)
+            if self.page_cache and self.page_cache.read_into(file_id, stream):
+                return True
+        
+        # Seules les requêtes réseau sont espacées, pas les pages servies depuis le cache
+        if self.rate_limiter:
+            self.rate_limiter.wait(url)
+        
+        if file_id is not None:
             # Utiliser le téléchargeur Google Drive spécialisé
-            success = self.gdrive_downloader.download_from_google_drive(url, filepath, max_retries)
+            success = self.gdrive_downloader.download_to_stream(url, stream, max_retries, retry_budget)
             
             if success:
+                if self.page_cache:
+                    self.page_cache.store_stream(file_id, stream)
                 return True
             else:
                 if self.verbose:
@@ -51,36 +159,26 @@ class ImageDownloader:
                 # Fallback vers téléchargement standard si GDrive échoue
         
         # Téléchargement standard pour URLs non-Google Drive ou fallback
-        cloud_env = os.getenv('RAILWAY_ENVIRONMENT') or os.getenv('DYNO') or os.getenv('RENDER')
+        cloud_env = is_cloud_environment()
+        # Délais plus longs pour les environnements cloud
+        retry = self.retry_policy.start(retry_base_delay(cloud_env), retry_budget)
+        # Headers renouvelés après un 403, propres à cette page (la session est partagée)
+        rotated_headers = None
         
         for attempt in range(max_retries):
+            min_delay = None
+            # Session et génération lues ensemble : un 403 ne renouvelle que cette session
+            session = self.session
+            generation = getattr(self.scraper_instance, 'session_generation', None)
             try:
                 if self.verbose and attempt > 0:
-                    print(f"   🔄 Retry attempt {attempt + 1} for {os.path.basename(filepath)}")
-                
-                # Add some randomization to headers for this request
-                headers = self.session.headers.copy()
-                headers['Referer'] = self._get_referer_from_url(url)
+                    print(f"   🔄 Retry attempt {attempt + 1} for {name}")
                 
                 # Headers supplémentaires pour éviter le blocage cloud
-                if cloud_env:
-                    headers.update({
-                        'Cache-Control': 'no-cache',
-                        'Pragma': 'no-cache',
-                        'Sec-Fetch-Dest': 'image',
-                        'Sec-Fetch-Mode': 'no-cors',
-                        'Sec-Fetch-Site': 'cross-site'
-                    })
-                
-                # Délai plus long pour les environnements cloud
-                if attempt > 0:
-                    delay = (1.5 if cloud_env else 0.5) * (attempt + 1)
-                    if self.verbose:
-                        print(f"   ⏳ Attente de {delay:.1f}s avant nouvelle tentative...")
-                    time.sleep(delay)
+                headers = build_image_headers(rotated_headers or session.headers, url, cloud_env)
                 
                 # Make the request
-                response = self.session.get(
+                response = session.get(
                     url, 
                     headers=headers,
                     timeout=45 if cloud_env else 30,
@@ -95,76 +193,58 @@ class ImageDownloader:
                         print(f"   ⚠️  Warning: URL may not be an image: {content_type}")
                 
                 # Save the image
-                with open(filepath, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
+                stream.seek(0)
+                stream.truncate()
+                for chunk in response.iter_content(chunk_size=8192):
+                    if chunk:
+                        stream.write(chunk)
                 
-                # Verify the file was created and has content
-                if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
+                # Verify the image has content
+                size = stream.tell()
+                if size > 0:
                     if self.verbose:
-                        file_size = os.path.getsize(filepath)
-                        print(f"   ✅ Downloaded {os.path.basename(filepath)} ({file_size} bytes)")
+                        print(f"   ✅ Downloaded {name} ({size} bytes)")
+                    if self.page_cache and file_id:
+                        self.page_cache.store_stream(file_id, stream)
                     return True
                 else:
-                    if os.path.exists(filepath):
-                        os.remove(filepath)
                     raise Exception("Downloaded file is empty")
                     
             except requests.RequestException as e:
+                error_msg = str(e)
+                blocked = "403" in error_msg or "Forbidden" in error_msg
+                if blocked:
+                    # Renouveler complètement les headers sur erreur 403
+                    rotated_headers = get_random_headers()
                 if self.verbose:
-                    error_msg = str(e)
-                    if "403" in error_msg or "Forbidden" in error_msg:
-                        print(f"   🚫 Accès refusé (403) pour {os.path.basename(filepath)} - Rotation des headers...")
-                        # Renouveler complètement les headers sur erreur 403
-                        from utils.headers import get_random_headers
-                        self.session.headers.update(get_random_headers())
+                    if blocked:
+                        print(f"   🚫 Accès refusé (403) pour {name} - Rotation des headers...")
                     else:
-                        print(f"   ❌ Erreur réseau pour {os.path.basename(filepath)}: {error_msg}")
+                        print(f"   ❌ Erreur réseau pour {name}: {error_msg}")
+                
+                # Le serveur peut indiquer quand revenir (429/503)
+                min_delay = retry_after_from(getattr(e, 'response', None))
                 
                 if attempt < max_retries - 1:
                     # Handle 403 errors with session refresh
-                    if "403" in str(e) or "Forbidden" in str(e):
+                    if blocked:
                         if self.scraper_instance and hasattr(self.scraper_instance, 'refresh_session_on_block'):
                             if self.verbose:
                                 print(f"   🔄 Erreur 403 détectée, renouvellement de la session...")
-                            self.scraper_instance.refresh_session_on_block()
-                            self.session = self.scraper_instance.session  # Update session reference
-                            # Mettre à jour la session du téléchargeur Google Drive aussi
-                            self.gdrive_downloader.session = self.session
-                        delay = (3.0 if cloud_env else 2.0) * (attempt + 2)
-                    else:
-                        delay = random.choice(self.download_delays) * (attempt + 1)
-                    
-                    if self.verbose:
-                        print(f"   ⏳ Nouvelle tentative dans {delay:.1f}s...")
-                    time.sleep(delay)
-                    continue
+                            # Le scraper remplace self.session (une seule fois pour tous les workers)
+                            self.scraper_instance.refresh_session_on_block(generation)
+                        min_delay = blocked_delay(cloud_env)
                     
             except Exception as e:
                 if self.verbose:
-                    print(f"   ❌ Error downloading {os.path.basename(filepath)}: {str(e)}")
-                
-                if attempt < max_retries - 1:
-                    delay = random.choice(self.download_delays) * (attempt + 1)
-                    time.sleep(delay)
-                    continue
+                    print(f"   ❌ Error downloading {name}: {str(e)}")
+            
+            # Délai avant la tentative suivante, borné par le budget du job
+            if attempt < max_retries - 1 and not retry.sleep(min_delay):
+                break
         
         return False
     
-    def _get_referer_from_url(self, url):
-        """
-        Generate an appropriate referer header from the image URL.
-        
-        Args:
-            url (str): Image URL
-            
-        Returns:
-            str: Referer URL
-        """
-        parsed = urlparse(url)
-        return f"{parsed.scheme}://{parsed.netloc}"
-    
     def _is_image_content_type(self, content_type):
         """
         Check if the content type indicates an image.
@@ -208,18 +288,8 @@ class ImageDownloader:
                 header = f.read(16)
             
             # Check for common image file signatures
-            signatures = {
-                b'\xff\xd8\xff': 'JPEG',
-                b'\x89PNG\r\n\x1a\n': 'PNG',
-                b'GIF87a': 'GIF',
-                b'GIF89a': 'GIF',
-                b'RIFF': 'WEBP',  # WEBP files start with RIFF
-                b'BM': 'BMP'
-            }
-            
-            for sig, format_name in signatures.items():
-                if header.startswith(sig):
-                    return True
+            if detect_image_format(header):
+                return True
             
             # If no signature matches, it might still be a valid image
             # but we'll be less confident
@@ -0,0 +1,116 @@
+"""
+Long-lived scraper shared by every bot command
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from .anime_sama_scraper import AnimeSamaScraper
+from .async_engine import AsyncEngine
+from utils.http_transport import HttpxTransport
+
+
+class ScraperService:
+    """
+    One AnimeSamaScraper (sessions, bypass systems, connection pools, caches)
+    shared by concurrent jobs. Each job works in its own output directory, so
+    jobs never see each other's CBZ files. With the async HTTP engine, the
+    service also owns the event loop and the httpx client used by every job.
+    """
+
+    def __init__(self, jobs_dir=None, verbose=False, **scraper_options):
+        """
+        Args:
+            jobs_dir (str): Parent directory of the per-job output directories
+            verbose (bool): Verbose scraper logs
+            **scraper_options: Extra AnimeSamaScraper options (max_workers, ...)
+        """
+        self.jobs_dir = jobs_dir or os.path.join(tempfile.gettempdir(), "anime_sama_jobs")
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+        # Moteur 'async' : une boucle et un pool de connexions pour tous les jobs
+        self.async_engine = None
+        if scraper_options.get('http_engine') == "async" and HttpxTransport.is_available():
+            self.async_engine = AsyncEngine(scraper_options.get('max_async_in_flight', 64))
+
+        self.scraper = AnimeSamaScraper(
+            output_dir=self.jobs_dir,
+            temp_dir=os.path.join(self.jobs_dir, "temp"),
+            verbose=verbose,
+            async_engine=self.async_engine,
+            **scraper_options
+        )
+
+    def close(self):
+        """Stop the async engine loop and close its connections (no-op with the threaded engine)"""
+        if self.async_engine is not None:
+            self.async_engine.close()
+
+    @contextmanager
+    def job_directory(self):
+        """
+        Private output directory for one job, removed when the job ends.
+
+        Yields:
+            str: Path of the job directory
+        """
+        job_dir = tempfile.mkdtemp(prefix="job_", dir=self.jobs_dir)
+        try:
+            yield job_dir
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    def download_chapter(self, manga_name, chapter_number, output_dir, progress_callback=None):
+        """Download one chapter as a CBZ into output_dir (see AnimeSamaScraper.download_chapter)"""
+        return self.scraper.download_chapter(
+            manga_name, chapter_number, progress_callback=progress_callback, output_dir=output_dir
+        )
+
+    def download_chapter_list(self, manga_name, chapter_numbers, output_dir, progress_callback=None, chapter_callback=None):
+        """Download a list of chapters into output_dir (see AnimeSamaScraper.download_chapter_list)"""
+        return self.scraper.download_chapter_list(
+            manga_name, chapter_numbers, progress_callback=progress_callback, output_dir=output_dir,
+            chapter_callback=chapter_callback
+        )
+
+    def download_multiple_chapters(self, manga_name, start_chapter, end_chapter, output_dir, progress_callback=None, chapter_callback=None):
+        """Download a range of chapters into output_dir (see AnimeSamaScraper.download_multiple_chapters)"""
+        return self.scraper.download_multiple_chapters(
+            manga_name, start_chapter, end_chapter, progress_callback=progress_callback, output_dir=output_dir,
+            chapter_callback=chapter_callback
+        )
+
+    def get_cbz_path(self, manga_name, chapter_number, output_dir):
+        """Path of a chapter's CBZ inside a job directory"""
+        return self.scraper.get_cbz_path(manga_name, chapter_number, output_dir)
+
+
+_shared_service = None
+_shared_service_lock = threading.Lock()
+
+
+def get_shared_scraper_service():
+    """
+    Return the scraper service shared by the process.
+    Configurable through SCRAPER_JOBS_DIR and SCRAPER_MAX_WORKERS (page requests
+    in flight across all jobs); connection pools through HTTP_POOL_CONNECTIONS
+    and HTTP_POOL_MAXSIZE. SCRAPER_HTTP_ENGINE=async downloads pages with httpx
+    on one event loop, SCRAPER_ASYNC_IN_FLIGHT requests in flight across all jobs.
+    SCRAPER_RESUME_DIR keeps the pages of incomplete chapters between jobs
+    (defaults to a directory inside SCRAPER_JOBS_DIR). CIRCUIT_FAILURE_THRESHOLD
+    and CIRCUIT_RESET_TIMEOUT tune when anime-sama.fr is declared unavailable.
+    """
+    global _shared_service
+    with _shared_service_lock:
+        if _shared_service is None:
+            _shared_service = ScraperService(
+                jobs_dir=os.getenv('SCRAPER_JOBS_DIR'),
+                max_workers=int(os.getenv('SCRAPER_MAX_WORKERS', 8)),
+                http_engine=os.getenv('SCRAPER_HTTP_ENGINE', 'threads'),
+                max_async_in_flight=int(os.getenv('SCRAPER_ASYNC_IN_FLIGHT', 64)),
+                resume_dir=os.getenv('SCRAPER_RESUME_DIR')
+            )
+        return _shared_service
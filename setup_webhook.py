@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """
 Script pour configurer automatiquement le webhook Telegram
+Le bot lancé avec WEBHOOK_URL enregistre lui-même son webhook au démarrage ;
+ce script sert aux vérifications (info) et aux changements manuels
 """
 
 import os
@@ -42,6 +44,10 @@ def setup_webhook(webhook_url=None):
         'url': webhook_url,
         'allowed_updates': ['message', 'callback_query']
     }
+    # Même jeton secret que le bot (sinon ses requêtes seraient refusées)
+    secret_token = os.getenv('WEBHOOK_SECRET')
+    if secret_token:
+        data['secret_token'] = secret_token
     
     try:
         response = requests.post(api_url, data=data, timeout=30)
@@ -5,17 +5,31 @@ Utilise le scraper existant pour télécharger et envoyer des fichiers CBZ.
 """
 
 import os
+import signal
 import asyncio
-import tempfile
+import secrets
 import shutil
 import zipfile
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes
 from telegram.constants import ParseMode
-from scraper.anime_sama_scraper import AnimeSamaScraper
+from telegram.error import BadRequest
+from scraper.scraper_service import get_shared_scraper_service
+from scraper.url_builder import URLBuilder
 from utils.zip_compressor import ZipCompressor
+from utils.volume_packer import VolumePacker
+from utils.episodes_cache import get_shared_episodes_cache
+from utils.page_cache import get_shared_page_cache
+from utils.drive_route_cache import get_shared_drive_route_cache
+from utils.retry_policy import get_shared_retry_policy
+from utils.circuit_breaker import get_shared_circuit_breaker, CircuitOpenError
+from utils.telegram_file_cache import get_shared_file_cache
+from utils.telegram_sender import get_shared_telegram_sender, MEDIA_GROUP_SIZE
+from utils.download_queue import get_shared_download_queue, UserJobLimitError
+from utils.beautiful_progress import BeautifulLogger
 from utils.telegram_progress import TelegramDownloadProgress, format_clean_message, format_file_caption, format_filename
-from keep_alive import keep_alive
+from utils.web_server import WebServer, telegram_webhook_handler
+from keep_alive import add_health_routes, create_health_monitor
 
 # Token du bot Telegram - Chargé depuis les secrets Replit
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
@@ -41,9 +55,24 @@ if not TELEGRAM_TOKEN:
     print("   - Valeur: votre_token_de_@BotFather")
     exit(1)
 
+# Chemin de réception des mises à jour en mode webhook (enregistré aussi par setup_webhook.py)
+WEBHOOK_PATH = '/webhook'
+
 class TelegramMangaBot:
     def __init__(self):
-        self.scraper = AnimeSamaScraper(verbose=True, use_residential_proxy=True, use_advanced_bypass=True, use_railway_bypass=True, use_hybrid_system=True)
+        # Scraper unique et thread-safe : sessions, bypass et pools de connexions réutilisés par toutes les commandes
+        self.scraper_service = get_shared_scraper_service()
+        
+        # Documents déjà envoyés : renvoi par file_id sans scraping ni upload
+        self.file_cache = get_shared_file_cache()
+        # Archivage optionnel des CBZ envoyés (désactivé si CBZ_ARCHIVE_DIR absent)
+        self.archive_dir = os.getenv('CBZ_ARCHIVE_DIR')
+        # File des téléchargements : les handlers ne bloquent jamais la boucle d'événements
+        self.download_queue = get_shared_download_queue()
+        # Disjoncteur de la source : réponse immédiate quand anime-sama.fr est en panne
+        self.circuit_breaker = get_shared_circuit_breaker()
+        # Envois vers Telegram cadencés (limites globales et par conversation, RetryAfter)
+        self.sender = get_shared_telegram_sender()
         
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Commande /start - Affiche les informations d'aide"""
@@ -69,12 +98,13 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
    ▸ *Exemple :* `/multiscan tokyo ghoul 10 15`
 
 📦 **`/tome <nom_manga> <numéro_tome>`**
-   ▸ Télécharge un tome complet (10 chapitres dans 1 ZIP)
+   ▸ Télécharge un tome complet (10 chapitres en ZIP, découpé en parties de 50 MB si besoin)
    ▸ *Tome 1 = chapitres 1-10, Tome 2 = chapitres 11-20...*
    ▸ *Exemple :* `/tome blue lock 1`
    ▸ *Exemple :* `/tome lookism 3`
 
 ❓ **`/help`** ▸ Réaffiche cette aide
+📊 **`/stats`** ▸ Statistiques des caches du bot
 
 🔸 **━━━━━━━━━━━ FONCTIONNALITÉS ━━━━━━━━━━━** 🔸
 
@@ -97,7 +127,8 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
         """
         
         if update.message:
-            await update.message.reply_text(
+            await self.sender.reply_text(
+                update.message,
                 welcome_message, 
                 parse_mode=ParseMode.MARKDOWN
             )
@@ -108,13 +139,70 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
             return
         await self.start_command(update, context)
 
+    async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Commande /stats - Affiche les statistiques des caches du bot"""
+        if not update.message:
+            return
+        
+        episodes_stats = get_shared_episodes_cache().get_stats()
+        page_stats = get_shared_page_cache().get_stats()
+        route_stats = get_shared_drive_route_cache().get_stats()
+        retry_stats = get_shared_retry_policy().get_stats()
+        circuit_stats = self.circuit_breaker.get_stats()
+        scraper = self.scraper_service.scraper
+        shared_episodes = scraper.episodes_flight.get_stats()['shared']
+        shared_pages = scraper.page_flight.get_stats()['shared']
+        shared_chapters = scraper.chapter_flight.get_stats()['shared']
+        file_stats = self.file_cache.get_stats()
+        queue_stats = self.download_queue.get_stats()
+        sender_stats = self.sender.get_stats()
+        
+        await self.sender.reply_text(
+            update.message,
+            f"📊 <b>Statistiques du bot</b>\n\n"
+            f"🗂️ <b>Cache episodes.js</b>\n"
+            f"• Entrées : <code>{episodes_stats['entries']}</code>\n"
+            f"• Hits : <code>{episodes_stats['hits']}</code>\n"
+            f"• Misses : <code>{episodes_stats['misses']}</code>\n"
+            f"• Revalidations (304) : <code>{episodes_stats['revalidations']}</code>\n"
+            f"• Taux de hit : <code>{episodes_stats['hit_rate']:.1f}%</code>\n\n"
+            f"🖼️ <b>Cache des pages</b>\n"
+            f"• Pages : <code>{page_stats['entries']}</code>\n"
+            f"• Taille : <code>{page_stats['size_mb']:.1f} / {page_stats['max_size_mb']:.0f} MB</code>\n"
+            f"• Taux de hit : <code>{page_stats['hit_rate']:.1f}%</code>\n"
+            f"• Données économisées : <code>{page_stats['bytes_saved_mb']:.1f} MB</code>\n"
+            f"• Chemins Google Drive mémorisés : <code>{route_stats['routes']}</code> (réutilisés : <code>{route_stats['route_hits']}</code>)\n\n"
+            f"📤 <b>Documents déjà envoyés</b>\n"
+            f"• Chapitres : <code>{file_stats['entries']}</code>\n"
+            f"• Renvois instantanés : <code>{file_stats['hits']}</code>\n"
+            f"• Taux de hit : <code>{file_stats['hit_rate']:.1f}%</code>\n\n"
+            f"📥 <b>File de téléchargement</b>\n"
+            f"• En cours : <code>{queue_stats['running']} / {queue_stats['workers']}</code>\n"
+            f"• En attente : <code>{queue_stats['queued']}</code>\n"
+            f"• Terminés : <code>{queue_stats['completed']}</code> (échecs : <code>{queue_stats['failed']}</code>)\n"
+            f"• Demandes fusionnées : <code>{shared_chapters}</code> chapitres, <code>{shared_pages}</code> pages, "
+            f"<code>{shared_episodes}</code> episodes.js\n\n"
+            f"🔁 <b>Reprises réseau</b>\n"
+            f"• Attentes : <code>{retry_stats['sleeps']}</code> (<code>{retry_stats['total_sleep']:.0f} s</code>)\n"
+            f"• Imposées par le serveur : <code>{retry_stats['floored_sleeps']}</code>\n"
+            f"• Budgets épuisés : <code>{retry_stats['budget_exhausted']}</code>\n"
+            f"• Sources indisponibles : <code>{', '.join(circuit_stats['open_hosts']) or 'aucune'}</code>\n"
+            f"• Requêtes refusées sans attente : <code>{circuit_stats['short_circuits']}</code>\n\n"
+            f"📨 <b>Envois Telegram</b>\n"
+            f"• Envoyés : <code>{sender_stats['sent']}</code> (en attente : <code>{sender_stats['queued']}</code>)\n"
+            f"• Limites Telegram respectées (RetryAfter) : <code>{sender_stats['retry_after']}</code>\n"
+            f"• Mises à jour de progression fusionnées : <code>{sender_stats['coalesced_edits']}</code>",
+            parse_mode=ParseMode.HTML
+        )
+
     async def scan_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Commande /scan - Télécharge un chapitre unique avec progression temps réel"""
         if not update.message:
             return
             
         if not context.args or len(context.args) < 2:
-            await update.message.reply_text(
+            await self.sender.reply_text(
+                update.message,
                 "🚫 <b>Commande incomplète !</b>\n\n"
                 "📋 <b>Format attendu :</b>\n"
                 "<code>/scan &lt;nom_manga&gt; &lt;chapitre&gt;</code>\n\n"
@@ -131,8 +219,32 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
             chapter_number = int(context.args[-1])
             manga_name = " ".join(context.args[:-1])
             
+            # Chapitre déjà envoyé : renvoi instantané par file_id
+            if await self._send_cached_chapter(update, manga_name, chapter_number):
+                return
+            
+            await self._enqueue_job(update, f"scan {manga_name} {chapter_number}", lambda: self._scan_job(update, manga_name, chapter_number))
+            
+        except ValueError:
+            await self.sender.reply_text(
+                update.message,
+                "❌ <b>Le numéro de chapitre doit être un nombre entier !</b>\n"
+                "Exemple : <code>/scan blue lock 272</code>",
+                parse_mode=ParseMode.HTML
+            )
+        except Exception as e:
+            await self.sender.reply_text(
+                update.message,
+                f"❌ <b>Une erreur est survenue :</b> {format_clean_message(str(e))}",
+                parse_mode=ParseMode.HTML
+            )
+    
+    async def _scan_job(self, update, manga_name, chapter_number):
+        """Job de /scan : télécharge et envoie un chapitre (exécuté par la file)"""
+        try:
             # Message initial propre
-            await update.message.reply_text(
+            await self.sender.reply_text(
+                update.message,
                 f"🎯 <b>Recherche en cours...</b>\n\n"
                 f"📖 <b>Manga :</b> {format_clean_message(manga_name)}\n"
                 f"📄 <b>Chapitre :</b> {chapter_number}\n\n"
@@ -140,48 +252,25 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
                 parse_mode=ParseMode.HTML
             )
             
-            # Créer un répertoire temporaire pour ce téléchargement
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Configurer le scraper avec le répertoire temporaire
-                scraper = AnimeSamaScraper(
-                    output_dir=temp_dir,
-                    temp_dir=os.path.join(temp_dir, "temp"),
-                    verbose=False
-                )
-                
+            # Répertoire propre au job, le scraper (et ses connexions) est partagé
+            with self.scraper_service.job_directory() as temp_dir:
                 # Créer gestionnaire de progression
                 progress_manager = TelegramDownloadProgress(
                     update, 
                     manga_name, 
-                    f"Chapitre {chapter_number}"
+                    f"Chapitre {chapter_number}",
+                    sender=self.sender
                 )
                 
-                # Hook pour capturer la progression
-                original_download_chapter = scraper.download_chapter
-                
-                async def download_with_progress(manga, chapter):
-                    # Démarrer avec une estimation
-                    await progress_manager.start_download(20)  # Estimation initiale
-                    
-                    # Simulation de progression pendant le téléchargement
-                    progress_task = asyncio.create_task(self._simulate_download_progress(progress_manager))
-                    
-                    # Téléchargement réel
-                    result = original_download_chapter(manga, chapter)
-                    
-                    # Arrêter la simulation
-                    progress_task.cancel()
-                    
-                    # Finaliser selon résultat
-                    if result:
-                        await progress_manager.complete_download(20, 20, 0)  # Succès
-                    else:
-                        await progress_manager.complete_download(0, 20, 0)   # Échec
-                    
-                    return result
-                
-                # Télécharger le chapitre avec progression
-                success = await download_with_progress(manga_name, chapter_number)
+                # Progression réelle : le scraper émet ses événements depuis le pool de threads
+                progress_callback = progress_manager.event_callback()
+                try:
+                    success = await self.download_queue.run_blocking(
+                        self.scraper_service.download_chapter, manga_name, chapter_number, temp_dir,
+                        progress_callback=progress_callback
+                    )
+                finally:
+                    await progress_manager.close_events()
                 
                 if success:
                     # Trouver le fichier CBZ créé
@@ -195,50 +284,20 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
                         # Nom de fichier propre
                         clean_filename = format_filename(manga_name, f"Chapitre_{chapter_number}")
                         
-                        # Vérifier si compression nécessaire
-                        if ZipCompressor.should_compress_for_telegram(cbz_path):
-                            await update.message.reply_text(
-                                f"📦 <b>Compression nécessaire</b>\n\n"
-                                f"📊 <b>Taille originale :</b> {file_size_mb:.1f} MB\n"
-                                f"⚠️ <b>Dépasse la limite de 50 MB</b>\n"
-                                f"🔄 <i>Compression en cours...</i>",
-                                parse_mode=ParseMode.HTML
-                            )
-                            
-                            # Compresser le fichier
-                            result = ZipCompressor.compress_file(cbz_path, temp_dir)
-                            if result:
-                                zip_path, orig_mb, comp_mb, ratio = result
-                                
-                                # Message de compression réussie (nettoyé)
-                                await update.message.reply_text(
-                                    f"✅ <b>Compression terminée</b>\n\n"
-                                    f"📊 <b>Taille originale :</b> {orig_mb:.1f} MB\n"
-                                    f"📦 <b>Taille compressée :</b> {comp_mb:.1f} MB\n"
-                                    f"🎯 <b>Réduction :</b> {(orig_mb-comp_mb)/orig_mb*100:.1f}%",
-                                    parse_mode=ParseMode.HTML
-                                )
-                                
-                                # Envoyer le fichier compressé avec légende propre
-                                clean_zip_filename = format_filename(manga_name, f"Chapitre_{chapter_number}", "zip")
-                                caption = format_file_caption(manga_name, f"Chapitre {chapter_number}", comp_mb, True)
-                                
-                                with open(zip_path, 'rb') as zip_file:
-                                    await update.message.reply_document(
-                                        document=zip_file,
-                                        filename=clean_zip_filename,
-                                        caption=caption,
-                                        parse_mode=ParseMode.HTML
-                                    )
-                            else:
-                                await update.message.reply_text(
-                                    "❌ <b>Erreur lors de la compression</b>\n"
-                                    "Le fichier ne peut pas être envoyé car il dépasse 50 MB.",
+                        if file_size > ZipCompressor.TELEGRAM_MAX_SIZE:
+                            # Pages stockées sans recompression : le chapitre est découpé, pas compressé
+                            documents = await self._split_chapter_file(update, manga_name, chapter_number, cbz_path, temp_dir)
+                            for document in documents:
+                                await self.sender.reply_document(
+                                    update.message, document['path'],
+                                    filename=document['filename'],
+                                    caption=document['caption'],
                                     parse_mode=ParseMode.HTML
                                 )
                         else:
-                            # Envoyer directement sans compression
-                            await update.message.reply_text(
+                            # Envoyer directement
+                            await self.sender.reply_text(
+                                update.message,
                                 f"🎉 <b>Téléchargement réussi !</b>\n\n"
                                 f"📊 <b>Taille :</b> {file_size_mb:.1f} MB\n"
                                 f"📤 <i>Envoi du fichier CBZ...</i>",
@@ -248,20 +307,25 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
                             # Légende propre pour le fichier
                             caption = format_file_caption(manga_name, f"Chapitre {chapter_number}", file_size_mb, False)
                             
-                            with open(cbz_path, 'rb') as cbz_file:
-                                await update.message.reply_document(
-                                    document=cbz_file,
-                                    filename=clean_filename,
-                                    caption=caption,
-                                    parse_mode=ParseMode.HTML
-                                )
+                            message = await self.sender.reply_document(
+                                update.message, cbz_path,
+                                filename=clean_filename,
+                                caption=caption,
+                                parse_mode=ParseMode.HTML
+                            )
+                            self._remember_document(
+                                manga_name, chapter_number, 'cbz', message, cbz_path,
+                                complete=progress_manager.is_chapter_complete(chapter_number)
+                            )
                     else:
-                        await update.message.reply_text(
+                        await self.sender.reply_text(
+                            update.message,
                             "❌ <b>Erreur :</b> Aucun fichier CBZ généré.",
                             parse_mode=ParseMode.HTML
                         )
                 else:
-                    await update.message.reply_text(
+                    await self.sender.reply_text(
+                        update.message,
                         f"🚫 <b>Téléchargement échoué</b>\n\n"
                         f"🔍 <b>Vérifications suggérées :</b>\n"
                         f"• Nom du manga : <code>{format_clean_message(manga_name)}</code>\n"
@@ -270,50 +334,124 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
                         f"💡 <b>Conseil :</b> Essayez avec l'orthographe exacte du site",
                         parse_mode=ParseMode.HTML
                     )
-                    
-        except ValueError:
-            await update.message.reply_text(
-                "❌ <b>Le numéro de chapitre doit être un nombre entier !</b>\n"
-                "Exemple : <code>/scan blue lock 272</code>",
-                parse_mode=ParseMode.HTML
-            )
+        except CircuitOpenError as e:
+            await self._reply_source_unavailable(update, e.retry_in)
         except Exception as e:
-            await update.message.reply_text(
+            await self.sender.reply_text(
+                update.message,
                 f"❌ <b>Une erreur est survenue :</b> {format_clean_message(str(e))}",
                 parse_mode=ParseMode.HTML
             )
     
-    async def _simulate_download_progress(self, progress_manager):
-        """Simule la progression du téléchargement en temps réel"""
+    async def _reply_source_unavailable(self, update, retry_in):
+        """Répond que la source est en panne, sans mobiliser de worker"""
+        await self.sender.reply_text(
+            update.message,
+            f"🔌 <b>Source indisponible</b>\n\n"
+            f"anime-sama.fr ne répond plus pour le moment.\n"
+            f"<i>Réessayez dans {max(1, round(retry_in))} seconde(s).</i>",
+            parse_mode=ParseMode.HTML
+        )
+    
+    async def _enqueue_job(self, update, name, job_factory):
+        """Met un téléchargement en file et indique sa position à l'utilisateur"""
+        # Source connue en panne : inutile d'occuper une place dans la file
+        retry_in = self.circuit_breaker.retry_in(URLBuilder.BASE_URL)
+        if retry_in > 0:
+            await self._reply_source_unavailable(update, retry_in)
+            return False
+        
+        user = update.effective_user
+        user_id = user.id if user else update.effective_chat.id
+        
+        try:
+            position = self.download_queue.submit(user_id, name, job_factory)
+        except UserJobLimitError as e:
+            await self.sender.reply_text(
+                update.message,
+                f"⏳ <b>Téléchargement déjà en cours</b>\n\n"
+                f"Vous pouvez lancer <b>{e.limit}</b> téléchargement(s) à la fois.\n"
+                f"<i>Attendez la fin du précédent avant d'en demander un autre.</i>",
+                parse_mode=ParseMode.HTML
+            )
+            return False
+        
+        if position > 0:
+            await self.sender.reply_text(
+                update.message,
+                f"📥 <b>Demande mise en file d'attente</b>\n\n"
+                f"🔢 <b>Position :</b> {position}\n"
+                f"<i>Le téléchargement démarrera automatiquement.</i>",
+                parse_mode=ParseMode.HTML
+            )
+        return True
+    
+    async def _send_cached_chapter(self, update, manga_name, chapter_number):
+        """Renvoie un chapitre déjà envoyé par son file_id Telegram (ou son CBZ archivé)"""
+        file_format, entry = self.file_cache.find(manga_name, chapter_number)
+        if not entry:
+            return False
+        
+        file_size_mb = (entry.get('file_size') or 0) / (1024 * 1024)
+        caption = format_file_caption(manga_name, f"Chapitre {chapter_number}", file_size_mb, file_format == 'zip')
+        
         try:
-            phases = [
-                ("🔍 Analyse de la page...", 2),
-                ("📋 Extraction des URLs...", 4), 
-                ("🖼️ Téléchargement Page 1...", 6),
-                ("🖼️ Téléchargement Page 2...", 8),
-                ("🖼️ Téléchargement Page 3...", 10),
-                ("🖼️ Téléchargement Page 4...", 12),
-                ("🖼️ Téléchargement Page 5...", 14),
-                ("🖼️ Téléchargement Page 6...", 16),
-                ("📦 Création du fichier CBZ...", 18),
-                ("✅ Finalisation...", 20)
-            ]
-            
-            for phase_name, progress in phases:
-                await progress_manager.update_image_progress(progress, phase_name, True)
-                await asyncio.sleep(0.5)  # Délai réaliste
-                
-        except asyncio.CancelledError:
-            # La tâche a été annulée quand le téléchargement s'est terminé
-            pass
-
+            await self.sender.reply_document(
+                update.message,
+                document=entry['file_id'],
+                caption=caption,
+                parse_mode=ParseMode.HTML
+            )
+            return True
+        except Exception as e:
+            BeautifulLogger.warning(f"file_id refusé par Telegram ({e}), nouvel envoi nécessaire")
+            self.file_cache.invalidate(manga_name, chapter_number, file_format)
+        
+        # Fallback : réenvoyer le fichier archivé sans refaire le scraping
+        if entry.get('cbz_path'):
+            try:
+                message = await self.sender.reply_document(
+                    update.message, entry['cbz_path'],
+                    filename=format_filename(manga_name, f"Chapitre_{chapter_number}", file_format),
+                    caption=caption,
+                    parse_mode=ParseMode.HTML
+                )
+                self.file_cache.remember_message(manga_name, chapter_number, file_format, message, entry['cbz_path'])
+                return True
+            except Exception as e:
+                BeautifulLogger.warning(f"Envoi du fichier archivé impossible: {e}")
+        
+        return False
+    
+    def _remember_document(self, manga_name, chapter_number, file_format, message, file_path, complete):
+        """
+        Mémorise le file_id d'un document envoyé (et archive le fichier si configuré)
+        Seul un chapitre complet (toutes les pages annoncées téléchargées) est mémorisé
+        """
+        if not complete:
+            BeautifulLogger.warning(f"Chapitre {chapter_number} incomplet, non mémorisé pour renvoi")
+            return
+        
+        archived_path = None
+        if self.archive_dir and file_path and os.path.exists(file_path):
+            try:
+                os.makedirs(self.archive_dir, exist_ok=True)
+                archived_path = os.path.join(self.archive_dir, os.path.basename(file_path))
+                shutil.copyfile(file_path, archived_path)
+            except OSError as e:
+                BeautifulLogger.warning(f"Archivage impossible: {e}")
+                archived_path = None
+        
+        self.file_cache.remember_message(manga_name, chapter_number, file_format, message, archived_path, complete)
+    
     async def multiscan_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Commande /multiscan - Télécharge plusieurs chapitres"""
         if not update.message:
             return
             
         if not context.args or len(context.args) < 3:
-            await update.message.reply_text(
+            await self.sender.reply_text(
+                update.message,
                 "🚫 <b>Commande incomplète !</b>\n\n"
                 "📋 <b>Format attendu :</b>\n"
                 "<code>/multiscan &lt;nom_manga&gt; &lt;début&gt; &lt;fin&gt;</code>\n\n"
@@ -333,19 +471,40 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
             
             # Vérifier la plage de chapitres
             if chapter_start > chapter_end:
-                await update.message.reply_text(
+                await self.sender.reply_text(
+                    update.message,
                     "❌ Le chapitre de début doit être inférieur ou égal au chapitre de fin !"
                 )
                 return
                 
             if chapter_end - chapter_start > 20:
-                await update.message.reply_text(
+                await self.sender.reply_text(
+                    update.message,
                     "❌ Maximum 20 chapitres à la fois pour éviter la surcharge !"
                 )
                 return
             
+            await self._enqueue_job(update, f"multiscan {manga_name} {chapter_start}-{chapter_end}", lambda: self._multiscan_job(update, manga_name, chapter_start, chapter_end))
+            
+        except ValueError:
+            await self.sender.reply_text(
+                update.message,
+                "❌ Les numéros de chapitre doivent être des nombres entiers !\n"
+                "Exemple: `/multiscan lookism 1 5`",
+                parse_mode=ParseMode.MARKDOWN
+            )
+        except Exception as e:
+            await self.sender.reply_text(
+                update.message,
+                f"❌ Une erreur est survenue: {str(e)}"
+            )
+
+    async def _multiscan_job(self, update, manga_name, chapter_start, chapter_end):
+        """Job de /multiscan : télécharge et envoie une plage de chapitres (exécuté par la file)"""
+        try:
             total_chapters = chapter_end - chapter_start + 1
-            await update.message.reply_text(
+            await self.sender.reply_text(
+                update.message,
                 f"🎯 <b>Téléchargement multiple en cours...</b>\n\n"
                 f"📖 <b>Manga :</b> {format_clean_message(manga_name)}\n"
                 f"📄 <b>Chapitres :</b> {chapter_start} à {chapter_end} <i>({total_chapters} chapitres)</i>\n\n"
@@ -353,84 +512,56 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
                 parse_mode=ParseMode.HTML
             )
             
-            # Créer un répertoire temporaire pour tous les téléchargements
-            with tempfile.TemporaryDirectory() as temp_dir:
-                scraper = AnimeSamaScraper(
-                    output_dir=temp_dir,
-                    temp_dir=os.path.join(temp_dir, "temp"),
-                    verbose=False
+            # Chapitres déjà envoyés : renvoi instantané par file_id
+            resent_chapters = []
+            chapters_to_download = []
+            for chapter_num in range(chapter_start, chapter_end + 1):
+                if await self._send_cached_chapter(update, manga_name, chapter_num):
+                    resent_chapters.append(chapter_num)
+                else:
+                    chapters_to_download.append(chapter_num)
+            
+            # Répertoire propre au job, le scraper (et ses connexions) est partagé
+            with self.scraper_service.job_directory() as temp_dir:
+                # Télécharger uniquement les chapitres absents du cache
+                progress_manager = TelegramDownloadProgress(
+                    update,
+                    manga_name,
+                    f"Chapitres {chapter_start}-{chapter_end}",
+                    total_chapters=len(chapters_to_download),
+                    sender=self.sender
                 )
+                progress_callback = progress_manager.event_callback()
                 
-                successful_downloads = []
-                failed_downloads = []
-                
-                # Utiliser la nouvelle méthode de téléchargement multiple avec progression
-                successful_downloads, failed_downloads = scraper.download_multiple_chapters(
-                    manga_name, chapter_start, chapter_end
-                )
+                # Pipeline : chaque CBZ est envoyé dès qu'il est prêt, pendant que
+                # les chapitres suivants se téléchargent
+                loop = asyncio.get_running_loop()
+                ready_chapters = asyncio.Queue()
                 
-                # Envoyer les fichiers CBZ créés
-                cbz_files = [f for f in os.listdir(temp_dir) if f.endswith('.cbz')]
-                cbz_files.sort()  # Trier par nom pour un ordre logique
+                def chapter_callback(chapter_num, cbz_path):
+                    # Appelé depuis les threads du scraper, après les événements du chapitre
+                    if cbz_path:
+                        complete = progress_manager.is_chapter_complete(chapter_num)
+                        loop.call_soon_threadsafe(ready_chapters.put_nowait, (chapter_num, cbz_path, complete))
                 
-                if cbz_files:
-                    await update.message.reply_text(
-                        f"🎉 <b>{len(successful_downloads)} chapitres téléchargés !</b>\n\n"
-                        f"📤 <b>Envoi des fichiers CBZ...</b>",
-                        parse_mode=ParseMode.HTML
+                sender = asyncio.create_task(
+                    self._send_ready_chapters(update, manga_name, ready_chapters, temp_dir)
+                )
+                try:
+                    successful_downloads, failed_downloads = await self.download_queue.run_blocking(
+                        self.scraper_service.download_chapter_list, manga_name, chapters_to_download, temp_dir,
+                        progress_callback=progress_callback, chapter_callback=chapter_callback
                     )
-                    
-                    for cbz_file in cbz_files:
-                        cbz_path = os.path.join(temp_dir, cbz_file)
-                        file_size = os.path.getsize(cbz_path)
-                        file_size_mb = file_size / (1024 * 1024)
-                        
-                        # Nom de fichier propre  
-                        clean_filename = format_filename(manga_name, f"Ch_{os.path.splitext(cbz_file)[0].split('_')[-1]}")
-                        
-                        # Vérifier si compression nécessaire
-                        if ZipCompressor.should_compress_for_telegram(cbz_path):
-                            await update.message.reply_text(
-                                f"📦 <b>{cbz_file}</b> - Compression nécessaire ({file_size_mb:.1f} MB)",
-                                parse_mode=ParseMode.HTML
-                            )
-                            
-                            # Compresser le fichier
-                            result = ZipCompressor.compress_file(cbz_path, temp_dir)
-                            if result:
-                                zip_path, orig_mb, comp_mb, ratio = result
-                                
-                                # Légende propre
-                                caption = format_file_caption(manga_name, f"Chapitre inclus", comp_mb, True)
-                                
-                                # Envoyer le fichier compressé
-                                with open(zip_path, 'rb') as f:
-                                    await update.message.reply_document(
-                                        document=f,
-                                        filename=os.path.basename(zip_path),
-                                        caption=caption,
-                                        parse_mode=ParseMode.HTML
-                                    )
-                            else:
-                                await update.message.reply_text(
-                                    f"❌ Erreur compression {cbz_file} - Fichier ignoré",
-                                    parse_mode=ParseMode.HTML
-                                )
-                        else:
-                            # Légende propre
-                            caption = format_file_caption(manga_name, f"Chapitre inclus", file_size_mb, False)
-                            
-                            # Envoyer directement
-                            with open(cbz_path, 'rb') as f:
-                                await update.message.reply_document(
-                                    document=f,
-                                    filename=clean_filename,
-                                    caption=caption,
-                                    parse_mode=ParseMode.HTML
-                                )
-                            
-                        # Petite pause pour éviter la limite de débit
-                        await asyncio.sleep(1)
+                finally:
+                    await progress_manager.close_events()
+                    # Marque de fin placée après les chapitres déjà signalés (file FIFO de la boucle)
+                    loop.call_soon_threadsafe(ready_chapters.put_nowait, None)
+                    # Attendre l'envoi sans lever son exception : elle masquerait le résultat du téléchargement
+                    await asyncio.wait([sender])
+                    if not sender.cancelled() and sender.exception() is not None:
+                        await self._report_sender_failure(update, sender.exception())
+                
+                successful_downloads = sorted(resent_chapters + successful_downloads)
                 
                 # Résumé final
                 summary = f"📊 <b>RÉSUMÉ DU TÉLÉCHARGEMENT</b>\n\n"
@@ -439,26 +570,176 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
                     summary += f"❌ <b>Échecs :</b> <code>{len(failed_downloads)}</code> chapitres ({', '.join(map(str, failed_downloads))})\n"
                 summary += f"\n🎉 <b>Téléchargement terminé !</b>"
                 
-                await update.message.reply_text(summary, parse_mode=ParseMode.HTML)
-                
-        except ValueError:
-            await update.message.reply_text(
-                "❌ Les numéros de chapitre doivent être des nombres entiers !\n"
-                "Exemple: `/multiscan lookism 1 5`",
-                parse_mode=ParseMode.MARKDOWN
-            )
+                await self.sender.reply_text(update.message, summary, parse_mode=ParseMode.HTML)
+        except CircuitOpenError as e:
+            await self._reply_source_unavailable(update, e.retry_in)
         except Exception as e:
-            await update.message.reply_text(
+            await self.sender.reply_text(
+                update.message,
                 f"❌ Une erreur est survenue: {str(e)}"
             )
 
+    async def _send_ready_chapters(self, update, manga_name, ready_chapters, temp_dir):
+        """Envoie les chapitres de /multiscan au fil de l'eau, jusqu'à la marque de fin (None)"""
+        # Le cadencement est assuré par self.sender (limites Telegram par conversation)
+        finished = False
+        while not finished:
+            item = await ready_chapters.get()
+            if item is None:
+                return
+            batch = [item]
+            
+            # Chapitres prêts pendant l'envoi précédent : regroupés dans un même album
+            while len(batch) < MEDIA_GROUP_SIZE and not ready_chapters.empty():
+                item = ready_chapters.get_nowait()
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+            
+            # Les chapitres se terminent dans le désordre : l'album suit l'ordre de lecture
+            batch.sort(key=lambda ready: ready[0])
+            await self._send_chapter_batch(update, manga_name, batch, temp_dir)
+    
+    async def _send_chapter_batch(self, update, manga_name, batch, temp_dir):
+        """Envoie des chapitres de /multiscan en albums (les chapitres découpés en plusieurs parties)"""
+        documents = []
+        for chapter_num, cbz_path, complete in batch:
+            try:
+                chapter_documents = await self._prepare_chapter_file(update, manga_name, chapter_num, cbz_path, temp_dir)
+                for document in chapter_documents:
+                    document['complete'] = complete
+                documents.extend(chapter_documents)
+            except Exception as e:
+                await self._report_send_failure(update, chapter_num, e)
+        
+        # Tous les fichiers sont sous la limite Telegram : albums de MEDIA_GROUP_SIZE au plus
+        for start in range(0, len(documents), MEDIA_GROUP_SIZE):
+            await self._send_documents(update, manga_name, documents[start:start + MEDIA_GROUP_SIZE])
+    
+    async def _send_documents(self, update, manga_name, documents):
+        """Envoie jusqu'à MEDIA_GROUP_SIZE fichiers en un album, un par un si l'album est refusé"""
+        if len(documents) >= 2:
+            try:
+                messages = await self.sender.reply_media_group(
+                    update.message,
+                    [(document['path'], document['filename'], document['caption']) for document in documents],
+                    parse_mode=ParseMode.HTML
+                )
+                for document, message in zip(documents, messages):
+                    self._remember_sent(manga_name, document, message)
+                return
+            except BadRequest as e:
+                # Album refusé (rien n'a été publié) : envoi chapitre par chapitre
+                BeautifulLogger.warning(f"Album refusé par Telegram ({e}), envoi chapitre par chapitre")
+            except Exception as e:
+                # Délai dépassé ou coupure : l'album a pu être publié, le renvoyer le doublerait
+                for chapter_num in dict.fromkeys(document['chapter'] for document in documents):
+                    await self._report_send_failure(update, chapter_num, e)
+                return
+        
+        for document in documents:
+            try:
+                message = await self.sender.reply_document(
+                    update.message, document['path'],
+                    filename=document['filename'],
+                    caption=document['caption'],
+                    parse_mode=ParseMode.HTML
+                )
+                self._remember_sent(manga_name, document, message)
+            except Exception as e:
+                await self._report_send_failure(update, document['chapter'], e)
+    
+    def _remember_sent(self, manga_name, document, message):
+        # Une partie de chapitre découpé n'est pas réutilisable seule : pas de file_id mémorisé
+        if document['format']:
+            self._remember_document(
+                manga_name, document['chapter'], document['format'], message, document['path'], document['complete']
+            )
+    
+    async def _report_sender_failure(self, update, error):
+        """L'envoi au fil de l'eau s'est arrêté : les chapitres suivants n'ont pas été envoyés"""
+        BeautifulLogger.error(f"Envoi des chapitres interrompu: {error}")
+        await self.sender.reply_text(
+            update.message,
+            f"❌ Envoi des chapitres interrompu : {format_clean_message(str(error))}\n"
+            f"<i>Les chapitres restants n'ont pas été envoyés, relancez la commande pour les recevoir.</i>",
+            parse_mode=ParseMode.HTML
+        )
+    
+    async def _report_send_failure(self, update, chapter_num, error):
+        BeautifulLogger.error(f"Envoi du chapitre {chapter_num} échoué: {error}")
+        await self.sender.reply_text(
+            update.message,
+            f"❌ Envoi du chapitre {chapter_num} échoué : {format_clean_message(str(error))}",
+            parse_mode=ParseMode.HTML
+        )
+    
+    async def _prepare_chapter_file(self, update, manga_name, chapter_num, cbz_path, temp_dir):
+        """
+        Prépare les fichiers d'un chapitre de /multiscan, découpé s'il dépasse la limite Telegram
+        
+        Returns:
+            list: Un dict par fichier à envoyer (chemin, nom, légende, format et taille)
+        """
+        file_size = os.path.getsize(cbz_path)
+        if file_size > ZipCompressor.TELEGRAM_MAX_SIZE:
+            return await self._split_chapter_file(update, manga_name, chapter_num, cbz_path, temp_dir)
+        
+        return [{
+            'chapter': chapter_num,
+            'path': cbz_path,
+            'filename': format_filename(manga_name, f"Ch_{chapter_num}"),
+            'caption': format_file_caption(manga_name, f"Chapitre {chapter_num}", file_size / (1024 * 1024), False),
+            'format': 'cbz',
+            'size': file_size,
+        }]
+    
+    async def _split_chapter_file(self, update, manga_name, chapter_num, cbz_path, temp_dir):
+        """
+        Découpe par pages un CBZ au-delà de la limite Telegram (les pages, déjà compressées,
+        sont stockées telles quelles : une compression ZIP ne réduirait pas le fichier)
+        
+        Returns:
+            list: Un dict par partie, au format de _prepare_chapter_file() (format None : partie non mémorisée)
+        
+        Raises:
+            ValueError: Si une page dépasse à elle seule la limite
+        """
+        file_size_mb = os.path.getsize(cbz_path) / (1024 * 1024)
+        await self.sender.reply_text(
+            update.message,
+            f"✂️ <b>Chapitre {chapter_num}</b> - {file_size_mb:.1f} MB, envoi en plusieurs parties",
+            parse_mode=ParseMode.HTML
+        )
+        
+        piece_paths = await self.download_queue.run_blocking(
+            VolumePacker().split_cbz, cbz_path, temp_dir, ZipCompressor.TELEGRAM_MAX_SIZE
+        )
+        documents = []
+        for index, piece_path in enumerate(piece_paths, 1):
+            piece_size = os.path.getsize(piece_path)
+            documents.append({
+                'chapter': chapter_num,
+                'path': piece_path,
+                'filename': format_filename(manga_name, f"Ch_{chapter_num}_partie_{index}"),
+                'caption': format_file_caption(
+                    manga_name, f"Chapitre {chapter_num} - Partie {index}/{len(piece_paths)}",
+                    piece_size / (1024 * 1024), False
+                ),
+                'format': None,
+                'size': piece_size,
+            })
+        return documents
+    
     async def tome_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Commande /tome - Télécharge un tome complet (10 chapitres dans un ZIP)"""
         if not update.message:
             return
             
         if not context.args or len(context.args) < 2:
-            await update.message.reply_text(
+            await self.sender.reply_text(
+                update.message,
                 "🚫 <b>Commande incomplète !</b>\n\n"
                 "📋 <b>Format attendu :</b>\n"
                 "<code>/tome &lt;nom_manga&gt; &lt;numéro_tome&gt;</code>\n\n"
@@ -466,7 +747,7 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
                 "• <code>/tome blue lock 1</code> <i>(chapitres 1-10)</i>\n"
                 "• <code>/tome lookism 3</code> <i>(chapitres 21-30)</i>\n"
                 "• <code>/tome one piece 5</code> <i>(chapitres 41-50)</i>\n\n"
-                "📦 <b>Format :</b> Tome complet dans un fichier ZIP",
+                "📦 <b>Format :</b> Tome complet en ZIP (parties de 50 MB max)",
                 parse_mode=ParseMode.HTML
             )
             return
@@ -476,143 +757,128 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
             tome_number = int(context.args[-1])
             manga_name = " ".join(context.args[:-1])
             
+            await self._enqueue_job(update, f"tome {manga_name} {tome_number}", lambda: self._tome_job(update, manga_name, tome_number))
+            
+        except ValueError:
+            await self.sender.reply_text(
+                update.message,
+                "❌ Le numéro de tome doit être un nombre entier !\n"
+                "Exemple: `/tome blue lock 1`",
+                parse_mode=ParseMode.MARKDOWN
+            )
+        except Exception as e:
+            await self.sender.reply_text(
+                update.message,
+                f"❌ Une erreur est survenue: {str(e)}"
+            )
+
+    async def _tome_job(self, update, manga_name, tome_number):
+        """Job de /tome : télécharge un tome et l'envoie en volumes ZIP (exécuté par la file)"""
+        try:
             # Calculer la plage de chapitres pour ce tome
             chapter_start = (tome_number - 1) * 10 + 1
             chapter_end = tome_number * 10
             
-            await update.message.reply_text(
+            await self.sender.reply_text(
+                update.message,
                 f"📦 <b>Téléchargement du tome {tome_number}</b>\n\n"
                 f"📖 <b>Manga :</b> {format_clean_message(manga_name)}\n"
                 f"📄 <b>Chapitres :</b> {chapter_start} à {chapter_end} <i>(10 chapitres)</i>\n"
-                f"🗜️ <b>Format :</b> ZIP contenant les CBZ\n\n"
+                f"🗜️ <b>Format :</b> ZIP contenant les CBZ (parties de 50 MB max)\n\n"
                 f"⏳ <i>Cela peut prendre 5-10 minutes...</i>",
                 parse_mode=ParseMode.HTML
             )
             
-            # Créer un répertoire temporaire pour tous les téléchargements
-            with tempfile.TemporaryDirectory() as temp_dir:
-                scraper = AnimeSamaScraper(
-                    output_dir=temp_dir,
-                    temp_dir=os.path.join(temp_dir, "temp"),
-                    verbose=False
-                )
-                
+            # Répertoire propre au job, le scraper (et ses connexions) est partagé
+            with self.scraper_service.job_directory() as temp_dir:
                 successful_downloads = []
                 failed_downloads = []
                 
                 # Utiliser la nouvelle méthode de téléchargement multiple avec progression pour le tome
-                successful_downloads, failed_downloads = scraper.download_multiple_chapters(
-                    manga_name, chapter_start, chapter_end
+                progress_manager = TelegramDownloadProgress(
+                    update,
+                    manga_name,
+                    f"Tome {tome_number}",
+                    total_chapters=chapter_end - chapter_start + 1,
+                    sender=self.sender
                 )
+                progress_callback = progress_manager.event_callback()
+                try:
+                    successful_downloads, failed_downloads = await self.download_queue.run_blocking(
+                        self.scraper_service.download_multiple_chapters, manga_name, chapter_start, chapter_end, temp_dir,
+                        progress_callback=progress_callback
+                    )
+                finally:
+                    await progress_manager.close_events()
                 
-                # Vérifier s'il y a des fichiers CBZ créés
-                cbz_files = [f for f in os.listdir(temp_dir) if f.endswith('.cbz')]
+                # CBZ dans l'ordre des chapitres
+                cbz_paths = [
+                    path for path in (
+                        self.scraper_service.get_cbz_path(manga_name, chapter, temp_dir)
+                        for chapter in sorted(successful_downloads)
+                    )
+                    if os.path.exists(path)
+                ]
                 
-                if cbz_files:
-                    # Créer le fichier ZIP du tome
+                if cbz_paths:
                     sanitized_name = manga_name.replace(" ", "_").replace("/", "_")
-                    zip_filename = f"{sanitized_name}_Tome_{tome_number}.zip"
-                    zip_path = os.path.join(temp_dir, zip_filename)
+                    total_orig_mb = sum(os.path.getsize(path) for path in cbz_paths) / (1024 * 1024)
                     
-                    await update.message.reply_text(
+                    await self.sender.reply_text(
+                        update.message,
                         f"📦 **Création du tome ZIP en cours...**\n"
                         f"✅ **{len(successful_downloads)} chapitres** téléchargés\n"
-                        f"🗜️ **Compression** des CBZ dans le ZIP...",
+                        f"📊 **Taille totale :** `{total_orig_mb:.1f} MB`",
                         parse_mode=ParseMode.MARKDOWN
                     )
                     
-                    # Utiliser le nouveau système de compression pour le tome
-                    cbz_paths = [os.path.join(temp_dir, cbz_file) for cbz_file in cbz_files]
-                    result = ZipCompressor.compress_multiple_files(
-                        cbz_paths, 
-                        f"{sanitized_name}_Tome_{tome_number}", 
-                        temp_dir
-                    )
+                    # Volumes de 50 MB max : plus de double compression ni d'envoi refusé
+                    try:
+                        volumes = await self.download_queue.run_blocking(
+                            VolumePacker().pack_files,
+                            cbz_paths,
+                            f"{sanitized_name}_Tome_{tome_number}",
+                            temp_dir
+                        )
+                    except (OSError, ValueError, zipfile.BadZipFile) as e:
+                        BeautifulLogger.error(f"Erreur lors du découpage du tome: {e}")
+                        await self.sender.reply_text(update.message, "❌ **Erreur lors de la création du tome ZIP**")
+                        return
+                    
+                    if len(volumes) > 1:
+                        await self.sender.reply_text(
+                            update.message,
+                            f"✂️ **Tome découpé en {len(volumes)} parties**\n"
+                            f"📦 *Limite Telegram : 50 MB par fichier*",
+                            parse_mode=ParseMode.MARKDOWN
+                        )
                     
-                    if result:
-                        zip_path, total_orig_mb, compressed_mb, file_count = result
+                    for volume in volumes:
+                        title = f"Tome {tome_number}"
+                        if volume['parts'] > 1:
+                            title += f" (partie {volume['part']}/{volume['parts']})"
                         
-                        # Vérifier si le fichier compressé respecte la limite Telegram
-                        if ZipCompressor.should_compress_for_telegram(zip_path):
-                            await update.message.reply_text(
-                                f"⚠️ **Tome très volumineux !**\n\n"
-                                f"📊 **Taille compressée :** `{compressed_mb:.1f} MB`\n"
-                                f"🔄 **Compression supplémentaire en cours...**",
-                                parse_mode=ParseMode.MARKDOWN
-                            )
-                            
-                            # Double compression si nécessaire
-                            final_result = ZipCompressor.compress_file(zip_path, temp_dir)
-                            if final_result:
-                                final_zip_path, _, final_mb, _ = final_result
-                                
-                                if final_mb > 50:
-                                    await update.message.reply_text(
-                                        f"🚫 **Tome impossible à envoyer**\n\n"
-                                        f"📊 **Taille finale :** `{final_mb:.1f} MB`\n"
-                                        f"⚠️ **Dépasse encore la limite**\n\n"
-                                        f"💡 **Utilisez `/multiscan {manga_name} {chapter_start} {chapter_end}` pour envoyer les chapitres séparément**",
-                                        parse_mode=ParseMode.MARKDOWN
-                                    )
-                                    return
-                                
-                                # Envoyer le fichier double-compressé
-                                await update.message.reply_text(
-                                    f"📦 **Tome super-compressé !**\n\n"
-                                    f"📊 **Taille originale :** `{total_orig_mb:.1f} MB`\n"
-                                    f"📦 **Taille finale :** `{final_mb:.1f} MB`\n"
-                                    f"📤 **Envoi en cours...**",
-                                    parse_mode=ParseMode.MARKDOWN
-                                )
-                                
-                                with open(final_zip_path, 'rb') as zip_file:
-                                    await update.message.reply_document(
-                                        document=zip_file,
-                                        filename=os.path.basename(final_zip_path),
-                                        caption=f"📦 **{manga_name} - Tome {tome_number}**\n"
-                                               f"📚 *{file_count} chapitres ({chapter_start}-{chapter_end})*\n"
-                                               f"📦 *Super-compressé: {total_orig_mb:.1f}→{final_mb:.1f} MB*\n"
-                                               f"🎌 *Collection depuis anime-sama.fr*"
-                                    )
-                            else:
-                                await update.message.reply_text("❌ **Erreur lors de la compression supplémentaire**")
-                                return
-                        else:
-                            # Envoyer le fichier normalement compressé
-                            compression_ratio = ((total_orig_mb - compressed_mb) / total_orig_mb) * 100
-                            await update.message.reply_text(
-                                f"🎉 **Tome {tome_number} créé avec succès !**\n\n"
-                                f"📊 **Taille originale :** `{total_orig_mb:.1f} MB`\n"
-                                f"📦 **Taille compressée :** `{compressed_mb:.1f} MB`\n"
-                                f"✅ **Réduction :** `{compression_ratio:.1f}%`\n"
-                                f"📤 **Envoi du tome ZIP...**",
-                                parse_mode=ParseMode.MARKDOWN
-                            )
-                            
-                            with open(zip_path, 'rb') as zip_file:
-                                await update.message.reply_document(
-                                    document=zip_file,
-                                    filename=os.path.basename(zip_path),
-                                    caption=f"📦 **{manga_name} - Tome {tome_number}**\n"
-                                           f"📚 *{file_count} chapitres ({chapter_start}-{chapter_end})*\n"
-                                           f"📦 *Compressé: {total_orig_mb:.1f}→{compressed_mb:.1f} MB*\n"
-                                           f"🎌 *Collection depuis anime-sama.fr*"
-                                )
-                    else:
-                        await update.message.reply_text("❌ **Erreur lors de la création du tome ZIP**")
+                        await self.sender.reply_document(
+                            update.message, volume['path'],
+                            filename=os.path.basename(volume['path']),
+                            caption=f"📦 **{manga_name} - {title}**\n"
+                                   f"📚 *{len(volume['files'])} fichiers CBZ ({volume['size_mb']:.1f} MB)*\n"
+                                   f"🎌 *Collection depuis anime-sama.fr*"
+                        )
                     
                     # Résumé final
                     summary = f"📊 **RÉSUMÉ DU TOME {tome_number}**\n\n"
                     summary += f"✅ **Téléchargés :** `{len(successful_downloads)}` chapitres\n"
                     if failed_downloads:
                         summary += f"❌ **Échecs :** `{len(failed_downloads)}` chapitres ({', '.join(map(str, failed_downloads))})\n"
-                    summary += f"📦 **Format :** ZIP avec {len(cbz_files)} fichiers CBZ\n"
+                    summary += f"📦 **Format :** {len(volumes)} ZIP avec {len(cbz_paths)} fichiers CBZ\n"
                     summary += f"\n🎉 **Tome complet envoyé !**"
                     
-                    await update.message.reply_text(summary, parse_mode=ParseMode.MARKDOWN)
+                    await self.sender.reply_text(update.message, summary, parse_mode=ParseMode.MARKDOWN)
                     
                 else:
-                    await update.message.reply_text(
+                    await self.sender.reply_text(
+                        update.message,
                         f"🚫 **Aucun chapitre téléchargé**\n\n"
                         f"🔍 **Vérifications suggérées :**\n"
                         f"• Nom du manga : `{manga_name}`\n"
@@ -621,18 +887,87 @@ Je suis votre assistant personnel pour télécharger vos manga préférés depui
                         f"💡 **Conseil :** Vérifiez si ces chapitres existent",
                         parse_mode=ParseMode.MARKDOWN
                     )
-                    
-        except ValueError:
-            await update.message.reply_text(
-                "❌ Le numéro de tome doit être un nombre entier !\n"
-                "Exemple: `/tome blue lock 1`",
-                parse_mode=ParseMode.MARKDOWN
-            )
+        except CircuitOpenError as e:
+            await self._reply_source_unavailable(update, e.retry_in)
         except Exception as e:
-            await update.message.reply_text(
+            await self.sender.reply_text(
+                update.message,
                 f"❌ Une erreur est survenue: {str(e)}"
             )
 
+async def serve(application, webhook_url=None, health=None):
+    """
+    Sert le bot jusqu'à SIGINT/SIGTERM
+    
+    Un serveur HTTP asyncio, dans la même boucle que l'Application, répond aux contrôles
+    de santé dès le lancement (503 jusqu'à ce que le bot soit prêt).
+    Avec webhook_url, les mises à jour arrivent sur <webhook_url>/webhook via ce serveur.
+    Sans webhook_url, ou si Telegram refuse le webhook : long polling.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    
+    health = health or create_health_monitor()
+    health.start()
+    
+    server = WebServer(port=int(os.getenv('PORT', 5000)), verbose=True)
+    add_health_routes(server, health)
+    # Jeton secret : seules les requêtes de Telegram sont acceptées
+    secret_token = os.getenv('WEBHOOK_SECRET') or secrets.token_urlsafe(32)
+    if webhook_url:
+        server.route('POST', WEBHOOK_PATH, telegram_webhook_handler(application, secret_token))
+    try:
+        await server.start()
+    except OSError as e:
+        BeautifulLogger.warning(f"Serveur HTTP indisponible ({e}) : ni contrôles de santé ni webhook")
+        server = None
+    
+    try:
+        async with application:
+            await application.start()
+            
+            webhook_active = False
+            if webhook_url and server is not None:
+                try:
+                    await application.bot.set_webhook(
+                        url=webhook_url.rstrip('/') + WEBHOOK_PATH,
+                        secret_token=secret_token,
+                        allowed_updates=['message', 'callback_query'],
+                        drop_pending_updates=True
+                    )
+                    webhook_active = True
+                    BeautifulLogger.success(f"Mode webhook actif : {webhook_url.rstrip('/')}{WEBHOOK_PATH}")
+                except Exception as e:
+                    BeautifulLogger.warning(f"Webhook refusé ({e}), repli sur le polling")
+            
+            if not webhook_active:
+                # Long polling : la requête getUpdates rend la main dès qu'un message arrive
+                await application.updater.start_polling(
+                    poll_interval=0.0,
+                    timeout=30,
+                    drop_pending_updates=True
+                )
+                BeautifulLogger.success("Mode polling actif")
+            
+            health.mark_ready('webhook' if webhook_active else 'polling')
+            BeautifulLogger.success("Bot actif - En attente des messages...")
+            print("─" * 50)
+            try:
+                await stop.wait()
+            finally:
+                if application.updater.running:
+                    await application.updater.stop()
+                await application.stop()
+    finally:
+        if server is not None:
+            await server.stop()
+        await health.stop()
+
 def main():
     """Fonction principale pour démarrer le bot"""
     try:
@@ -644,15 +979,14 @@ def main():
         # Améliorer les logs de démarrage
         from utils.beautiful_progress import BeautifulLogger
         
-        BeautifulLogger.info("Démarrage du serveur Flask...", "🌐")
-        # Démarrer le serveur web pour keep_alive (nécessaire pour Railway health check)
-        keep_alive()
+        # Mode webhook si WEBHOOK_URL est défini (URL publique du déploiement), polling sinon
+        webhook_url = os.getenv('WEBHOOK_URL')
         
         BeautifulLogger.info("Création de l'application Telegram...", "🔧")
         # Créer l'application bot avec configuration simplifiée
         try:
-            # Configuration minimale pour éviter les conflits
-            application = Application.builder().token(TELEGRAM_TOKEN).concurrent_updates(False).build()
+            # Handlers concurrents : les téléchargements passent par la file de jobs
+            application = Application.builder().token(TELEGRAM_TOKEN).concurrent_updates(True).build()
             BeautifulLogger.success("Application Telegram créée avec succès")
         except Exception as e:
             BeautifulLogger.error(f"Erreur lors de la création de l'application: {e}")
@@ -675,7 +1009,8 @@ def main():
             application.add_handler(CommandHandler("scan", bot.scan_command))
             application.add_handler(CommandHandler("multiscan", bot.multiscan_command))
             application.add_handler(CommandHandler("tome", bot.tome_command))
-            BeautifulLogger.success("5 commandes configurées (/start, /help, /scan, /multiscan, /tome)")
+            application.add_handler(CommandHandler("stats", bot.stats_command))
+            BeautifulLogger.success("6 commandes configurées (/start, /help, /scan, /multiscan, /tome, /stats)")
         except Exception as e:
             BeautifulLogger.error(f"Erreur lors de la configuration des commandes: {e}")
             return
@@ -683,22 +1018,15 @@ def main():
         BeautifulLogger.success("Bot Telegram prêt !", "🚀")
         BeautifulLogger.info("Envoyez /start à votre bot pour commencer", "📱")
         
-        # Attendre un peu pour éviter les conflits de démarrage
-        import time
-        time.sleep(2)
+        # Contrôles de santé : retard de boucle, file de jobs et envois du bot
+        health = create_health_monitor(bot.download_queue, bot.sender)
         
         # Démarrer le bot simplement dans le thread principal
         try:
-            BeautifulLogger.info("Démarrage en mode polling...", "🚀")
-            BeautifulLogger.success("Bot actif - En attente des messages...")
-            print("─" * 50)
-            
-            # Démarrer directement dans le thread principal (solution la plus simple)
-            application.run_polling(
-                poll_interval=3.0,
-                timeout=30,
-                drop_pending_updates=True
-            )
+            BeautifulLogger.info(f"Démarrage en mode {'webhook' if webhook_url else 'polling'}...", "🚀")
+            asyncio.run(serve(application, webhook_url, health))
+            # Boucle et connexions du moteur HTTP asynchrone (si activé)
+            bot.scraper_service.close()
             
         except Exception as e:
             BeautifulLogger.error(f"Erreur lors du démarrage: {e}")
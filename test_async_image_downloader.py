@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Test du moteur HTTP asynchrone (AsyncImageDownloader sur un transport simulé)
+"""
+
+import os
+import asyncio
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from scraper.async_image_downloader import AsyncImageDownloader
+from scraper.anime_sama_scraper import AnimeSamaScraper
+from scraper.scraper_service import ScraperService
+from utils.http_transport import AsyncTransport, TransportResponse
+from utils.retry_policy import RetryPolicy
+from utils.beautiful_progress import BeautifulLogger
+
+JPEG = b'\xff\xd8\xff\xe0' + b'x' * 2000
+
+# Reprises immédiates : les tests ne dorment pas
+NO_DELAY = RetryPolicy(max_delay=0, max_retry_after=0)
+
+
+class FakeResponse(TransportResponse):
+    def __init__(self, url, status_code=200, body=JPEG, content_type='image/jpeg'):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {'Content-Type': content_type}
+        self.body = body
+
+    async def aread(self):
+        return self.body
+
+    async def aiter_bytes(self, chunk_size=8192):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+class FakeTransport(AsyncTransport):
+    """Répond via handler(url, headers) après un délai, en comptant les requêtes en vol"""
+
+    def __init__(self, handler, latency=0.0):
+        self.handler = handler
+        self.latency = latency
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @asynccontextmanager
+    async def stream(self, url, headers=None, timeout=30):
+        self.requests.append((url, dict(headers or {})))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            yield self.handler(url, headers or {})
+        finally:
+            self.in_flight -= 1
+
+
+def test_many_pages_in_flight_on_one_loop():
+    """Des centaines de requêtes sont en vol simultanément sur une seule boucle"""
+    transport = FakeTransport(lambda url, headers: FakeResponse(url), latency=0.05)
+    downloader = AsyncImageDownloader(transport, headers={'User-Agent': 'test'})
+
+    async def run():
+        return await asyncio.gather(*(
+            downloader.fetch_image(f"https://cdn.example.com/page_{i}.jpg") for i in range(300)
+        ))
+
+    results = asyncio.run(run())
+
+    assert all(data == JPEG for data in results)
+    assert transport.max_in_flight == 300
+
+
+def test_google_drive_html_page_is_followed():
+    """Une petite page HTML Google Drive mène à l'URL de téléchargement direct"""
+    file_id = "abcDEF123"
+    direct_url = f"https://drive.google.com/uc?export=download&id={file_id}&confirm=t"
+
+    def handler(url, headers):
+        if url == direct_url:
+            return FakeResponse(url)
+        html = f'<html>"downloadUrl":"{direct_url}"</html>'.encode()
+        return FakeResponse(url, body=html, content_type='text/html')
+
+    transport = FakeTransport(handler)
+    downloader = AsyncImageDownloader(transport)
+
+    data = asyncio.run(downloader.fetch_image(f"https://drive.google.com/open?id={file_id}"))
+
+    assert data == JPEG
+    assert [url for url, _ in transport.requests][-1] == direct_url
+    assert transport.requests[0][1]['Referer'].endswith(f"/file/d/{file_id}/view")
+
+
+def test_forbidden_rotates_headers_and_retries():
+    """Un 403 change l'identité du client puis la requête est rejouée"""
+    calls = []
+
+    def handler(url, headers):
+        calls.append(headers['User-Agent'])
+        return FakeResponse(url, status_code=403 if len(calls) == 1 else 200)
+
+    transport = FakeTransport(handler)
+    downloader = AsyncImageDownloader(transport, headers={'User-Agent': 'blocked-agent'}, retry_policy=NO_DELAY)
+
+    data = asyncio.run(downloader.fetch_image("https://cdn.example.com/page.jpg"))
+
+    assert data == JPEG
+    assert calls[0] == 'blocked-agent'
+    assert calls[1] != 'blocked-agent'
+
+
+def test_failure_returns_none_after_retries():
+    """Après épuisement des tentatives, fetch_image retourne None"""
+    transport = FakeTransport(lambda url, headers: FakeResponse(url, status_code=500))
+    downloader = AsyncImageDownloader(transport, retry_policy=NO_DELAY)
+
+    assert asyncio.run(downloader.fetch_image("https://cdn.example.com/page.jpg", max_retries=3)) is None
+    assert len(transport.requests) == 3
+
+
+def test_scraper_async_engine_builds_cbz():
+    """Le scraper en moteur 'async' produit le même CBZ que le moteur à threads"""
+    original_fetch = AsyncImageDownloader.fetch_image
+
+    async def fake_fetch(self, url, name="", max_retries=5, retry_budget=None):
+        await asyncio.sleep(0.01)
+        return JPEG + url.encode()
+
+    AsyncImageDownloader.fetch_image = fake_fetch
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            scraper = AnimeSamaScraper(
+                output_dir=temp_dir,
+                temp_dir=os.path.join(temp_dir, "temp"),
+                use_page_cache=False,
+                min_request_interval=0,
+                http_engine="async"
+            )
+            urls = [f"https://cdn.example.com/page_{i}.jpg" for i in range(12)]
+            scraper.get_episodes_index = lambda manga_name, max_retries=2, retry_budget=None: {1: urls}
+
+            successful, failed = scraper.download_chapter_list("lookism", [1])
+            scraper.async_engine.close()
+            assert successful == [1]
+            with zipfile.ZipFile(scraper.get_cbz_path("lookism", 1)) as cbz:
+                names = sorted(cbz.namelist())
+                assert len(names) == 12
+                assert cbz.read(names[0]).endswith(urls[0].encode())
+    finally:
+        AsyncImageDownloader.fetch_image = original_fetch
+
+
+def test_jobs_share_one_loop_and_in_flight_cap():
+    """Chapitres en pipeline et jobs simultanés : une seule boucle, un seul transport, un plafond global"""
+    original_fetch = AsyncImageDownloader.fetch_image
+    seen = {'loops': set(), 'transports': set(), 'chapters': set(), 'in_flight': 0, 'max': 0}
+
+    async def fake_fetch(self, url, name="", max_retries=5, retry_budget=None):
+        seen['loops'].add(id(asyncio.get_running_loop()))
+        seen['transports'].add(id(self.transport))
+        seen['chapters'].add(url.split('/')[-2])
+        seen['in_flight'] += 1
+        seen['max'] = max(seen['max'], seen['in_flight'])
+        await asyncio.sleep(0.01)
+        seen['in_flight'] -= 1
+        return JPEG + url.encode()
+
+    AsyncImageDownloader.fetch_image = fake_fetch
+    try:
+        with tempfile.TemporaryDirectory() as jobs_dir:
+            service = ScraperService(
+                jobs_dir=jobs_dir, use_page_cache=False, min_request_interval=0,
+                http_engine="async", max_async_in_flight=4, max_parallel_chapters=2
+            )
+            index = {chapter: [f"https://cdn.example.com/{chapter}/page_{i}.jpg" for i in range(10)] for chapter in (1, 2, 3)}
+            service.scraper.get_episodes_index = lambda manga_name, max_retries=2, retry_budget=None: index
+
+            def job(chapters):
+                with service.job_directory() as job_dir:
+                    return service.download_chapter_list("lookism", chapters, job_dir)
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(job, [[1, 2], [3]]))
+            service.close()
+
+        assert results == [([1, 2], []), ([3], [])]
+        assert len(seen['loops']) == 1 and len(seen['transports']) == 1
+        assert seen['chapters'] == {'1', '2', '3'}
+        assert seen['max'] <= 4
+    finally:
+        AsyncImageDownloader.fetch_image = original_fetch
+
+
+def main():
+    test_many_pages_in_flight_on_one_loop()
+    test_google_drive_html_page_is_followed()
+    test_forbidden_rotates_headers_and_retries()
+    test_failure_returns_none_after_retries()
+    test_scraper_async_engine_builds_cbz()
+    test_jobs_share_one_loop_and_in_flight_cap()
+    BeautifulLogger.success("Moteur HTTP asynchrone OK")
+
+
+if __name__ == "__main__":
+    main()
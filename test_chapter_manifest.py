@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Test de la reprise des chapitres incomplets (manifeste par chapitre)
+"""
+
+import io
+import os
+import json
+import zipfile
+import tempfile
+import threading
+from scraper.anime_sama_scraper import AnimeSamaScraper
+from utils.chapter_manifest import ChapterManifest, ChapterManifestStore, page_cache_key
+from utils.page_cache import PageCache
+from utils.beautiful_progress import BeautifulLogger
+
+URLS = [f"https://cdn.example.com/lookism/1/page_{page}.jpg" for page in range(1, 9)]
+DRIVE_URL = "https://drive.google.com/file/d/1AbC_dEf-123/view"
+
+
+def _page(url):
+    return b'\xff\xd8\xff\xe0' + url.encode() * 20
+
+
+def _make_scraper(temp_dir):
+    scraper = AnimeSamaScraper(
+        output_dir=temp_dir,
+        temp_dir=os.path.join(temp_dir, "temp"),
+        use_page_cache=False,
+        max_workers=3,
+        min_request_interval=0
+    )
+    scraper.get_episodes_index = lambda manga_name, max_retries=2, retry_budget=None: {1: URLS}
+    # Les pages conservées vivent dans le cache de pages (ici propre au test)
+    scraper.manifest_store = ChapterManifestStore(
+        os.path.join(temp_dir, "resume"), page_cache=_page_cache(temp_dir),
+        page_key=scraper.image_downloader.gdrive_downloader.page_key
+    )
+    return scraper
+
+
+def _page_cache(temp_dir):
+    return PageCache(os.path.join(temp_dir, "pages"), 10 * 1024 * 1024)
+
+
+def _records(manifest_path):
+    with open(manifest_path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_retry_fetches_only_missing_pages():
+    """Une nouvelle tentative ne télécharge que les pages manquantes"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scraper = _make_scraper(temp_dir)
+        fetched = []
+        lock = threading.Lock()
+        failing = {"page_6.jpg"}
+
+        def fake_fetch(url, name="", max_retries=5, retry_budget=None):
+            with lock:
+                fetched.append(url)
+            if any(url.endswith(page) for page in failing):
+                return None
+            return _page(url)
+
+        scraper.image_downloader.fetch_image = fake_fetch
+
+        successful, failed = scraper.download_chapter_list("lookism", [1])
+        # Chapitre incomplet : échec, aucun CBZ partiel livré
+        assert (successful, failed) == ([], [1])
+        assert not os.path.exists(scraper.get_cbz_path("lookism", 1))
+        manifest_path = scraper.manifest_store.manifest_path("lookism", 1)
+        records = _records(manifest_path)
+        # Une ligne ajoutée par page, sans copie des octets hors du cache de pages
+        assert sorted(record['page'] for record in records) == [1, 2, 3, 4, 5, 7, 8]
+        assert all(record['key'] == page_cache_key(('url', URLS[record['page'] - 1])) for record in records)
+        assert records[0]['size'] == len(_page(URLS[records[0]['page'] - 1]))
+        assert os.listdir(os.path.dirname(manifest_path)) == ["ch1.jsonl"]
+
+        # Deuxième tentative : seule la page 6 repasse par le réseau
+        fetched.clear()
+        failing.clear()
+        successful, failed = scraper.download_chapter_list("lookism", [1])
+
+        assert successful == [1]
+        assert fetched == [URLS[5]]
+        with zipfile.ZipFile(scraper.get_cbz_path("lookism", 1)) as cbz:
+            assert len(cbz.namelist()) == 8
+            assert cbz.read("page_002.jpg") == _page(URLS[1])
+        # Chapitre complet : le manifeste est supprimé
+        assert not os.path.exists(manifest_path)
+
+
+def test_corrupted_page_is_downloaded_again():
+    """Une page conservée dont le SHA-256 ne correspond plus est retéléchargée"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = _page_cache(temp_dir)
+        manifest_path = os.path.join(temp_dir, "ch1.jsonl")
+        manifest = ChapterManifest(manifest_path, "lookism", 1, URLS, cache)
+        manifest.record_page(1, _page(URLS[0]))
+        manifest.record_page(2, _page(URLS[1]))
+
+        with open(cache._entry_path(page_cache_key(('url', URLS[1]))), 'r+b') as f:
+            f.write(b'XXXX')
+
+        reloaded = ChapterManifest(manifest_path, "lookism", 1, URLS, cache)
+        assert reloaded.read_page(1) == _page(URLS[0])
+        assert reloaded.read_page(2) is None
+        assert reloaded.completed_pages == 1
+
+
+def test_changed_chapter_invalidates_manifest():
+    """Si les URLs du chapitre changent, les pages conservées sont ignorées"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = _page_cache(temp_dir)
+        manifest_path = os.path.join(temp_dir, "ch1.jsonl")
+        manifest = ChapterManifest(manifest_path, "lookism", 1, URLS, cache)
+        manifest.record_page(1, _page(URLS[0]))
+
+        reloaded = ChapterManifest(manifest_path, "lookism", 1, URLS[:-1], cache)
+        assert reloaded.completed_pages == 0
+        assert reloaded.read_page(1) is None
+
+
+def test_drive_pages_reuse_the_page_cache():
+    """Une page Google Drive déjà en cache n'est pas recopiée ; un job terminé n'efface pas les pages d'un autre"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scraper = _make_scraper(temp_dir)
+        store = scraper.manifest_store
+        cache = store.page_cache
+        urls = [DRIVE_URL, URLS[1]]
+        data = _page(DRIVE_URL)
+        cache.store_stream("1AbC_dEf-123", io.BytesIO(data))  # rangée par le téléchargeur
+
+        first = store.open("lookism", 1, urls)
+        first.record_page(1, data)
+        assert cache.get_stats()['entries'] == 1
+        assert _records(first.manifest_path)[0]['key'] == "1AbC_dEf-123"
+
+        # Deux jobs du même chapitre : le premier termine et supprime le manifeste
+        second = store.open("lookism", 1, urls)
+        first.discard()
+        second.record_page(2, _page(URLS[1]))
+        assert second.read_page(1) == data
+        assert store.open("lookism", 1, urls).read_page(2) == _page(URLS[1])
+
+
+def test_abandoned_chapters_are_pruned():
+    """Les chapitres abandonnés trop longtemps sont supprimés au démarrage"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = ChapterManifestStore(os.path.join(temp_dir, "resume"), page_cache=_page_cache(temp_dir), max_age_seconds=3600)
+        manifest = store.open("Blue Lock", 272, URLS)
+        manifest.record_page(1, _page(URLS[0]))
+
+        old = os.path.getmtime(manifest.manifest_path) - 7200
+        os.utime(manifest.manifest_path, (old, old))
+
+        assert store.prune() == 1
+        assert not os.path.exists(manifest.manifest_path)
+
+
+def main():
+    test_retry_fetches_only_missing_pages()
+    test_corrupted_page_is_downloaded_again()
+    test_changed_chapter_invalidates_manifest()
+    test_drive_pages_reuse_the_page_cache()
+    test_abandoned_chapters_are_pruned()
+    BeautifulLogger.success("Reprise des chapitres OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Test du disjoncteur par hôte (échec immédiat quand la source est en panne)
+"""
+
+import os
+import time
+import tempfile
+import requests
+from scraper.anime_sama_scraper import AnimeSamaScraper
+from utils.circuit_breaker import HostCircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from utils.hybrid_breakthrough import HybridBreakthroughSystem
+from utils.retry_policy import RetryPolicy
+from utils.beautiful_progress import BeautifulLogger
+
+URL = "https://anime-sama.fr/catalogue/lookism/scan/vf/episodes.js"
+
+
+def _raises_open(breaker, url):
+    try:
+        breaker.before_request(url)
+    except CircuitOpenError as e:
+        return e
+    return None
+
+
+def test_opens_after_threshold_and_probes_once():
+    """Le circuit s'ouvre au seuil, puis n'autorise qu'une requête de test"""
+    breaker = HostCircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    breaker.record_failure(URL)
+    assert breaker.state(URL) == CLOSED
+    breaker.record_failure(URL)
+    assert breaker.state(URL) == OPEN
+
+    error = _raises_open(breaker, URL)
+    assert error is not None and error.host == "anime-sama.fr"
+    assert breaker.retry_in(URL) > 0
+
+    time.sleep(0.15)
+    breaker.before_request(URL)
+    assert breaker.state(URL) == HALF_OPEN
+    assert _raises_open(breaker, URL) is not None
+
+    # Test raté : le circuit se rouvre immédiatement
+    breaker.record_failure(URL)
+    assert breaker.state(URL) == OPEN
+
+    time.sleep(0.15)
+    breaker.before_request(URL)
+    breaker.record_success(URL)
+    assert breaker.state(URL) == CLOSED
+    assert _raises_open(breaker, URL) is None
+
+
+def test_hosts_are_independent():
+    """Une panne d'un hôte ne bloque pas les autres"""
+    breaker = HostCircuitBreaker(failure_threshold=1)
+    breaker.record_failure(URL)
+    assert _raises_open(breaker, URL) is not None
+    assert _raises_open(breaker, "https://drive.google.com/open?id=abc") is None
+    assert breaker.get_stats()['open_hosts'] == ["anime-sama.fr"]
+
+
+def test_hybrid_fails_fast_when_host_is_down():
+    """Le système hybride s'arrête à l'ouverture du circuit, puis échoue sans requête"""
+    hybrid = HybridBreakthroughSystem()
+    hybrid.circuit_breaker = HostCircuitBreaker(failure_threshold=2, reset_timeout=60)
+    hybrid.retry_policy = RetryPolicy(max_delay=0)
+    attempts = []
+    hybrid._attempt_strategy = lambda url, strategy: attempts.append(strategy)
+
+    assert isinstance(_call(hybrid), CircuitOpenError)
+    assert len(attempts) == 2 * 3  # deux cycles de trois stratégies, pas neuf
+
+    attempts.clear()
+    started = time.monotonic()
+    assert isinstance(_call(hybrid), CircuitOpenError)
+    assert attempts == []
+    assert time.monotonic() - started < 0.1
+
+
+def _serve_status(status_code, requested):
+    """Remplace requests.Session.get (et les pauses) par une réponse réelle au statut donné"""
+    original_get, original_sleep = requests.Session.get, time.sleep
+
+    def get(session, url, **kwargs):
+        requested.append(url)
+        response = requests.Response()
+        response.status_code = status_code
+        response.url = url
+        return response
+
+    requests.Session.get = get
+    time.sleep = lambda seconds: None
+
+    def restore():
+        requests.Session.get, time.sleep = original_get, original_sleep
+    return restore
+
+
+def test_missing_manga_does_not_trip_the_circuit():
+    """Un 404 (nom de manga erroné) est rendu aussitôt et ne bloque pas les autres utilisateurs"""
+    hybrid = HybridBreakthroughSystem()
+    hybrid.circuit_breaker = HostCircuitBreaker(failure_threshold=1, reset_timeout=60)
+    hybrid.retry_policy = RetryPolicy(max_delay=0)
+    missing_url = "https://anime-sama.fr/catalogue/typo-manga/scan/vf/episodes.js"
+    requested = []
+
+    restore = _serve_status(404, requested)
+    try:
+        response = hybrid.breakthrough_request(missing_url)
+    finally:
+        restore()
+
+    assert response is not None and response.status_code == 404
+    # Première stratégie seulement : pas de nouvelle identité ni de cycle suivant
+    assert requested.count(missing_url) == 1
+    assert hybrid.circuit_breaker.state(URL) == CLOSED
+    assert hybrid.circuit_breaker.trips == 0
+    assert _raises_open(hybrid.circuit_breaker, URL) is None
+
+
+def test_answering_host_releases_half_open_probe():
+    """Un hôte qui répond (même en erreur client) referme un circuit demi-ouvert"""
+    hybrid = HybridBreakthroughSystem()
+    hybrid.circuit_breaker = HostCircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    hybrid.retry_policy = RetryPolicy(max_delay=0)
+    hybrid.circuit_breaker.record_failure(URL)
+    time.sleep(0.1)
+
+    requested = []
+    restore = _serve_status(400, requested)
+    try:
+        response = hybrid.breakthrough_request(URL, max_global_retries=1)
+    finally:
+        restore()
+
+    assert response is None
+    assert requested
+    assert hybrid.circuit_breaker.state(URL) == CLOSED
+    assert _raises_open(hybrid.circuit_breaker, URL) is None
+
+
+def _call(hybrid):
+    try:
+        return hybrid.breakthrough_request(URL, max_global_retries=9)
+    except CircuitOpenError as e:
+        return e
+
+
+def test_scraper_propagates_open_circuit():
+    """Le scraper remonte l'indisponibilité au lieu de tenter chaque chapitre"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scraper = AnimeSamaScraper(
+            output_dir=temp_dir,
+            temp_dir=os.path.join(temp_dir, "temp"),
+            use_episodes_cache=False,
+            use_page_cache=False
+        )
+        if scraper.hybrid_system is None:
+            return
+
+        def unavailable(url, max_global_retries=9, retry_budget=None):
+            raise CircuitOpenError("anime-sama.fr", 42)
+
+        scraper.hybrid_system.breakthrough_request = unavailable
+        try:
+            scraper.download_chapter_list("lookism", [1, 2])
+            assert False, "CircuitOpenError attendue"
+        except CircuitOpenError as e:
+            assert e.retry_in == 42
+
+
+def main():
+    test_opens_after_threshold_and_probes_once()
+    test_hosts_are_independent()
+    test_hybrid_fails_fast_when_host_is_down()
+    test_missing_manga_does_not_trip_the_circuit()
+    test_answering_host_releases_half_open_probe()
+    test_scraper_propagates_open_circuit()
+    BeautifulLogger.success("Disjoncteur par hôte OK")
+
+
+if __name__ == "__main__":
+    main()
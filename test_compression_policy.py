@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test de la politique de compression (médias déjà compressés stockés tels quels)
+"""
+
+import os
+import zipfile
+import tempfile
+from scraper.cbz_converter import StreamingCBZWriter
+from utils.compression_policy import compress_type_for_bytes, compress_type_for_file
+from utils.beautiful_progress import BeautifulLogger
+
+JPEG_PAGE = b'\xff\xd8\xff\xe0' + os.urandom(2048) + b'\xff\xd9'
+PNG_PAGE = b'\x89PNG\r\n\x1a\n' + os.urandom(2048)
+WEBP_PAGE = b'RIFF\x00\x10\x00\x00WEBPVP8 ' + os.urandom(2048)
+BMP_PAGE = b'BM' + b'\x00' * 2048
+
+
+def test_precompressed_pages_are_stored():
+    """JPEG, PNG et WebP sont stockés, BMP et texte compressés"""
+    assert compress_type_for_bytes(JPEG_PAGE) == zipfile.ZIP_STORED
+    assert compress_type_for_bytes(PNG_PAGE) == zipfile.ZIP_STORED
+    assert compress_type_for_bytes(WEBP_PAGE) == zipfile.ZIP_STORED
+    assert compress_type_for_bytes(BMP_PAGE) == zipfile.ZIP_DEFLATED
+    assert compress_type_for_bytes(b'ComicInfo') == zipfile.ZIP_DEFLATED
+
+
+def test_cbz_file_is_stored():
+    """Un CBZ re-zippé n'est pas recompressé"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cbz_path = os.path.join(temp_dir, "chapter.cbz")
+        writer = StreamingCBZWriter(cbz_path)
+        writer.add_page(1, JPEG_PAGE)
+        writer.add_page(2, BMP_PAGE, extension=".bmp")
+        assert writer.close()
+
+        with zipfile.ZipFile(cbz_path) as cbz_file:
+            assert cbz_file.getinfo('page_001.jpg').compress_type == zipfile.ZIP_STORED
+            assert cbz_file.getinfo('page_002.bmp').compress_type == zipfile.ZIP_DEFLATED
+            assert cbz_file.testzip() is None
+
+        assert compress_type_for_file(cbz_path) == zipfile.ZIP_STORED
+
+
+def main():
+    """Exécute les tests de la politique de compression"""
+    test_precompressed_pages_are_stored()
+    test_cbz_file_is_stored()
+    BeautifulLogger.success("Politique de compression opérationnelle")
+
+
+if __name__ == "__main__":
+    main()
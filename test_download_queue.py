@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test de la file de téléchargement (workers, plafond par utilisateur, appels bloquants)
+"""
+
+import time
+import asyncio
+from utils.download_queue import DownloadQueue, UserJobLimitError
+from utils.beautiful_progress import BeautifulLogger
+
+
+def test_blocking_jobs_do_not_block_the_loop():
+    """Les appels bloquants tournent dans le pool pendant que la boucle reste libre"""
+    async def scenario():
+        queue = DownloadQueue(workers=2, max_jobs_per_user=1)
+        done = []
+        ticks = []
+
+        def blocking_download(name):
+            time.sleep(0.2)
+            return name
+
+        def make_job(name):
+            async def job():
+                done.append(await queue.run_blocking(blocking_download, name))
+            return job
+
+        assert queue.submit(1, "a", make_job("a")) == 0
+        assert queue.submit(2, "b", make_job("b")) == 0
+        assert queue.submit(3, "c", make_job("c")) == 1
+
+        while len(done) < 3:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+        await queue.shutdown()
+        return queue, done, ticks
+
+    queue, done, ticks = asyncio.run(scenario())
+    assert sorted(done) == ["a", "b", "c"]
+    assert len(ticks) > 10  # la boucle a continué de tourner
+    assert queue.get_stats()['completed'] == 3
+
+
+def test_per_user_cap():
+    """Un utilisateur ne peut pas dépasser son nombre de jobs simultanés"""
+    async def scenario():
+        queue = DownloadQueue(workers=1, max_jobs_per_user=1)
+        release = asyncio.Event()
+
+        async def job():
+            await release.wait()
+
+        queue.submit(42, "first", job)
+        try:
+            queue.submit(42, "second", job)
+            raise AssertionError("UserJobLimitError attendue")
+        except UserJobLimitError as e:
+            assert e.limit == 1
+
+        release.set()
+        await queue.join()
+
+        # Le plafond est libéré à la fin du job, même en cas d'échec
+        async def failing_job():
+            raise RuntimeError("boom")
+
+        queue.submit(42, "failing", failing_job)
+        await queue.join()
+        queue.submit(42, "third", job)
+        await queue.join()
+
+        stats = queue.get_stats()
+        await queue.shutdown()
+        return stats
+
+    stats = asyncio.run(scenario())
+    assert stats['completed'] == 2
+    assert stats['failed'] == 1
+
+
+def main():
+    """Exécute les tests de la file de téléchargement"""
+    test_blocking_jobs_do_not_block_the_loop()
+    test_per_user_cap()
+    BeautifulLogger.success("File de téléchargement opérationnelle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test de la mémoire des chemins Google Drive (stratégie gagnante et URL résolue)
+"""
+
+import io
+from utils.drive_route_cache import DriveRouteCache, url_shape
+from utils.google_drive_downloader import GoogleDriveDownloader
+from utils.beautiful_progress import BeautifulLogger
+
+JPEG = b'\xff\xd8\xff\xe0' + b'x' * 2000
+
+
+class FakeResponse:
+    def __init__(self, url, status_code=200, body=JPEG, content_type='image/jpeg'):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {'Content-Type': content_type}
+        self.content = body
+        self.text = body.decode('latin-1')
+
+    def iter_content(self, chunk_size=8192):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeDriveSession:
+    """Google Drive simulé : l'URL directe échoue, la page de visualisation donne le lien"""
+
+    def __init__(self):
+        self.headers = {}
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append(url)
+        if '/file/d/' in url:
+            file_id = url.split('/file/d/')[1].split('/')[0]
+            html = f'"downloadUrl":"https://drive.usercontent.google.com/download?id={file_id}&export=download&confirm=t"'
+            return FakeResponse(url, body=html.encode(), content_type='text/html')
+        if 'usercontent' in url:
+            return FakeResponse(url)
+        return FakeResponse(url, status_code=500, body=b'<html>erreur</html>', content_type='text/html')
+
+
+def test_url_shape_ignores_file_id():
+    """Deux pages du même hébergement ont la même forme d'URL"""
+    assert url_shape("https://drive.google.com/open?id=AAA", "AAA") == url_shape("https://drive.google.com/open?id=BBB", "BBB")
+    assert url_shape("https://drive.google.com/file/d/AAA/view", "AAA") == "drive.google.com/file/d/{id}/view?"
+
+
+def test_winning_strategy_and_route_are_reused():
+    """Les pages suivantes vont directement au chemin gagnant"""
+    session = FakeDriveSession()
+    downloader = GoogleDriveDownloader(session, route_cache=DriveRouteCache())
+
+    assert downloader.download_to_stream("https://drive.google.com/open?id=page1", io.BytesIO())
+    assert len(session.requests) == 3  # direct (échec), page de visualisation, lien extrait
+
+    # Autre page du chapitre : la page de visualisation est essayée en premier
+    session.requests.clear()
+    stream = io.BytesIO()
+    assert downloader.download_to_stream("https://drive.google.com/open?id=page2", stream)
+    assert stream.getvalue() == JPEG
+    assert len(session.requests) == 2
+    assert '/file/d/page2/' in session.requests[0]
+
+    # Même fichier : l'URL résolue est rejouée sans page HTML
+    session.requests.clear()
+    assert downloader.download_to_stream("https://drive.google.com/open?id=page2", io.BytesIO())
+    assert session.requests == ["https://drive.usercontent.google.com/download?id=page2&export=download&confirm=t"]
+
+
+def test_expired_route_is_forgotten():
+    """Un chemin mémorisé qui échoue est oublié et les stratégies reprennent"""
+    cache = DriveRouteCache()
+    cache.record("page1", "drive.google.com/open?id", "view_page", ('extracted_url', "https://expired.example.com/x"))
+
+    session = FakeDriveSession()
+    downloader = GoogleDriveDownloader(session, route_cache=cache)
+
+    assert downloader.download_to_stream("https://drive.google.com/open?id=page1", io.BytesIO())
+    assert session.requests[0] == "https://expired.example.com/x"
+    assert cache.route_for("page1")[1].startswith("https://drive.usercontent.google.com/")
+
+
+def test_route_cache_is_bounded():
+    """Les chemins les plus anciens sont évincés au-delà de max_routes"""
+    cache = DriveRouteCache(max_routes=2)
+    for file_id in ("a", "b", "c"):
+        cache.record(file_id, "shape", "direct_download", ('direct_download', f"https://x/{file_id}"))
+
+    assert cache.route_for("a") is None
+    assert cache.route_for("c") == ('direct_download', "https://x/c")
+    assert cache.get_stats()['routes'] == 2
+
+
+def main():
+    test_url_shape_ignores_file_id()
+    test_winning_strategy_and_route_are_reused()
+    test_expired_route_is_forgotten()
+    test_route_cache_is_bounded()
+    BeautifulLogger.success("Mémoire des chemins Google Drive OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test du cache episodes.js (LRU + TTL + revalidation conditionnelle)
+"""
+
+import time
+from utils.episodes_cache import EpisodesCache
+from utils.beautiful_progress import BeautifulLogger
+
+
+def test_hit_and_miss():
+    """Une entrée fraîche est servie sans réseau"""
+    cache = EpisodesCache(max_entries=4, ttl=60)
+
+    entry, fresh = cache.lookup("https://anime-sama.fr/catalogue/lookism/scan/vf/")
+    assert entry is None and not fresh
+
+    cache.store("https://anime-sama.fr/catalogue/lookism/scan/vf/", "var eps1=[];", etag='"abc"')
+    entry, fresh = cache.lookup("https://anime-sama.fr/catalogue/lookism/scan/vf/")
+    assert fresh and entry['content'] == "var eps1=[];"
+
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+
+
+def test_expiry_and_revalidation():
+    """Une entrée expirée est rendue pour revalidation puis prolongée"""
+    cache = EpisodesCache(max_entries=4, ttl=0.01)
+    cache.store("key", "content", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    time.sleep(0.02)
+
+    entry, fresh = cache.lookup("key")
+    assert entry is not None and not fresh
+    assert EpisodesCache.conditional_headers(entry) == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+
+    cache.ttl = 60
+    cache.mark_revalidated("key")
+    entry, fresh = cache.lookup("key")
+    assert fresh
+    assert cache.get_stats()['revalidations'] == 1
+
+
+def test_lru_eviction():
+    """L'entrée la moins récemment utilisée est évincée"""
+    cache = EpisodesCache(max_entries=2, ttl=60)
+    cache.store("a", "A")
+    cache.store("b", "B")
+    cache.lookup("a")
+    cache.store("c", "C")
+
+    assert cache.lookup("b")[0] is None
+    assert cache.lookup("a")[0] is not None
+    assert cache.lookup("c")[0] is not None
+
+
+def main():
+    """Exécute les tests du cache episodes.js"""
+    test_hit_and_miss()
+    test_expiry_and_revalidation()
+    test_lru_eviction()
+    BeautifulLogger.success("Cache episodes.js opérationnel")
+
+
+if __name__ == "__main__":
+    main()
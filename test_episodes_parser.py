@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test du parseur episodes.js (index complet des chapitres en une passe)
+"""
+
+from scraper.episodes_parser import EpisodesParser
+from utils.beautiful_progress import BeautifulLogger
+
+SAMPLE_EPISODES_JS = """
+var eps1= ['https://drive.google.com/open?id=AAA1',
+'https://drive.google.com/open?id=AAA2',
+];
+var eps2 = [
+  'https://drive.google.com/open?id=BBB1',
+  //'https://drive.google.com/open?id=BBB_OLD',
+  'https://example.com/not-drive.jpg',
+  'https://drive.google.com/open?id=BBB2'
+];
+var eps10=[];
+var eps1= ['https://drive.google.com/open?id=DUPLICATE'];
+"""
+
+
+def test_build_index():
+    """L'index contient tous les chapitres avec leurs URLs Google Drive"""
+    parser = EpisodesParser()
+    index = parser.build_index(SAMPLE_EPISODES_JS)
+
+    assert sorted(index) == [1, 2, 10]
+    assert index[1] == [
+        'https://drive.google.com/open?id=AAA1',
+        'https://drive.google.com/open?id=AAA2',
+    ]
+    assert index[2] == [
+        'https://drive.google.com/open?id=BBB1',
+        'https://drive.google.com/open?id=BBB2',
+    ]
+    assert index[10] == []
+
+
+def test_get_chapter_urls():
+    """La recherche d'un chapitre ne confond pas eps1 et eps10"""
+    parser = EpisodesParser()
+    index = parser.build_index(SAMPLE_EPISODES_JS)
+
+    assert len(parser.get_chapter_urls(index, 1)) == 2
+    assert parser.get_chapter_urls(index, 10) == []
+    assert parser.get_chapter_urls(index, 3) == []
+    assert parser.get_chapter_urls(index, None) == []
+
+
+def test_empty_content():
+    """Un contenu vide donne un index vide"""
+    parser = EpisodesParser()
+    assert parser.build_index("") == {}
+    assert parser.build_index(None) == {}
+
+
+def main():
+    """Exécute les tests du parseur episodes.js"""
+    test_build_index()
+    test_get_chapter_urls()
+    test_empty_content()
+    BeautifulLogger.success("Parseur episodes.js opérationnel")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test des profils de headers Google Drive (immuables, sans modifier la session partagée)
+"""
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.google_drive_downloader import GoogleDriveDownloader, GDRIVE_HEADERS
+from utils.beautiful_progress import BeautifulLogger
+
+JPEG = b'\xff\xd8\xff\xe0' + b'x' * 4000
+
+
+class FakeResponse:
+    def __init__(self, url, body, content_type):
+        self.url = url
+        self.status_code = 200
+        self.headers = {'Content-Type': content_type}
+        self.body = body
+        self.text = body.decode('utf-8', errors='replace')
+
+    def iter_content(self, chunk_size=8192):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class RecordingSession:
+    """Session dont les headers ne doivent jamais changer ; enregistre les headers par requête"""
+
+    def __init__(self):
+        self.headers = {'User-Agent': 'session-agent'}
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, **kwargs):
+        assert self.headers == {'User-Agent': 'session-agent'}
+        with self._lock:
+            self.sent.append((url, dict(headers or {})))
+        if '/file/d/' in url:
+            file_id = url.split('/file/d/')[1].split('/')[0]
+            html = f'"downloadUrl":"https://drive.usercontent.google.com/download?id={file_id}&export=download"'
+            return FakeResponse(url, html.encode(), 'text/html')
+        if 'usercontent' in url:
+            return FakeResponse(url, JPEG, 'image/jpeg')
+        return FakeResponse(url, b'<html>quota</html>' + b' ' * 100, 'text/html')
+
+
+def test_profiles_are_immutable():
+    """Le profil partagé ne peut pas être modifié par une requête"""
+    downloader = GoogleDriveDownloader(None)
+    try:
+        downloader.gdrive_headers['Referer'] = 'x'
+        assert False, "le profil devrait être immuable"
+    except TypeError:
+        pass
+
+    view_headers = downloader.strategy_headers('view_page', 'abc')
+    direct_headers = downloader.strategy_headers('direct_download', 'abc')
+    assert view_headers is GDRIVE_HEADERS
+    assert direct_headers['Referer'] == "https://drive.google.com/file/d/abc/view"
+    assert direct_headers['User-Agent'] == GDRIVE_HEADERS['User-Agent']
+    assert 'Referer' not in GDRIVE_HEADERS
+
+
+def test_concurrent_pages_keep_session_headers():
+    """Des pages téléchargées en parallèle n'altèrent pas les headers de la session"""
+    session = RecordingSession()
+    downloader = GoogleDriveDownloader(session)
+
+    def download(index):
+        stream = io.BytesIO()
+        return downloader.download_to_stream(f"https://drive.google.com/open?id=page{index}", stream, max_retries=1)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(download, range(40)))
+
+    assert all(results)
+    assert session.headers == {'User-Agent': 'session-agent'}
+    for url, headers in session.sent:
+        assert headers['User-Agent'] == GDRIVE_HEADERS['User-Agent']
+        if 'Referer' in headers:
+            # Chaque requête porte le Referer de sa propre page
+            page_id = url.rsplit('id=', 1)[1]
+            assert headers['Referer'].endswith(f"/file/d/{page_id}/view")
+
+
+def main():
+    test_profiles_are_immutable()
+    test_concurrent_pages_keep_session_headers()
+    BeautifulLogger.success("Profils de headers Google Drive OK")
+
+
+if __name__ == "__main__":
+    main()
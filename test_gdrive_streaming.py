@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test du téléchargement Google Drive en flux (inspection des premiers octets seulement)
+"""
+
+import io
+from utils.google_drive_downloader import GoogleDriveDownloader, CHUNK_SIZE, MAX_HTML_PAGE_SIZE
+from utils.beautiful_progress import BeautifulLogger
+
+JPEG = b'\xff\xd8\xff\xe0' + b'x' * (3 * 1024 * 1024)
+
+
+class StreamedResponse:
+    """Réponse stream=True : seul iter_content est autorisé, le corps n'est jamais bufferisé"""
+
+    def __init__(self, url, body, content_type, status_code=200):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {'Content-Type': content_type}
+        self.body = body
+        self.chunks_read = 0
+        self.closed = False
+
+    @property
+    def content(self):
+        raise AssertionError("response.content ne doit pas être lu")
+
+    @property
+    def text(self):
+        raise AssertionError("response.text ne doit pas être lu")
+
+    def iter_content(self, chunk_size=CHUNK_SIZE):
+        for start in range(0, len(self.body), chunk_size):
+            self.chunks_read += 1
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.headers = {}
+        self.responses = responses
+        self.served = []
+
+    def get(self, url, **kwargs):
+        response = self.responses[url](url)
+        self.served.append(response)
+        return response
+
+
+def test_image_is_streamed_without_buffering():
+    """Une image est écrite morceau par morceau, sans response.content ni response.text"""
+    direct_url = "https://drive.google.com/uc?export=download&id=img1"
+    session = FakeSession({direct_url: lambda url: StreamedResponse(url, JPEG, 'image/jpeg')})
+    downloader = GoogleDriveDownloader(session)
+
+    stream = io.BytesIO()
+    assert downloader.download_to_stream("https://drive.google.com/open?id=img1", stream)
+    assert stream.getvalue() == JPEG
+    assert session.served[0].closed
+
+
+def test_interstitial_is_detected_from_first_bytes():
+    """Une page HTML servie en octet-stream est reconnue et son lien suivi"""
+    direct_url = "https://drive.google.com/uc?export=download&id=img2"
+    confirmed_url = "https://drive.usercontent.google.com/download?id=img2&export=download&confirm=t"
+    html = f'<!DOCTYPE html><html><script>{{"downloadUrl":"{confirmed_url}"}}</script></html>'.encode()
+    session = FakeSession({
+        direct_url: lambda url: StreamedResponse(url, html, 'application/octet-stream'),
+        confirmed_url: lambda url: StreamedResponse(url, JPEG, 'image/jpeg'),
+    })
+    downloader = GoogleDriveDownloader(session)
+
+    stream = io.BytesIO()
+    assert downloader.download_to_stream("https://drive.google.com/open?id=img2", stream, max_retries=1)
+    assert stream.getvalue() == JPEG
+
+
+def test_oversized_html_is_never_written():
+    """Une page HTML trop grosse est abandonnée après MAX_HTML_PAGE_SIZE octets"""
+    direct_url = "https://drive.google.com/uc?export=download&id=img3"
+    html = b'<html>' + b'a' * (10 * MAX_HTML_PAGE_SIZE) + b'</html>'
+    session = FakeSession({direct_url: lambda url: StreamedResponse(url, html, 'text/html')})
+    downloader = GoogleDriveDownloader(session)
+
+    stream = io.BytesIO()
+    assert not downloader._attempt_download_strategy(direct_url, stream, 'direct_download', "img3")
+    assert stream.getvalue() == b''
+    assert session.served[0].chunks_read * CHUNK_SIZE <= MAX_HTML_PAGE_SIZE + CHUNK_SIZE
+
+
+def test_html_sniffing():
+    """Les images et SVG ne sont pas pris pour du HTML"""
+    assert GoogleDriveDownloader.is_html_response('text/html; charset=utf-8', b'\n  <!DOCTYPE html><html>')
+    assert GoogleDriveDownloader.is_html_response('application/octet-stream', b'<html><head>')
+    assert not GoogleDriveDownloader.is_html_response('text/html', JPEG[:2048])
+    assert not GoogleDriveDownloader.is_html_response('image/svg+xml', b'<?xml version="1.0"?><svg>')
+
+
+def main():
+    test_image_is_streamed_without_buffering()
+    test_interstitial_is_detected_from_first_bytes()
+    test_oversized_html_is_never_written()
+    test_html_sniffing()
+    BeautifulLogger.success("Téléchargement Google Drive en flux OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test du cache disque des pages (adressé par ID Google Drive)
+"""
+
+import os
+import tempfile
+from utils.page_cache import PageCache
+from utils.beautiful_progress import BeautifulLogger
+
+
+def _write_page(directory, name, size):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(b'\xff\xd8\xff' + b'x' * (size - 3))
+    return path
+
+
+def test_store_and_hit():
+    """Une page stockée est resservie depuis le disque"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = PageCache(os.path.join(temp_dir, 'cache'), max_size_bytes=10_000)
+        page = _write_page(temp_dir, 'page_001.jpg', 1000)
+
+        assert not cache.copy_to('FILE_ID_1', os.path.join(temp_dir, 'out.jpg'))
+        assert cache.store_file('FILE_ID_1', page)
+        assert cache.copy_to('FILE_ID_1', os.path.join(temp_dir, 'out.jpg'))
+        assert os.path.getsize(os.path.join(temp_dir, 'out.jpg')) == 1000
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1
+        assert stats['bytes_saved_mb'] > 0
+
+
+def test_lru_eviction_by_size():
+    """Le cache reste sous sa taille maximale en évinçant la page la plus ancienne"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = PageCache(os.path.join(temp_dir, 'cache'), max_size_bytes=2500)
+        for name in ('AAA', 'BBB'):
+            cache.store_file(name, _write_page(temp_dir, name, 1000))
+
+        cache.copy_to('AAA', os.path.join(temp_dir, 'out.jpg'))
+        cache.store_file('CCC', _write_page(temp_dir, 'CCC', 1000))
+
+        assert cache.get_stats()['entries'] == 2
+        assert not cache.copy_to('BBB', os.path.join(temp_dir, 'out.jpg'))
+        assert cache.copy_to('AAA', os.path.join(temp_dir, 'out.jpg'))
+
+
+def test_index_survives_restart():
+    """L'index est reconstruit depuis le disque au redémarrage"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_dir = os.path.join(temp_dir, 'cache')
+        PageCache(cache_dir, max_size_bytes=10_000).store_file('PERSIST', _write_page(temp_dir, 'p', 500))
+
+        reloaded = PageCache(cache_dir, max_size_bytes=10_000)
+        assert reloaded.copy_to('PERSIST', os.path.join(temp_dir, 'out.jpg'))
+
+
+def test_invalid_ids_are_ignored():
+    """Les IDs invalides ne sortent jamais du répertoire du cache"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = PageCache(os.path.join(temp_dir, 'cache'), max_size_bytes=10_000)
+        page = _write_page(temp_dir, 'page.jpg', 100)
+        assert not cache.store_file('../escape', page)
+        assert not cache.store_file(None, page)
+
+
+def main():
+    """Exécute les tests du cache de pages"""
+    test_store_and_hit()
+    test_lru_eviction_by_size()
+    test_index_survives_restart()
+    test_invalid_ids_are_ignored()
+    BeautifulLogger.success("Cache de pages opérationnel")
+
+
+if __name__ == "__main__":
+    main()
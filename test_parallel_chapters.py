@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test du téléchargement de chapitres en pipeline (requêtes de pages bornées globalement)
+"""
+
+import os
+import time
+import tempfile
+import threading
+from collections import Counter
+from scraper.anime_sama_scraper import AnimeSamaScraper
+from utils.beautiful_progress import BeautifulLogger
+
+
+def _make_scraper(output_dir, max_workers, max_parallel_chapters):
+    scraper = AnimeSamaScraper(
+        output_dir=output_dir,
+        temp_dir=os.path.join(output_dir, "temp"),
+        use_page_cache=False,
+        max_workers=max_workers,
+        min_request_interval=0,
+        max_parallel_chapters=max_parallel_chapters
+    )
+    episodes_index = {
+        chapter: [f"https://drive.google.com/open?id=c{chapter}p{page}" for page in range(6)]
+        for chapter in range(1, 5)
+    }
+    scraper.get_episodes_index = lambda manga_name, max_retries=2, retry_budget=None: episodes_index
+    return scraper
+
+
+def test_chapters_overlap_with_global_page_cap():
+    """Les chapitres se chevauchent sans dépasser le plafond global de requêtes"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scraper = _make_scraper(temp_dir, max_workers=3, max_parallel_chapters=2)
+
+        lock = threading.Lock()
+        in_flight = {'current': 0, 'max': 0}
+        # Pages en vol par chapitre : un chapitre a souvent plusieurs pages en vol à la fois
+        chapters_in_flight = Counter()
+        overlapping = []
+
+        def fake_fetch(url, name="", max_retries=5, retry_budget=None):
+            chapter = url.split("id=c")[1].split("p")[0]
+            with lock:
+                in_flight['current'] += 1
+                in_flight['max'] = max(in_flight['max'], in_flight['current'])
+                chapters_in_flight[chapter] += 1
+                if len(+chapters_in_flight) > 1:
+                    overlapping.append(chapter)
+            time.sleep(0.02)
+            with lock:
+                in_flight['current'] -= 1
+                chapters_in_flight[chapter] -= 1
+            return b'\xff\xd8\xff\xe0' + url.encode()
+
+        scraper.image_downloader.fetch_image = fake_fetch
+        successful, failed = scraper.download_chapter_list("lookism", [1, 2, 3, 4])
+
+        assert successful == [1, 2, 3, 4]
+        assert failed == []
+        assert in_flight['max'] <= 3
+        assert overlapping  # au moins deux chapitres en vol en même temps
+        for chapter in (1, 2, 3, 4):
+            assert os.path.exists(scraper.get_cbz_path("lookism", chapter))
+
+
+def test_failed_chapters_are_reported_in_order():
+    """Les résultats restent dans l'ordre des chapitres même terminés dans le désordre"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scraper = _make_scraper(temp_dir, max_workers=2, max_parallel_chapters=3)
+
+        def fake_fetch(url, name="", max_retries=5, retry_budget=None):
+            if "id=c2" in url:
+                return None
+            time.sleep(0.01 if "id=c1" in url else 0)
+            return b'\xff\xd8\xff\xe0' + url.encode()
+
+        scraper.image_downloader.fetch_image = fake_fetch
+        successful, failed = scraper.download_chapter_list("lookism", [1, 2, 3])
+
+        assert successful == [1, 3]
+        assert failed == [2]
+
+
+def test_each_chapter_is_handed_over_as_soon_as_ready():
+    """Chaque CBZ est signalé dès sa création, avant la fin des chapitres suivants"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scraper = _make_scraper(temp_dir, max_workers=2, max_parallel_chapters=1)
+
+        def fake_fetch(url, name="", max_retries=5, retry_budget=None):
+            if "id=c3" in url:
+                return None
+            time.sleep(0.02)
+            return b'\xff\xd8\xff\xe0' + url.encode()
+
+        scraper.image_downloader.fetch_image = fake_fetch
+        handed_over = []
+
+        def chapter_callback(chapter_num, cbz_path):
+            # Le CBZ est complet et lisible au moment du signalement
+            handed_over.append((chapter_num, cbz_path, cbz_path and os.path.getsize(cbz_path), time.monotonic()))
+
+        successful, failed = scraper.download_chapter_list("lookism", [1, 2, 3, 4], chapter_callback=chapter_callback)
+        finished_at = time.monotonic()
+
+        assert successful == [1, 2, 4]
+        assert [chapter for chapter, _, _, _ in handed_over] == [1, 2, 3, 4]
+        assert handed_over[2][1] is None
+        assert handed_over[0][1] == scraper.get_cbz_path("lookism", 1)
+        assert handed_over[0][2] > 0
+        # Le premier chapitre est livré bien avant la fin du lot
+        assert finished_at - handed_over[0][3] > 0.05
+
+
+def main():
+    """Exécute les tests du téléchargement en pipeline"""
+    test_chapters_overlap_with_global_page_cap()
+    test_failed_chapters_are_reported_in_order()
+    test_each_chapter_is_handed_over_as_soon_as_ready()
+    BeautifulLogger.success("Téléchargement de chapitres en pipeline opérationnel")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test des événements de progression (scraper -> barre de progression Telegram)
+"""
+
+import asyncio
+import threading
+from utils.telegram_progress import TelegramDownloadProgress
+from utils.beautiful_progress import BeautifulLogger
+
+
+class FakeMessage:
+    """Message Telegram minimal enregistrant les éditions"""
+
+    def __init__(self):
+        self.texts = []
+
+    async def reply_text(self, text, parse_mode=None):
+        self.texts.append(text)
+        return self
+
+    async def edit_text(self, text, parse_mode=None):
+        self.texts.append(text)
+
+
+class FakeUpdate:
+    def __init__(self):
+        self.message = FakeMessage()
+
+
+def _chapter_events(chapter, pages, failed_page=None):
+    events = [{'type': 'pages_found', 'chapter': chapter, 'total': pages}]
+    for page in range(1, pages + 1):
+        success = page != failed_page
+        events.append({'type': 'page_done', 'chapter': chapter, 'page': page,
+                       'success': success, 'bytes': 1024 if success else 0})
+    events.append({'type': 'cbz_started', 'chapter': chapter, 'pages': pages})
+    events.append({'type': 'cbz_finished', 'chapter': chapter, 'success': True, 'pages': pages, 'bytes': 4096})
+    return events
+
+
+def test_events_from_threads_drive_the_progress_bar():
+    """Les événements émis depuis des threads mettent à jour la vraie progression"""
+    async def scenario():
+        update = FakeUpdate()
+        progress = TelegramDownloadProgress(update, "lookism", "Chapitres 1-2", total_chapters=2)
+        callback = progress.event_callback()
+
+        def emit_from_thread():
+            for chapter in (1, 2):
+                for event in _chapter_events(chapter, 5, failed_page=3 if chapter == 2 else None):
+                    callback(event)
+
+        thread = threading.Thread(target=emit_from_thread)
+        thread.start()
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        await progress.close_events()
+        return progress, update
+
+    progress, update = asyncio.run(scenario())
+    assert progress.progress_bar.total_items == 10
+    assert progress.pages_done == 10
+    assert progress.pages_ok == 9
+    assert progress.progress_bar.is_complete
+    # Message initial + message final ; les mises à jour intermédiaires sont limitées
+    assert len(update.message.texts) <= 3
+    assert "9/10 réussies" in update.message.texts[-1]
+
+
+def test_interrupted_download_closes_the_bar():
+    """Une progression sans fin de chapitre est clôturée à l'arrêt"""
+    async def scenario():
+        progress = TelegramDownloadProgress(FakeUpdate(), "lookism", "Chapitre 1")
+        callback = progress.event_callback()
+        callback({'type': 'pages_found', 'chapter': 1, 'total': 4})
+        callback({'type': 'page_done', 'chapter': 1, 'page': 1, 'success': True, 'bytes': 10})
+        await progress.close_events()
+        return progress
+
+    progress = asyncio.run(scenario())
+    assert progress.progress_bar.is_complete
+    assert progress.pages_ok == 1
+
+
+def test_chapter_completeness_is_known_before_consumption():
+    """Un chapitre n'est complet que si toutes ses pages annoncées ont été livrées"""
+    async def scenario():
+        progress = TelegramDownloadProgress(FakeUpdate(), "lookism", "Chapitres 1-2", total_chapters=2)
+        callback = progress.event_callback()
+        for event in _chapter_events(1, 3):
+            callback(event)
+        callback({'type': 'pages_found', 'chapter': 2, 'total': 4})
+        callback({'type': 'cbz_finished', 'chapter': 2, 'success': False, 'pages': 3, 'bytes': 0})
+        # Relevé dans le thread émetteur, sans attendre la boucle
+        completeness = (progress.is_chapter_complete(1), progress.is_chapter_complete(2))
+        await progress.close_events()
+        return completeness
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def main():
+    """Exécute les tests des événements de progression"""
+    test_events_from_threads_drive_the_progress_bar()
+    test_interrupted_download_closes_the_bar()
+    test_chapter_completeness_is_known_before_consumption()
+    BeautifulLogger.success("Événements de progression opérationnels")
+
+
+if __name__ == "__main__":
+    main()
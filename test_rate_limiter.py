@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test du limiteur de débit par hôte
+"""
+
+import time
+import threading
+from utils.rate_limiter import HostRateLimiter
+from utils.beautiful_progress import BeautifulLogger
+
+
+def test_same_host_is_spaced():
+    """Les requêtes concurrentes vers un même hôte sont espacées"""
+    limiter = HostRateLimiter(min_interval=0.05)
+    start_times = []
+    lock = threading.Lock()
+
+    def worker():
+        limiter.wait("https://drive.google.com/open?id=abc")
+        with lock:
+            start_times.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    start_times.sort()
+    gaps = [b - a for a, b in zip(start_times, start_times[1:])]
+    assert all(gap >= 0.04 for gap in gaps)
+
+
+def test_hosts_are_independent():
+    """Deux hôtes différents ne s'attendent pas"""
+    limiter = HostRateLimiter(min_interval=1.0)
+    assert limiter.wait("https://drive.google.com/a") == 0
+    assert limiter.wait("https://anime-sama.fr/b") == 0
+
+
+def main():
+    """Exécute les tests du limiteur de débit"""
+    test_same_host_is_spaced()
+    test_hosts_are_independent()
+    BeautifulLogger.success("Limiteur de débit opérationnel")
+
+
+if __name__ == "__main__":
+    main()
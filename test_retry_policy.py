@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test de la politique de reprise (gigue décorrélée, budget par job, Retry-After)
+"""
+
+import io
+import time
+from email.utils import formatdate
+from utils.retry_policy import RetryPolicy, parse_retry_after
+from utils.google_drive_downloader import GoogleDriveDownloader
+from utils.hybrid_breakthrough import HybridBreakthroughSystem, CYCLE_MAX_DELAY
+from utils.circuit_breaker import HostCircuitBreaker
+from utils.beautiful_progress import BeautifulLogger
+
+JPEG = b'\xff\xd8\xff\xe0' + b'x' * 4000
+
+
+class FakeResponse:
+    def __init__(self, url, status_code=200, body=JPEG, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {'Content-Type': 'image/jpeg'}
+        self.headers.update(headers or {})
+        self.body = body
+
+    def iter_content(self, chunk_size=8192):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class ThrottledSession:
+    """Répond 429 avec Retry-After à la première requête, puis sert l'image"""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((time.monotonic(), url))
+        if len(self.requests) == 1:
+            return FakeResponse(url, 429, b'', {'Retry-After': self.retry_after})
+        return FakeResponse(url)
+
+
+def test_jitter_bounds_and_cap():
+    """Chaque délai reste entre le délai de base et 3 × le précédent, plafonné"""
+    policy = RetryPolicy(max_delay=10)
+    retry = policy.start(0.5)
+    previous = 0.5
+    for _ in range(50):
+        delay = retry.next_delay()
+        assert 0.5 <= delay <= min(10, previous * 3)
+        previous = delay
+    assert retry.next_delay() <= 10
+
+
+def test_retry_after_is_a_floor():
+    """Retry-After impose un délai minimal, borné par max_retry_after"""
+    policy = RetryPolicy(max_delay=1, max_retry_after=60)
+    retry = policy.start(0.5)
+    assert retry.next_delay(min_delay=20) == 20
+    assert retry.next_delay(min_delay=500) == 60
+
+
+def test_parse_retry_after():
+    """Retry-After accepte des secondes ou une date HTTP"""
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("bientôt") is None
+    delay = parse_retry_after(formatdate(time.time() + 30, usegmt=True))
+    assert 25 <= delay <= 31
+    assert parse_retry_after(formatdate(time.time() - 30, usegmt=True)) == 0
+
+
+def test_budget_stops_retries():
+    """Un budget épuisé arrête les reprises de toutes les pages du job"""
+    policy = RetryPolicy(max_delay=0, max_retry_after=1)
+    budget = policy.new_budget(0.05)
+
+    first_page = policy.start(0, budget)
+    assert first_page.sleep(0.03)
+    second_page = policy.start(0, budget)
+    assert not second_page.sleep(0.03)
+
+    stats = policy.get_stats()
+    assert stats['sleeps'] == 1
+    assert stats['budget_exhausted'] == 1
+
+
+def test_hybrid_cycles_are_capped_and_budgeted():
+    """Les cycles du système hybride restent sous 8 s et s'arrêtent avec le budget du job"""
+    policy = RetryPolicy(max_delay=30)
+    retry = policy.start(3.0, max_delay=CYCLE_MAX_DELAY)
+    assert all(retry.next_delay() <= CYCLE_MAX_DELAY for _ in range(50))
+
+    hybrid = HybridBreakthroughSystem()
+    hybrid.retry_policy = policy
+    hybrid.circuit_breaker = HostCircuitBreaker(failure_threshold=100)
+    attempts = []
+    hybrid._attempt_strategy = lambda url, strategy: attempts.append(strategy)
+
+    started = time.monotonic()
+    budget = policy.new_budget(1.0)
+    assert hybrid.breakthrough_request("https://anime-sama.fr/x/episodes.js", retry_budget=budget) is None
+    # Premier délai d'au moins 3 s : refusé par le budget, un seul cycle tenté
+    assert len(attempts) == 3
+    assert time.monotonic() - started < 1.0
+
+
+def test_google_drive_honors_retry_after():
+    """Un 429 de Google Drive interrompt le tour de stratégies et respecte Retry-After"""
+    session = ThrottledSession("0.2")
+    policy = RetryPolicy(max_delay=0)
+    downloader = GoogleDriveDownloader(session, retry_policy=policy)
+
+    stream = io.BytesIO()
+    assert downloader.download_to_stream("https://drive.google.com/open?id=abc", stream, max_retries=3)
+    assert stream.getvalue() == JPEG
+
+    # Aucune autre stratégie tentée pendant la limitation, puis au moins 0,2 s d'attente
+    assert len(session.requests) == 2
+    assert session.requests[1][0] - session.requests[0][0] >= 0.2
+    assert policy.get_stats()['floored_sleeps'] == 1
+
+
+def main():
+    test_jitter_bounds_and_cap()
+    test_retry_after_is_a_floor()
+    test_parse_retry_after()
+    test_budget_stops_retries()
+    test_hybrid_cycles_are_capped_and_budgeted()
+    test_google_drive_honors_retry_after()
+    BeautifulLogger.success("Politique de reprise OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test du scraper partagé (répertoires par job, sessions réutilisées)
+"""
+
+import os
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from scraper.scraper_service import ScraperService
+from utils.hybrid_breakthrough import HybridBreakthroughSystem
+from utils.http_pool import create_pooled_session
+from utils.beautiful_progress import BeautifulLogger
+
+
+def test_jobs_share_one_scraper_with_private_directories():
+    """Deux jobs simultanés utilisent le même scraper mais des répertoires distincts"""
+    with tempfile.TemporaryDirectory() as jobs_dir:
+        service = ScraperService(jobs_dir=jobs_dir, use_page_cache=False, min_request_interval=0)
+        episodes_index = {1: [f"https://drive.google.com/open?id=p{page}" for page in range(3)]}
+        service.scraper.get_episodes_index = lambda manga_name, max_retries=2, retry_budget=None: episodes_index
+        service.scraper._extract_image_urls = lambda url, chapter, retry_budget=None: episodes_index[chapter]
+        service.scraper.image_downloader.fetch_image = lambda url, name="", max_retries=5, retry_budget=None: b'\xff\xd8\xff' + url.encode()
+
+        def job(_):
+            with service.job_directory() as job_dir:
+                assert service.download_chapter("lookism", 1, job_dir)
+                cbz_path = service.get_cbz_path("lookism", 1, job_dir)
+                assert os.listdir(job_dir) == [os.path.basename(cbz_path)]
+                return job_dir
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            job_dirs = list(executor.map(job, range(2)))
+
+        assert job_dirs[0] != job_dirs[1]
+        assert not any(os.path.exists(job_dir) for job_dir in job_dirs)
+
+
+def test_hybrid_keeps_session_until_a_failure():
+    """La session d'une stratégie n'est recréée qu'après un échec"""
+    hybrid = HybridBreakthroughSystem()
+    created = []
+
+    def fake_create():
+        hybrid.advanced_bypass.session = create_pooled_session()
+        created.append(hybrid.advanced_bypass.session)
+        return hybrid.advanced_bypass.session
+
+    hybrid.advanced_bypass.create_stealth_session = fake_create
+    hybrid.advanced_bypass.bypass_request = lambda url, max_retries=2: None
+
+    hybrid._attempt_advanced("https://anime-sama.fr")
+    hybrid._attempt_advanced("https://anime-sama.fr")
+    assert len(created) == 1
+
+    hybrid.method_failures['advanced'] = 1
+    hybrid._attempt_advanced("https://anime-sama.fr")
+    assert len(created) == 2
+
+
+def test_hybrid_session_is_not_replaced_during_a_request():
+    """Des jobs concurrents ne remplacent pas la session de contournement utilisée par un autre"""
+    hybrid = HybridBreakthroughSystem()
+    hybrid.method_failures['advanced'] = 1  # chaque tentative recrée la session
+    hybrid.advanced_bypass.create_stealth_session = lambda: setattr(hybrid.advanced_bypass, 'session', object())
+    in_flight = []
+    overlaps = []
+    replaced = []
+    lock = threading.Lock()
+
+    def request(url, max_retries=2):
+        session = hybrid.advanced_bypass.session
+        with lock:
+            in_flight.append(url)
+            overlaps.append(len(in_flight))
+        time.sleep(0.01)
+        with lock:
+            in_flight.remove(url)
+        # _attempt_advanced intercepte les exceptions : vérifié après coup
+        replaced.append(hybrid.advanced_bypass.session is not session)
+        hybrid._record_failure('advanced')
+
+    hybrid.advanced_bypass.bypass_request = request
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(hybrid._attempt_advanced, [f"https://anime-sama.fr/{n}" for n in range(8)]))
+
+    assert max(overlaps) == 1
+    assert replaced == [False] * 8
+    assert hybrid.get_stats()['failures']['advanced'] == 9
+
+
+def main():
+    """Exécute les tests du scraper partagé"""
+    test_jobs_share_one_scraper_with_private_directories()
+    test_hybrid_keeps_session_until_a_failure()
+    test_hybrid_session_is_not_replaced_during_a_request()
+    BeautifulLogger.success("Scraper partagé opérationnel")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test du renouvellement de session sur 403 (un seul renouvellement pour des pages concurrentes)
+"""
+
+import os
+import tempfile
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from scraper.anime_sama_scraper import AnimeSamaScraper
+from utils.retry_policy import RetryPolicy
+from utils.beautiful_progress import BeautifulLogger
+
+JPEG = b'\xff\xd8\xff\xe0' + b'x' * 4000
+WORKERS = 6
+SESSION_HEADERS = {'User-Agent': 'blocked-agent'}
+
+
+class FakeResponse:
+    def __init__(self, url, status_code, body=b''):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {'content-type': 'image/jpeg'}
+        self.body = body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Client Error: Forbidden for url: {self.url}", response=self)
+
+    def iter_content(self, chunk_size=8192):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+class BlockedSession:
+    """Session bloquée : toutes les requêtes en vol reçoivent un 403 ensemble"""
+
+    def __init__(self):
+        self.headers = dict(SESSION_HEADERS)
+        self.closed = False
+        self._in_flight = threading.Barrier(WORKERS, timeout=5)
+
+    def get(self, url, headers=None, **kwargs):
+        assert not self.closed, "session fermée pendant qu'un worker l'utilise"
+        self._in_flight.wait()
+        return FakeResponse(url, 403)
+
+    def close(self):
+        self.closed = True
+
+
+class WorkingSession:
+    def __init__(self):
+        self.headers = {'User-Agent': 'fresh-agent'}
+
+    def get(self, url, headers=None, **kwargs):
+        return FakeResponse(url, 200, JPEG)
+
+    def close(self):
+        pass
+
+
+def test_concurrent_403_refresh_the_session_once():
+    """Des pages bloquées en même temps ne renouvellent la session qu'une fois, sans la fermer en cours d'usage"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scraper = AnimeSamaScraper(
+            output_dir=temp_dir,
+            temp_dir=os.path.join(temp_dir, "temp"),
+            use_episodes_cache=False,
+            use_page_cache=False
+        )
+        created = []
+
+        def new_session():
+            session = WorkingSession()
+            created.append(session)
+            return session
+
+        scraper._setup_enhanced_session = new_session
+        blocked = BlockedSession()
+        downloader = scraper.image_downloader
+        scraper.session = downloader.session = blocked
+        downloader.rate_limiter = None
+        downloader.page_flight = None
+        downloader.retry_policy = RetryPolicy(max_delay=0, max_retry_after=0)
+
+        urls = [f"https://example.org/page_{page}.jpg" for page in range(WORKERS)]
+        with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+            pages = list(executor.map(lambda url: downloader.fetch_image(url, max_retries=2), urls))
+
+        assert pages == [JPEG] * WORKERS
+        assert len(created) == 1
+        assert scraper.session_generation == 1
+        assert downloader.session is created[0]
+        assert downloader.gdrive_downloader.session is created[0]
+        # Headers renouvelés par requête : la session partagée n'est pas modifiée
+        assert blocked.headers == SESSION_HEADERS
+        assert not blocked.closed
+
+
+def main():
+    """Exécute le test du renouvellement de session"""
+    test_concurrent_403_refresh_the_session_once()
+    BeautifulLogger.success("Renouvellement de session sur 403 OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Test de la fusion des demandes identiques simultanées (single-flight)
+"""
+
+import os
+import time
+import asyncio
+import zipfile
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from scraper.anime_sama_scraper import AnimeSamaScraper
+from scraper.image_downloader import ImageDownloader
+from utils.single_flight import SingleFlight
+from utils.beautiful_progress import BeautifulLogger
+
+URLS = [f"https://cdn.example.com/lookism/1/page_{page}.jpg" for page in range(1, 9)]
+
+
+def test_concurrent_calls_share_one_execution():
+    """Les appels simultanés d'une même clé attendent une seule exécution"""
+    flight = SingleFlight()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return b'episodes'
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: flight.do('episodes', slow_fetch), range(8)))
+
+    assert results == [b'episodes'] * 8
+    assert len(calls) == 1
+    assert flight.get_stats() == {'leaders': 1, 'shared': 7, 'in_flight': 0}
+
+    # Clé libérée : un appel ultérieur relance l'opération
+    flight.do('episodes', slow_fetch)
+    assert len(calls) == 2
+
+
+def test_errors_are_shared():
+    """L'exception de l'opération est remontée à tous les appelants"""
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("source en panne")
+
+    def call():
+        try:
+            flight.do('chapter', failing)
+        except ValueError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(call)
+        started.wait()
+        second = executor.submit(call)
+        assert first.result() == second.result() == "source en panne"
+    assert flight.get_stats()['leaders'] == 1
+
+
+def test_async_calls_across_event_loops():
+    """Deux boucles asyncio (deux chapitres en pipeline) partagent la même requête"""
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return b'page'
+
+    def run_loop(_):
+        return asyncio.run(flight.do_async(('gdrive', 'abc'), fetch))
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(run_loop, range(3)))
+
+    assert results == [b'page'] * 3
+    assert len(calls) == 1
+
+
+def test_page_key_ignores_drive_url_shape():
+    """Une page Google Drive est fusionnée quelle que soit la forme de son URL"""
+    downloader = ImageDownloader(None, page_flight=SingleFlight())
+    downloads = []
+
+    def fake_download(url, stream, name="", max_retries=5, retry_budget=None):
+        downloads.append(url)
+        time.sleep(0.2)
+        stream.write(b'\xff\xd8\xff' + b'x' * 100)
+        return True
+
+    downloader.download_to_stream = fake_download
+    urls = [
+        "https://drive.google.com/open?id=abcdefghijklmnopqrstuvwxyz",
+        "https://drive.google.com/file/d/abcdefghijklmnopqrstuvwxyz/view",
+    ]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(downloader.fetch_image, urls))
+
+    assert results[0] == results[1]
+    assert len(downloads) == 1
+
+
+def test_same_chapter_is_built_once_for_concurrent_jobs():
+    """Deux jobs demandant le même chapitre ne téléchargent ses pages qu'une fois"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        scraper = AnimeSamaScraper(
+            output_dir=temp_dir,
+            temp_dir=os.path.join(temp_dir, "temp"),
+            use_page_cache=False,
+            max_workers=2,
+            min_request_interval=0
+        )
+        scraper.get_episodes_index = lambda manga_name, max_retries=2, retry_budget=None: {1: URLS}
+        fetched = []
+        lock = threading.Lock()
+
+        def fake_fetch(url, name="", max_retries=5, retry_budget=None):
+            with lock:
+                fetched.append(url)
+            time.sleep(0.05)
+            return b'\xff\xd8\xff\xe0' + url.encode()
+
+        scraper.image_downloader.fetch_image = fake_fetch
+        job_dirs = [os.path.join(temp_dir, f"job_{index}") for index in range(3)]
+        for job_dir in job_dirs:
+            os.makedirs(job_dir)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(
+                lambda job_dir: scraper.download_chapter_list("lookism", [1], output_dir=job_dir), job_dirs
+            ))
+
+        assert all(successful == [1] for successful, failed in results)
+        assert sorted(fetched) == sorted(URLS)
+        for job_dir in job_dirs:
+            with zipfile.ZipFile(scraper.get_cbz_path("lookism", 1, job_dir)) as cbz:
+                assert len(cbz.namelist()) == len(URLS)
+
+
+def main():
+    test_concurrent_calls_share_one_execution()
+    test_errors_are_shared()
+    test_async_calls_across_event_loops()
+    test_page_key_ignores_drive_url_shape()
+    test_same_chapter_is_built_once_for_concurrent_jobs()
+    BeautifulLogger.success("Fusion des demandes identiques OK")
+
+
+if __name__ == "__main__":
+    main()
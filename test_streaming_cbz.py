@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test de l'écriture CBZ en flux (pages écrites dès leur arrivée, listées dans l'ordre)
+"""
+
+import os
+import zipfile
+import tempfile
+from scraper.cbz_converter import StreamingCBZWriter
+from utils.beautiful_progress import BeautifulLogger
+
+
+def test_out_of_order_pages_are_listed_in_order():
+    """Les pages arrivées dans le désordre sont écrites aussitôt et listées dans l'ordre des pages"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cbz_path = os.path.join(temp_dir, "chapter.cbz")
+        writer = StreamingCBZWriter(cbz_path)
+
+        writer.add_page(3, b'page3')
+        assert writer.pages_written == 1  # aucune page retenue en mémoire
+        writer.add_page(4, b'page4')
+        writer.add_page(1, b'page1')  # la page 2 a échoué
+        assert writer.pages_written == 3
+
+        assert writer.close()
+        assert not os.path.exists(cbz_path + ".part")
+
+        with zipfile.ZipFile(cbz_path) as cbz_file:
+            assert cbz_file.namelist() == ['page_001.jpg', 'page_003.jpg', 'page_004.jpg']
+            assert cbz_file.read('page_003.jpg') == b'page3'
+
+
+def test_empty_chapter_is_discarded():
+    """Un chapitre sans aucune page ne produit pas de CBZ"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cbz_path = os.path.join(temp_dir, "chapter.cbz")
+        writer = StreamingCBZWriter(cbz_path)
+
+        assert not writer.close()
+        assert os.listdir(temp_dir) == []
+
+
+def test_abort_removes_partial_file():
+    """Un téléchargement interrompu ne laisse pas de fichier partiel"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        writer = StreamingCBZWriter(os.path.join(temp_dir, "chapter.cbz"))
+        writer.add_page(1, b'page1')
+        writer.abort()
+        assert os.listdir(temp_dir) == []
+
+
+def main():
+    """Exécute les tests d'écriture CBZ en flux"""
+    test_out_of_order_pages_are_listed_in_order()
+    test_empty_chapter_is_discarded()
+    test_abort_removes_partial_file()
+    BeautifulLogger.success("Écriture CBZ en flux opérationnelle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test du cache des file_id Telegram (renvoi instantané des chapitres)
+"""
+
+import os
+import tempfile
+from utils.telegram_file_cache import TelegramFileCache
+from utils.beautiful_progress import BeautifulLogger
+
+
+class _FakeDocument:
+    def __init__(self, file_id, file_size):
+        self.file_id = file_id
+        self.file_size = file_size
+
+
+class _FakeMessage:
+    def __init__(self, file_id, file_size):
+        self.document = _FakeDocument(file_id, file_size)
+
+
+def test_put_and_find():
+    """Un chapitre envoyé est retrouvé quelle que soit l'écriture du nom"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = TelegramFileCache(os.path.join(temp_dir, 'files.json'))
+        cache.remember_message("Blue Lock", 272, 'cbz', _FakeMessage('FILE_272', 4_000_000))
+
+        file_format, entry = cache.find("blue lock", 272)
+        assert file_format == 'cbz'
+        assert entry['file_id'] == 'FILE_272'
+        assert entry['file_size'] == 4_000_000
+
+        assert cache.find("blue lock", 273) == (None, None)
+
+
+def test_persistence_and_invalidation():
+    """Le mapping survit au redémarrage et peut être invalidé"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'files.json')
+        TelegramFileCache(path).put("lookism", 1, 'zip', 'FILE_1')
+
+        reloaded = TelegramFileCache(path)
+        assert reloaded.find("lookism", 1)[0] == 'zip'
+
+        reloaded.invalidate("lookism", 1, 'zip')
+        assert TelegramFileCache(path).find("lookism", 1) == (None, None)
+
+
+def test_incomplete_chapter_is_not_remembered():
+    """Le file_id d'un chapitre avec des pages manquantes n'est jamais renvoyé"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = TelegramFileCache(os.path.join(temp_dir, 'files.json'))
+        cache.remember_message("lookism", 2, 'cbz', _FakeMessage('FILE_2', 1_000), complete=False)
+        assert cache.find("lookism", 2) == (None, None)
+
+        cache.remember_message("lookism", 2, 'cbz', _FakeMessage('FILE_2', 2_000), complete=True)
+        assert cache.find("lookism", 2)[1]['file_id'] == 'FILE_2'
+
+
+def main():
+    """Exécute les tests du cache des file_id"""
+    test_put_and_find()
+    test_persistence_and_invalidation()
+    test_incomplete_chapter_is_not_remembered()
+    BeautifulLogger.success("Cache des file_id opérationnel")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test du répartiteur des envois Telegram (cadencement, RetryAfter, priorités)
+"""
+
+import os
+import time
+import asyncio
+import tempfile
+from telegram.error import RetryAfter
+from utils.telegram_sender import TelegramSender, TokenBucket
+from utils.beautiful_progress import BeautifulLogger
+
+
+class FakeMessage:
+    """Message Telegram minimal : journalise les appels (et peut être limité)"""
+
+    def __init__(self, log, chat_id=42, message_id=1, delay=0.0, retry_after=()):
+        self.log = log
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.delay = delay
+        self.retry_after = list(retry_after)
+
+    async def _call(self, entry):
+        await asyncio.sleep(self.delay)
+        if self.retry_after:
+            raise RetryAfter(self.retry_after.pop(0))
+        self.log.append((entry, time.monotonic()))
+        return entry
+
+    async def reply_text(self, text, **kwargs):
+        return await self._call(('text', text))
+
+    async def edit_text(self, text, **kwargs):
+        return await self._call(('edit', text))
+
+    async def reply_document(self, document=None, **kwargs):
+        content = document.read() if hasattr(document, 'read') else document
+        return await self._call(('document', content))
+
+    async def reply_media_group(self, media, **kwargs):
+        album = [(item.media.filename, item.media.input_file_content, item.caption) for item in media]
+        return await self._call(('album', album))
+
+
+def test_token_bucket_refills_at_rate():
+    """Le seau autorise la rafale puis un jeton toutes les 1/rate secondes"""
+    bucket = TokenBucket(rate=2, capacity=2)
+    now = bucket.updated
+    assert bucket.delay(now) == 0
+    bucket.consume(now)
+    bucket.consume(now)
+    assert abs(bucket.delay(now) - 0.5) < 1e-6
+    assert bucket.delay(now + 0.5) == 0
+
+    bucket.pause(3, now + 0.5)
+    assert abs(bucket.delay(now + 0.5) - 3) < 1e-6
+
+
+def test_messages_are_paced_per_chat_in_order():
+    """Au-delà de la rafale, une conversation reçoit au plus chat_rate messages par seconde"""
+    sender = TelegramSender(chat_rate=10, chat_burst=1)
+    log = []
+
+    async def run():
+        message = FakeMessage(log)
+        other = FakeMessage(log, chat_id=7)
+        started = time.monotonic()
+        await asyncio.gather(
+            *(sender.reply_text(message, f"m{index}") for index in range(5)),
+            sender.reply_text(other, "autre")
+        )
+        return started
+
+    started = asyncio.run(run())
+    texts = [entry[1] for entry, _ in log]
+    assert [text for text in texts if text != "autre"] == [f"m{index}" for index in range(5)]
+    # Une autre conversation n'attend pas derrière la première
+    assert texts.index("autre") < 2
+    assert log[-1][1] - started >= 0.35
+    assert sender.get_stats()['sent'] == 6
+
+
+def test_retry_after_is_honoured():
+    """Un RetryAfter suspend la conversation le temps demandé puis renvoie la requête"""
+    sender = TelegramSender()
+    log = []
+
+    async def run():
+        message = FakeMessage(log, retry_after=[1])
+        started = time.monotonic()
+        result = await sender.reply_text(message, "chapitre prêt")
+        return started, result
+
+    started, result = asyncio.run(run())
+    assert result == ('text', "chapitre prêt")
+    assert len(log) == 1
+    assert log[0][1] - started >= 1.0
+    assert sender.get_stats()['retry_after'] == 1
+
+
+def test_documents_pass_before_coalesced_edits():
+    """Les documents passent avant les éditions ; seule la dernière édition est envoyée"""
+    sender = TelegramSender()
+    log = []
+
+    async def run(path):
+        busy = FakeMessage(log, message_id=1, delay=0.2)
+        progress = FakeMessage(log, message_id=2)
+        first = asyncio.create_task(sender.reply_text(busy, "recherche"))
+        await asyncio.sleep(0.05)
+        edits = [asyncio.create_task(sender.edit_text(progress, f"{percent}%")) for percent in (10, 50, 90)]
+        await asyncio.sleep(0)
+        document = asyncio.create_task(sender.reply_document(progress, path, filename="ch1.cbz"))
+        return await asyncio.gather(first, document, *edits)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "ch1.cbz")
+        with open(path, 'wb') as f:
+            f.write(b'cbz')
+        results = asyncio.run(run(path))
+
+    assert [entry for entry, _ in log] == [('text', "recherche"), ('document', b'cbz'), ('edit', "90%")]
+    assert results[2:] == [None, None, ('edit', "90%")]
+    assert sender.get_stats()['coalesced_edits'] == 2
+
+
+def test_album_is_one_request_counted_per_document():
+    """Un album part en un seul appel mais consomme un jeton par document"""
+    sender = TelegramSender(chat_rate=10, chat_burst=3)
+    log = []
+
+    async def run(documents):
+        message = FakeMessage(log)
+        await sender.reply_media_group(message, documents)
+        started = time.monotonic()
+        await sender.reply_text(message, "résumé")
+        return started
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        documents = []
+        for chapter in (1, 2, 3, 4, 5):
+            path = os.path.join(temp_dir, f"ch{chapter}.cbz")
+            with open(path, 'wb') as f:
+                f.write(f"cbz{chapter}".encode())
+            documents.append((path, f"Ch_{chapter}.cbz", f"Chapitre {chapter}"))
+        started = asyncio.run(run(documents))
+
+    (kind, album), _ = log[0]
+    assert kind == 'album'
+    assert album == [(f"Ch_{chapter}.cbz", f"cbz{chapter}".encode(), f"Chapitre {chapter}") for chapter in (1, 2, 3, 4, 5)]
+    # Cinq messages comptés pour une rafale de trois : le suivant attend
+    assert log[1][1] - started >= 0.25
+    assert sender.get_stats()['sent'] == 2
+
+
+def main():
+    test_token_bucket_refills_at_rate()
+    test_messages_are_paced_per_chat_in_order()
+    test_retry_after_is_honoured()
+    test_documents_pass_before_coalesced_edits()
+    test_album_is_one_request_counted_per_document()
+    BeautifulLogger.success("Répartiteur des envois Telegram OK")
+
+
+if __name__ == "__main__":
+    main()
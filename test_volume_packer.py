@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test du découpage des tomes en volumes sous la limite Telegram
+"""
+
+import os
+import zipfile
+import tempfile
+from utils.volume_packer import VolumePacker
+from utils.beautiful_progress import BeautifulLogger
+
+MAX_SIZE = 64 * 1024
+
+
+def _write_cbz(path, pages, page_size):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as cbz_file:
+        for page_number in range(1, pages + 1):
+            cbz_file.writestr(f"page_{page_number:03d}.jpg", os.urandom(page_size))
+    return path
+
+
+def test_chapters_are_split_into_parts_under_limit():
+    """Les chapitres sont répartis dans l'ordre en volumes sous la limite"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cbz_paths = [
+            _write_cbz(os.path.join(temp_dir, f"manga_ch{n}.cbz"), 4, 5000)
+            for n in range(1, 7)
+        ]
+        volumes = VolumePacker(max_size=MAX_SIZE).pack_files(cbz_paths, "manga_Tome_1", temp_dir)
+
+        assert len(volumes) > 1
+        assert [v['part'] for v in volumes] == list(range(1, len(volumes) + 1))
+        assert all(v['parts'] == len(volumes) for v in volumes)
+        assert os.path.basename(volumes[0]['path']) == f"manga_Tome_1_partie_1-{len(volumes)}.zip"
+
+        packed = []
+        for volume in volumes:
+            assert os.path.getsize(volume['path']) <= MAX_SIZE
+            with zipfile.ZipFile(volume['path']) as zip_file:
+                assert zip_file.testzip() is None
+                packed.extend(zip_file.namelist())
+        assert packed == [os.path.basename(path) for path in cbz_paths]
+
+
+def test_single_volume_keeps_plain_name():
+    """Un tome qui tient dans un seul volume garde un nom simple"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cbz_path = _write_cbz(os.path.join(temp_dir, "manga_ch1.cbz"), 2, 1000)
+        volumes = VolumePacker(max_size=MAX_SIZE).pack_files([cbz_path], "manga_Tome_1", temp_dir)
+
+        assert len(volumes) == 1
+        assert os.path.basename(volumes[0]['path']) == "manga_Tome_1.zip"
+
+
+def test_oversized_chapter_is_split_by_pages():
+    """Un chapitre plus gros qu'un volume est découpé par pages"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cbz_path = _write_cbz(os.path.join(temp_dir, "manga_ch1.cbz"), 12, 15000)
+        volumes = VolumePacker(max_size=MAX_SIZE).pack_files([cbz_path], "manga_Tome_1", temp_dir)
+
+        assert len(volumes) > 1
+        pages = []
+        for volume in volumes:
+            assert os.path.getsize(volume['path']) <= MAX_SIZE
+            with zipfile.ZipFile(volume['path']) as zip_file:
+                for piece_name in zip_file.namelist():
+                    assert piece_name.startswith("manga_ch1_partie_")
+                    piece_path = zip_file.extract(piece_name, os.path.join(temp_dir, "out"))
+                    with zipfile.ZipFile(piece_path) as piece:
+                        pages.extend(piece.namelist())
+        assert pages == [f"page_{n:03d}.jpg" for n in range(1, 13)]
+
+
+def test_failure_removes_partial_volumes():
+    """Une erreur de découpage lève ValueError sans laisser de volumes ni de morceaux"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cbz_path = _write_cbz(os.path.join(temp_dir, "manga_ch1.cbz"), 12, 15000)
+        oversized = os.path.join(temp_dir, "notes.txt")
+        with open(oversized, 'wb') as f:
+            f.write(os.urandom(MAX_SIZE))
+        before = sorted(os.listdir(temp_dir))
+
+        try:
+            VolumePacker(max_size=MAX_SIZE).pack_files([cbz_path, oversized], "manga_Tome_1", temp_dir)
+            raise AssertionError("ValueError attendue")
+        except ValueError:
+            pass
+        assert sorted(os.listdir(temp_dir)) == before
+
+
+def main():
+    """Exécute les tests du découpage en volumes"""
+    test_chapters_are_split_into_parts_under_limit()
+    test_single_volume_keeps_plain_name()
+    test_oversized_chapter_is_split_by_pages()
+    test_failure_removes_partial_volumes()
+    BeautifulLogger.success("Découpage en volumes opérationnel")
+
+
+if __name__ == "__main__":
+    main()
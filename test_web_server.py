@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test du serveur HTTP asyncio (webhook Telegram et routes de santé)
+"""
+
+import json
+import time
+import asyncio
+from utils.web_server import WebServer, telegram_webhook_handler
+from utils.download_queue import DownloadQueue
+from keep_alive import add_health_routes, HealthMonitor
+from utils.beautiful_progress import BeautifulLogger
+
+UPDATE = {
+    'update_id': 7,
+    'message': {'message_id': 1, 'date': 0, 'chat': {'id': 42, 'type': 'private'}, 'text': '/start'},
+}
+
+
+class FakeApplication:
+    """Application minimale : seule la file des mises à jour est utilisée"""
+
+    def __init__(self):
+        self.bot = None
+        self.update_queue = asyncio.Queue()
+
+
+async def _request(reader, writer, method, path, body=b'', headers=None):
+    """Envoie une requête sur une connexion ouverte et retourne (statut, corps)"""
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b'\r\n':
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length) if method != 'HEAD' else b''
+
+
+def test_webhook_updates_reach_the_application_queue():
+    """Une mise à jour signée est placée dans update_queue ; un mauvais jeton est refusé"""
+    async def run():
+        application = FakeApplication()
+        server = WebServer(host='127.0.0.1', port=0)
+        server.route('POST', '/webhook', telegram_webhook_handler(application, secret_token="s3cret"))
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+            body = json.dumps(UPDATE).encode()
+            forged = await _request(reader, writer, 'POST', '/webhook', body,
+                                    {'X-Telegram-Bot-Api-Secret-Token': 'faux'})
+            accepted = await _request(reader, writer, 'POST', '/webhook', body,
+                                      {'X-Telegram-Bot-Api-Secret-Token': 's3cret'})
+            invalid = await _request(reader, writer, 'POST', '/webhook', b'{pas du json',
+                                     {'X-Telegram-Bot-Api-Secret-Token': 's3cret'})
+            writer.close()
+            return forged, accepted, invalid, application.update_queue
+        finally:
+            await server.stop()
+
+    forged, accepted, invalid, queue = asyncio.run(run())
+    assert forged[0] == 403
+    assert accepted == (200, b'ok')
+    assert invalid[0] == 400
+    assert queue.qsize() == 1
+    update = queue.get_nowait()
+    assert update.update_id == 7 and update.message.text == '/start'
+
+
+def test_malformed_bodies_are_rejected():
+    """Corps découpé ou Content-Length invalide : réponse 411/400 au lieu d'une coupure"""
+    async def run():
+        server = WebServer(host='127.0.0.1', port=0)
+        server.route('POST', '/webhook', telegram_webhook_handler(FakeApplication()))
+        await server.start()
+        try:
+            statuses = []
+            for header in ("Transfer-Encoding: chunked", "Content-Length: -5", "Content-Length: abc"):
+                reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+                writer.write(f"POST /webhook HTTP/1.1\r\nHost: localhost\r\n{header}\r\n\r\n".encode())
+                await writer.drain()
+                statuses.append(int((await reader.readline()).split()[1]))
+                writer.close()
+            return statuses
+        finally:
+            await server.stop()
+
+    assert asyncio.run(run()) == [411, 400, 400]
+
+
+def test_health_routes_share_the_server():
+    """Les contrôles de santé sont servis sur le même port que le webhook, 503 avant le démarrage"""
+    async def run():
+        queue = DownloadQueue(workers=1)
+        health = HealthMonitor(queue)
+        server = WebServer(host='127.0.0.1', port=0)
+        add_health_routes(server, health)
+        server.route('POST', '/webhook', telegram_webhook_handler(FakeApplication()))
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+            starting = await _request(reader, writer, 'GET', '/health')
+
+            async def job():
+                pass
+            queue.submit(1, "scan", job)
+            while queue.last_success_at is None:
+                await asyncio.sleep(0.01)
+            health.mark_ready('webhook')
+            results = [
+                starting,
+                await _request(reader, writer, 'GET', '/health'),
+                await _request(reader, writer, 'GET', '/status'),
+                await _request(reader, writer, 'HEAD', '/'),
+                await _request(reader, writer, 'GET', '/webhook'),
+                await _request(reader, writer, 'GET', '/inconnu'),
+            ]
+            writer.close()
+            await queue.shutdown()
+            return results
+        finally:
+            await server.stop()
+
+    starting, health, status, head, wrong_method, missing = asyncio.run(run())
+    assert starting[0] == 503 and json.loads(starting[1])['status'] == 'starting'
+    assert health[0] == 200
+    payload = json.loads(health[1])
+    assert payload['status'] == 'healthy'
+    assert payload['queue'] == {'queued': 0, 'running': 0}
+    assert payload['last_success_age'] is not None and payload['last_success_age'] < 5
+    assert json.loads(status[1])['mode'] == 'webhook'
+    assert head == (200, b'')
+    assert wrong_method[0] == 405
+    assert missing[0] == 404
+
+
+def test_blocked_loop_is_reported():
+    """Une boucle bloquée par un appel synchrone rend /health dégradé"""
+    async def run():
+        health = HealthMonitor(max_loop_lag=0.1, lag_interval=0.05)
+        health.start()
+        health.mark_ready('polling')
+        await asyncio.sleep(0.1)
+        healthy = health.health_payload()
+        time.sleep(0.3)  # appel bloquant dans la boucle
+        await asyncio.sleep(0.01)
+        degraded = health.health_payload()
+        await health.stop()
+        return healthy, degraded
+
+    healthy, degraded = asyncio.run(run())
+    assert healthy[0] == 200
+    assert degraded[0] == 503 and degraded[1]['status'] == 'degraded'
+    assert degraded[1]['loop_lag_ms'] >= 200
+
+
+def main():
+    test_webhook_updates_reach_the_application_queue()
+    test_malformed_bodies_are_rejected()
+    test_health_routes_share_the_server()
+    test_blocked_loop_is_reported()
+    BeautifulLogger.success("Serveur HTTP asyncio OK")
+
+
+if __name__ == "__main__":
+    main()
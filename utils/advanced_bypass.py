@@ -10,10 +10,13 @@ import random
 import json
 import base64
 import os
+import threading
 from urllib.parse import urljoin, urlparse
 import ssl
 import socket
 from utils.beautiful_progress import BeautifulLogger
+from utils.http_pool import mount_pooled_adapters
+from utils.circuit_breaker import MISSING_STATUS_CODES
 
 class AdvancedAntiDetectionBypass:
     """
@@ -25,6 +28,9 @@ class AdvancedAntiDetectionBypass:
         self.session = None
         self.base_url = "https://anime-sama.fr"
         self.is_railway = os.environ.get('RAILWAY_ENVIRONMENT') is not None
+        # Session, identité et délais sont partagés : une requête à la fois (réentrant,
+        # la requête recrée elle-même la session au besoin)
+        self.lock = threading.RLock()
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
@@ -66,7 +72,9 @@ class AdvancedAntiDetectionBypass:
         # 4. Techniques de contournement Cloudflare
         self._apply_cloudflare_bypass(session)
         
-        self.session = session
+        # Jamais remplacée pendant la requête d'un autre thread
+        with self.lock:
+            self.session = session
         return session
     
     def _get_stealth_headers(self):
@@ -141,11 +149,7 @@ class AdvancedAntiDetectionBypass:
         """
         try:
             # Adapter SSL pour ressembler à un vrai navigateur
-            session.mount('https://', requests.adapters.HTTPAdapter(
-                max_retries=3,
-                pool_connections=10,
-                pool_maxsize=10
-            ))
+            mount_pooled_adapters(session, max_retries=3)
             
             # Configuration timeout réaliste
             session.timeout = (10, 30)
@@ -250,10 +254,17 @@ class AdvancedAntiDetectionBypass:
     def bypass_request(self, url, max_retries=5):
         """
         Effectuer une requête avec contournement avancé optimisé Railway
+        Retourne la dernière réponse obtenue (même en erreur) pour que l'appelant
+        distingue un hôte qui répond d'un hôte injoignable, None si aucune réponse
         """
+        with self.lock:
+            return self._bypass_request(url, max_retries)
+    
+    def _bypass_request(self, url, max_retries):
         if not self.session:
             self.create_stealth_session()
         
+        last_response = None
         for attempt in range(max_retries):
             try:
                 if self.verbose:
@@ -308,6 +319,7 @@ class AdvancedAntiDetectionBypass:
                     allow_redirects=True
                 )
                 
+                last_response = response
                 if self.verbose:
                     BeautifulLogger.info(f"Réponse: {response.status_code}")
                 
@@ -317,6 +329,10 @@ class AdvancedAntiDetectionBypass:
                         BeautifulLogger.success("Contournement réussi !")
                     return response
                 
+                elif response.status_code in MISSING_STATUS_CODES:
+                    # Ressource absente : une nouvelle identité n'y changera rien
+                    return response
+                
                 elif response.status_code == 403:
                     if self.verbose:
                         BeautifulLogger.warning("Erreur 403 - Rotation identité...")
@@ -356,7 +372,7 @@ class AdvancedAntiDetectionBypass:
         
         if self.verbose:
             BeautifulLogger.error("Échec après toutes les tentatives")
-        return None
+        return last_response
     
     def _rotate_identity(self):
         """
@@ -172,7 +172,7 @@ class BeautifulLogger:
 
 
 class MultiChapterProgress:
-    """Gestionnaire de progression pour plusieurs chapitres"""
+    """Gestionnaire de progression pour plusieurs chapitres (thread-safe, chapitres traités en parallèle)"""
     
     def __init__(self, total_chapters, manga_name):
         self.total_chapters = total_chapters
@@ -181,28 +181,43 @@ class MultiChapterProgress:
         self.start_time = time.time()
         self.successful_downloads = []
         self.failed_downloads = []
+        self.in_progress = set()
+        self.lock = threading.Lock()
         
     def start_chapter(self, chapter_number):
         """Démarre un nouveau chapitre"""
-        self.current_chapter = chapter_number
-        BeautifulLogger.chapter_start(self.manga_name, chapter_number)
-        
-        # Progression générale
-        chapter_index = len(self.successful_downloads) + len(self.failed_downloads) + 1
-        percentage = (chapter_index / self.total_chapters) * 100
-        
-        print(f"{Colors.CYAN}📊 Progression générale: {chapter_index}/{self.total_chapters} "
-              f"({percentage:.1f}%){Colors.RESET}")
+        with self.lock:
+            self.current_chapter = chapter_number
+            self.in_progress.add(chapter_number)
+            BeautifulLogger.chapter_start(self.manga_name, chapter_number)
+            
+            # Progression générale
+            finished = len(self.successful_downloads) + len(self.failed_downloads)
+            percentage = (finished / self.total_chapters) * 100
+            in_progress = ', '.join(map(str, sorted(self.in_progress)))
+            
+            print(f"{Colors.CYAN}📊 Progression générale: {finished}/{self.total_chapters} "
+                  f"({percentage:.1f}%) | En cours: {in_progress}{Colors.RESET}")
+    
+    def _chapter_finished(self, chapter_number):
+        """Retire un chapitre des chapitres en cours (verrou déjà pris)"""
+        self.in_progress.discard(chapter_number)
+        return len(self.successful_downloads) + len(self.failed_downloads)
     
     def chapter_success(self, chapter_number, cbz_path, file_size_mb):
         """Marque un chapitre comme réussi"""
-        self.successful_downloads.append(chapter_number)
-        BeautifulLogger.chapter_complete(cbz_path, file_size_mb)
+        with self.lock:
+            self.successful_downloads.append(chapter_number)
+            finished = self._chapter_finished(chapter_number)
+            BeautifulLogger.chapter_complete(cbz_path, file_size_mb)
+            print(f"{Colors.GREEN}[{finished}/{self.total_chapters}] ✅ Chapitre {chapter_number} terminé{Colors.RESET}")
         
     def chapter_failed(self, chapter_number, error_message):
         """Marque un chapitre comme échoué"""
-        self.failed_downloads.append(chapter_number)
-        BeautifulLogger.error(f"Échec chapitre {chapter_number}: {error_message}")
+        with self.lock:
+            self.failed_downloads.append(chapter_number)
+            finished = self._chapter_finished(chapter_number)
+            BeautifulLogger.error(f"[{finished}/{self.total_chapters}] Échec chapitre {chapter_number}: {error_message}")
     
     def finish(self):
         """Termine et affiche le résumé"""
@@ -215,7 +230,7 @@ class MultiChapterProgress:
         
         if self.failed_downloads:
             print(f"{Colors.RED}❌ Échecs: {len(self.failed_downloads)} chapitres "
-                  f"({', '.join(map(str, self.failed_downloads))}){Colors.RESET}")
+                  f"({', '.join(map(str, sorted(self.failed_downloads)))}){Colors.RESET}")
         
         success_rate = (len(self.successful_downloads) / self.total_chapters) * 100
         print(f"{Colors.CYAN}📊 Taux de réussite: {success_rate:.1f}%{Colors.RESET}")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Manifestes de reprise des chapitres
+Le manifeste d'un chapitre associe chaque page téléchargée à sa clé dans le cache
+de pages, avec sa taille et son SHA-256 : les octets ne sont stockés qu'une fois
+(dans le cache de pages) et une nouvelle tentative ne télécharge que les pages manquantes
+"""
+
+import io
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from utils.beautiful_progress import BeautifulLogger
+
+MANIFEST_EXTENSION = ".jsonl"
+MANIFEST_VERSION = 1
+
+
+def page_cache_key(page_key):
+    """
+    Clé d'une page dans le cache de pages : l'ID Google Drive, sous lequel le
+    téléchargeur l'a déjà rangée, sinon un condensé de l'URL
+
+    Args:
+        page_key (tuple): ('gdrive', file_id) ou ('url', url), voir GoogleDriveDownloader.page_key
+    """
+    kind, value = page_key
+    if kind == 'gdrive':
+        return value
+    return 'url_' + hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+class ChapterManifest:
+    """
+    Pages déjà téléchargées d'un chapitre (manga, chapitre)
+    Journal en ajout seul : une ligne JSON par page, la dernière ligne d'une page l'emporte.
+    Les lignes d'une autre liste d'URLs (chapitre modifié côté source) sont ignorées
+    """
+
+    def __init__(self, manifest_path, manga_name, chapter_number, image_urls, page_cache=None, page_key=None, verbose=False):
+        self.manifest_path = manifest_path
+        self.manga_name = manga_name
+        self.chapter_number = chapter_number
+        self.total_pages = len(image_urls)
+        self.page_cache = page_cache
+        self.verbose = verbose
+        self.urls_digest = hashlib.sha256('\n'.join(image_urls).encode('utf-8')).hexdigest()
+
+        page_key = page_key or (lambda url: ('url', url))
+        page_keys = [page_key(url) for url in image_urls]
+        self._cache_keys = [page_cache_key(key) for key in page_keys]
+        # Pages Google Drive : déjà rangées dans le cache par le téléchargeur
+        self._downloader_cached = [kind == 'gdrive' for kind, _ in page_keys]
+        self._pages = {}  # numéro de page -> {'key', 'size', 'sha256'}
+        self._lock = threading.Lock()
+
+        if self.enabled:
+            self._load()
+
+    @property
+    def enabled(self):
+        """Sans cache de pages, aucune page ne peut être conservée"""
+        return self.page_cache is not None and self.page_cache.enabled
+
+    def _load(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return
+
+        stale = 0
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Dernière ligne tronquée par un arrêt brutal
+                continue
+            if record.get('v') != MANIFEST_VERSION or record.get('urls') != self.urls_digest:
+                stale += 1
+                continue
+            self._pages[record['page']] = {key: record[key] for key in ('key', 'size', 'sha256')}
+
+        if stale and not self._pages and self.verbose:
+            # Le chapitre a changé côté source : les pages conservées ne correspondent plus
+            BeautifulLogger.warning(f"Manifeste obsolète pour le chapitre {self.chapter_number}, reprise ignorée")
+
+    @property
+    def completed_pages(self):
+        """Nombre de pages conservées"""
+        with self._lock:
+            return len(self._pages)
+
+    def is_complete(self):
+        """Vrai si toutes les pages du chapitre sont conservées"""
+        return self.completed_pages >= self.total_pages
+
+    def read_page(self, page_number):
+        """
+        Contenu d'une page déjà téléchargée, lu dans le cache de pages et vérifié par taille et SHA-256
+
+        Returns:
+            bytes: Contenu de la page, ou None si elle manque, a été évincée ou est corrompue
+        """
+        with self._lock:
+            entry = self._pages.get(page_number)
+        if entry is None:
+            return None
+
+        buffer = io.BytesIO()
+        data = buffer.getvalue() if self.page_cache.read_into(entry['key'], buffer) else None
+
+        if data is None or len(data) != entry['size'] or hashlib.sha256(data).hexdigest() != entry['sha256']:
+            if self.verbose:
+                BeautifulLogger.warning(f"Page {page_number} conservée invalide, nouveau téléchargement")
+            with self._lock:
+                self._pages.pop(page_number, None)
+            return None
+        return data
+
+    def record_page(self, page_number, data):
+        """Range une page téléchargée dans le cache de pages et l'ajoute au manifeste"""
+        if not self.enabled:
+            return
+
+        key = self._cache_keys[page_number - 1]
+        entry = {'key': key, 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+        # Une page Google Drive est déjà dans le cache : seul le manifeste est écrit
+        already_cached = self._downloader_cached[page_number - 1] and self.page_cache.contains(key)
+        if not already_cached and not self.page_cache.store_stream(key, io.BytesIO(data)):
+            return
+
+        record = {'v': MANIFEST_VERSION, 'urls': self.urls_digest, 'page': page_number, **entry}
+        line = json.dumps(record) + '\n'
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+                # Une seule écriture en mode ajout par page : pas de réécriture du manifeste
+                with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                self._pages[page_number] = entry
+        except OSError as e:
+            # La reprise est un bonus : une erreur disque n'interrompt pas le chapitre
+            if self.verbose:
+                BeautifulLogger.warning(f"Impossible de conserver la page {page_number}: {e}")
+
+    def discard(self):
+        """
+        Supprime le manifeste (chapitre terminé)
+        Les pages restent dans le cache de pages, qui les évince selon sa propre politique
+        """
+        try:
+            os.remove(self.manifest_path)
+        except FileNotFoundError:
+            pass
+
+
+class ChapterManifestStore:
+    """
+    Répertoire des manifestes : un fichier par (manga, chapitre), les pages dans le cache de pages
+    """
+
+    def __init__(self, resume_dir, page_cache=None, page_key=None, max_age_seconds=7 * 24 * 3600, verbose=False):
+        self.resume_dir = resume_dir
+        self.page_cache = page_cache
+        self.page_key = page_key
+        self.max_age_seconds = max_age_seconds
+        self.verbose = verbose
+        os.makedirs(self.resume_dir, exist_ok=True)
+        self.prune()
+
+    def manifest_path(self, manga_name, chapter_number):
+        slug = re.sub(r'[^a-z0-9]+', '_', manga_name.lower()).strip('_') or 'manga'
+        return os.path.join(self.resume_dir, slug, f"ch{chapter_number}{MANIFEST_EXTENSION}")
+
+    def open(self, manga_name, chapter_number, image_urls):
+        """Manifeste du chapitre, avec les pages des tentatives précédentes"""
+        return ChapterManifest(
+            self.manifest_path(manga_name, chapter_number), manga_name, chapter_number,
+            image_urls, self.page_cache, self.page_key, self.verbose
+        )
+
+    def prune(self):
+        """Supprime les manifestes des chapitres abandonnés depuis plus de max_age_seconds"""
+        now = time.time()
+        removed = 0
+        for manga_entry in os.scandir(self.resume_dir):
+            if not manga_entry.is_dir():
+                continue
+            for chapter_entry in os.scandir(manga_entry.path):
+                if not chapter_entry.name.endswith(MANIFEST_EXTENSION):
+                    continue
+                try:
+                    if now - chapter_entry.stat().st_mtime > self.max_age_seconds:
+                        os.remove(chapter_entry.path)
+                        removed += 1
+                except OSError:
+                    continue
+        if removed and self.verbose:
+            BeautifulLogger.info(f"{removed} chapitre(s) abandonné(s) supprimé(s) du répertoire de reprise")
+        return removed
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Disjoncteur par hôte, partagé par tous les jobs du processus
+Après plusieurs échecs consécutifs, l'hôte est considéré indisponible : les requêtes
+échouent immédiatement jusqu'à une tentative de test (demi-ouvert) après reset_timeout
+"""
+
+import os
+import time
+import threading
+from urllib.parse import urlparse
+from utils.beautiful_progress import BeautifulLogger
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# L'hôte a répondu mais la ressource n'existe pas : ce n'est pas une panne
+MISSING_STATUS_CODES = (404, 410)
+
+
+def is_host_failure(status_code):
+    """Statut HTTP qui compte comme un échec de l'hôte (blocage, limitation ou erreur serveur)"""
+    return status_code in (403, 429) or status_code >= 500
+
+
+class CircuitOpenError(Exception):
+    """L'hôte est indisponible : réessayer dans retry_in secondes"""
+
+    def __init__(self, host, retry_in):
+        super().__init__(f"Source {host} indisponible, nouvel essai dans {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class _HostCircuit:
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+
+class HostCircuitBreaker:
+    """
+    Disjoncteur fermé / ouvert / demi-ouvert, un circuit par hôte
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=60.0, verbose=False):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.verbose = verbose
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+        self.trips = 0
+        self.short_circuits = 0
+
+    @staticmethod
+    def _host(url):
+        return urlparse(url).netloc or url
+
+    def _circuit(self, host):
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = self._circuits[host] = _HostCircuit()
+        return circuit
+
+    def before_request(self, url):
+        """
+        Autorise une requête vers l'hôte de l'URL
+
+        Raises:
+            CircuitOpenError: Si l'hôte est indisponible (ou si une requête de test est déjà en cours)
+        """
+        host = self._host(url)
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == CLOSED:
+                return
+
+            retry_in = circuit.opened_at + self.reset_timeout - time.monotonic()
+            if circuit.state == OPEN and retry_in <= 0:
+                # Délai écoulé : une seule requête de test est autorisée
+                circuit.state = HALF_OPEN
+                circuit.probe_in_flight = True
+                return
+
+            self.short_circuits += 1
+            raise CircuitOpenError(host, max(0.0, retry_in))
+
+    def retry_in(self, url):
+        """
+        Secondes avant la prochaine tentative autorisée vers l'hôte
+
+        Returns:
+            float: 0 si le circuit est fermé ou si une tentative de test est possible
+        """
+        with self._lock:
+            circuit = self._circuits.get(self._host(url))
+            if circuit is None or circuit.state == CLOSED:
+                return 0.0
+            if circuit.state == HALF_OPEN and circuit.probe_in_flight:
+                return self.reset_timeout
+            return max(0.0, circuit.opened_at + self.reset_timeout - time.monotonic())
+
+    def record_success(self, url):
+        """L'hôte a répondu : le circuit se referme"""
+        host = self._host(url)
+        with self._lock:
+            circuit = self._circuit(host)
+            was_open = circuit.state != CLOSED
+            circuit.state = CLOSED
+            circuit.failures = 0
+            circuit.probe_in_flight = False
+        if was_open and self.verbose:
+            BeautifulLogger.success(f"Source {host} de nouveau disponible")
+
+    def record_failure(self, url):
+        """Un échec de plus : ouvre le circuit au seuil, ou immédiatement après un test raté"""
+        host = self._host(url)
+        with self._lock:
+            circuit = self._circuit(host)
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                tripped = circuit.state == CLOSED
+                circuit.state = OPEN
+                circuit.opened_at = time.monotonic()
+                circuit.probe_in_flight = False
+                if tripped:
+                    self.trips += 1
+            else:
+                tripped = False
+        if tripped and self.verbose:
+            BeautifulLogger.warning(f"Source {host} indisponible, requêtes suspendues {self.reset_timeout:.0f}s")
+
+    def state(self, url):
+        """État du circuit de l'hôte ('closed', 'open' ou 'half_open')"""
+        with self._lock:
+            circuit = self._circuits.get(self._host(url))
+            return circuit.state if circuit else CLOSED
+
+    def get_stats(self):
+        """Statistiques du disjoncteur"""
+        with self._lock:
+            return {
+                'open_hosts': sorted(host for host, circuit in self._circuits.items() if circuit.state != CLOSED),
+                'trips': self.trips,
+                'short_circuits': self.short_circuits,
+            }
+
+
+_shared_breaker = None
+_shared_breaker_lock = threading.Lock()
+
+
+def get_shared_circuit_breaker():
+    """
+    Retourne le disjoncteur partagé par le processus
+    Configurable via CIRCUIT_FAILURE_THRESHOLD (échecs consécutifs) et CIRCUIT_RESET_TIMEOUT (secondes)
+    """
+    global _shared_breaker
+    with _shared_breaker_lock:
+        if _shared_breaker is None:
+            _shared_breaker = HostCircuitBreaker(
+                failure_threshold=int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 3)),
+                reset_timeout=float(os.getenv('CIRCUIT_RESET_TIMEOUT', 60))
+            )
+        return _shared_breaker
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Politique de compression des entrées ZIP/CBZ
+Les médias déjà compressés (JPEG, PNG, WebP, GIF, ZIP/CBZ) sont stockés tels quels,
+seuls le texte et les métadonnées passent par DEFLATE
+"""
+
+import zipfile
+from utils.image_format import detect_image_format
+
+# Formats dont le contenu est déjà compressé : DEFLATE n'y gagne que 0-2%
+PRECOMPRESSED_IMAGE_FORMATS = {'JPEG', 'PNG', 'GIF', 'WEBP'}
+
+# Signatures d'archives (un CBZ est un ZIP)
+ARCHIVE_SIGNATURES = (b'PK\x03\x04', b'PK\x05\x06')
+
+SNIFF_SIZE = 16
+
+
+def is_precompressed(header):
+    """
+    Indique si le contenu commençant par header est déjà compressé
+
+    Args:
+        header (bytes): Premiers octets du contenu
+
+    Returns:
+        bool: True pour les images compressées et les archives
+    """
+    if header.startswith(ARCHIVE_SIGNATURES):
+        return True
+    return detect_image_format(header) in PRECOMPRESSED_IMAGE_FORMATS
+
+
+def compress_type_for_bytes(data):
+    """Méthode de compression ZIP adaptée à un contenu en mémoire"""
+    if is_precompressed(data[:SNIFF_SIZE]):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def compress_type_for_file(file_path):
+    """Méthode de compression ZIP adaptée à un fichier sur disque"""
+    with open(file_path, 'rb') as f:
+        header = f.read(SNIFF_SIZE)
+    if is_precompressed(header):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+File d'attente des téléchargements du bot
+Les handlers Telegram mettent les jobs en file et rendent la main immédiatement ;
+les appels bloquants du scraper tournent dans un pool de threads
+"""
+
+import os
+import time
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.beautiful_progress import BeautifulLogger
+
+
+class UserJobLimitError(Exception):
+    """Levée quand un utilisateur a déjà atteint son nombre de jobs simultanés"""
+
+    def __init__(self, user_id, limit):
+        super().__init__(f"Utilisateur {user_id}: limite de {limit} job(s) atteinte")
+        self.user_id = user_id
+        self.limit = limit
+
+
+class DownloadQueue:
+    """
+    File asyncio servie par un nombre fixe de workers, avec plafond par utilisateur
+    """
+
+    def __init__(self, workers=2, max_jobs_per_user=1):
+        self.workers = max(1, workers)
+        self.max_jobs_per_user = max(1, max_jobs_per_user)
+
+        # Deux threads par worker : un job peut compresser ou envoyer un chapitre
+        # pendant que ses chapitres suivants se téléchargent
+        self._executor = ThreadPoolExecutor(max_workers=self.workers * 2, thread_name_prefix="download")
+        self._queue = None
+        self._worker_tasks = []
+        self._user_jobs = {}  # user_id -> jobs en file ou en cours
+
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.last_success_at = None
+
+    def _ensure_started(self):
+        """Démarre les workers dans la boucle courante au premier job"""
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._worker_tasks = [
+            asyncio.get_running_loop().create_task(self._worker(index))
+            for index in range(self.workers)
+        ]
+
+    def submit(self, user_id, name, job_factory):
+        """
+        Met un job en file
+
+        Args:
+            user_id (int): Utilisateur Telegram à l'origine du job
+            name (str): Libellé du job (logs)
+            job_factory (callable): Fonction sans argument retournant la coroutine du job
+
+        Returns:
+            int: Nombre de jobs devant celui-ci (0 = démarre dès qu'un worker est libre)
+
+        Raises:
+            UserJobLimitError: Si l'utilisateur a déjà trop de jobs
+        """
+        self._ensure_started()
+
+        if self._user_jobs.get(user_id, 0) >= self.max_jobs_per_user:
+            raise UserJobLimitError(user_id, self.max_jobs_per_user)
+
+        position = max(0, self._queue.qsize() + self.running - self.workers + 1)
+        self._user_jobs[user_id] = self._user_jobs.get(user_id, 0) + 1
+        self._queue.put_nowait((user_id, name, job_factory))
+        return position
+
+    async def run_blocking(self, function, *args, **kwargs):
+        """Exécute un appel bloquant (scraping, compression) dans le pool de threads"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+
+    async def _worker(self, index):
+        while True:
+            user_id, name, job_factory = await self._queue.get()
+            self.running += 1
+            try:
+                await job_factory()
+                self.completed += 1
+                self.last_success_at = time.time()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                BeautifulLogger.error(f"Job '{name}' échoué: {e}")
+            finally:
+                self.running -= 1
+                remaining = self._user_jobs.get(user_id, 1) - 1
+                if remaining > 0:
+                    self._user_jobs[user_id] = remaining
+                else:
+                    self._user_jobs.pop(user_id, None)
+                self._queue.task_done()
+
+    @property
+    def depth(self):
+        """Jobs en attente (hors jobs en cours)"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def join(self):
+        """Attend que tous les jobs en file et en cours soient terminés"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def shutdown(self):
+        """Arrête les workers et le pool de threads"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self):
+        """Statistiques de la file"""
+        return {
+            'workers': self.workers,
+            'max_jobs_per_user': self.max_jobs_per_user,
+            'queued': self.depth,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'last_success_at': self.last_success_at,
+        }
+
+
+_shared_queue = None
+_shared_queue_lock = threading.Lock()
+
+
+def get_shared_download_queue():
+    """
+    Retourne la file de téléchargement partagée par le processus
+    Configurable via BOT_JOB_WORKERS et BOT_MAX_JOBS_PER_USER
+    """
+    global _shared_queue
+    with _shared_queue_lock:
+        if _shared_queue is None:
+            _shared_queue = DownloadQueue(
+                workers=int(os.getenv('BOT_JOB_WORKERS', 2)),
+                max_jobs_per_user=int(os.getenv('BOT_MAX_JOBS_PER_USER', 1))
+            )
+        return _shared_queue
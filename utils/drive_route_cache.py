@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Mémoire des chemins de téléchargement Google Drive qui ont fonctionné
+Par ID de fichier (URL directe résolue) et par forme d'URL (stratégie gagnante),
+partagée par tous les téléchargeurs du processus
+"""
+
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+
+
+def url_shape(drive_url, file_id):
+    """
+    Forme d'une URL Google Drive, indépendante de l'ID de fichier
+
+    Exemple: https://drive.google.com/open?id=XYZ -> drive.google.com/open?id
+    """
+    parsed = urlparse(drive_url)
+    path = parsed.path.replace(file_id, '{id}') if file_id else parsed.path
+    query_keys = '&'.join(sorted(parse_qs(parsed.query).keys()))
+    return f"{parsed.netloc}{path}?{query_keys}"
+
+
+class DriveRouteCache:
+    """
+    Retient, pour chaque fichier, la stratégie et l'URL qui ont livré l'image,
+    et pour chaque forme d'URL, la stratégie à essayer en premier
+    """
+
+    def __init__(self, max_routes=10000):
+        self.max_routes = max_routes
+        self._routes = OrderedDict()  # file_id -> (stratégie, url), du moins au plus récent
+        self._preferred = {}  # forme d'URL -> stratégie
+        self._lock = threading.Lock()
+
+        self.route_hits = 0
+        self.route_misses = 0
+
+    def route_for(self, file_id):
+        """
+        Chemin déjà résolu pour un fichier
+
+        Returns:
+            tuple: (stratégie, url) ou None
+        """
+        with self._lock:
+            route = self._routes.get(file_id)
+            if route is None:
+                self.route_misses += 1
+                return None
+            self._routes.move_to_end(file_id)
+            self.route_hits += 1
+            return route
+
+    def preferred_strategy(self, shape):
+        """Stratégie gagnante pour cette forme d'URL, ou None"""
+        with self._lock:
+            return self._preferred.get(shape)
+
+    def record(self, file_id, shape, strategy_name, resolved):
+        """
+        Enregistre un téléchargement réussi
+
+        Args:
+            file_id (str): ID Google Drive
+            shape (str): Forme de l'URL d'origine (url_shape)
+            strategy_name (str): Stratégie de premier niveau qui a réussi
+            resolved (tuple): (stratégie, url) de la requête qui a livré l'image
+        """
+        final_strategy = resolved[0]
+        if final_strategy == 'base_download':
+            # La page HTML n'a rien apporté : l'URL directe suffit
+            strategy_name = 'direct_download'
+
+        with self._lock:
+            self._routes[file_id] = resolved
+            self._routes.move_to_end(file_id)
+            while len(self._routes) > self.max_routes:
+                self._routes.popitem(last=False)
+            self._preferred[shape] = strategy_name
+
+    def forget(self, file_id):
+        """Oublie le chemin d'un fichier (URL expirée ou refusée)"""
+        with self._lock:
+            self._routes.pop(file_id, None)
+
+    def get_stats(self):
+        """Statistiques de la mémoire des chemins"""
+        with self._lock:
+            return {
+                'routes': len(self._routes),
+                'shapes': len(self._preferred),
+                'route_hits': self.route_hits,
+                'route_misses': self.route_misses,
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_drive_route_cache():
+    """Retourne la mémoire des chemins Google Drive partagée par le processus"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = DriveRouteCache()
+        return _shared_cache
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Cache LRU en mémoire pour les fichiers episodes.js
+TTL par entrée et revalidation conditionnelle (ETag / Last-Modified)
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+
+class EpisodesCache:
+    """
+    Cache partagé entre toutes les requêtes du bot, indexé par l'URL de base du manga
+    """
+
+    def __init__(self, max_entries=128, ttl=600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Compteurs exposés via get_stats()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    def lookup(self, key):
+        """
+        Cherche une entrée dans le cache
+
+        Returns:
+            tuple: (entry, is_fresh) - entry vaut None si la clé est absente
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            self._entries.move_to_end(key)
+            if time.monotonic() < entry['expires_at']:
+                self.hits += 1
+                return entry, True
+
+            # Entrée expirée : l'appelant peut la revalider
+            self.misses += 1
+            return entry, False
+
+    def store(self, key, content, etag=None, last_modified=None):
+        """Ajoute ou remplace une entrée (éviction LRU si le cache est plein)"""
+        with self._lock:
+            self._entries[key] = {
+                'content': content,
+                'etag': etag,
+                'last_modified': last_modified,
+                'expires_at': time.monotonic() + self.ttl,
+            }
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def store_response(self, key, response):
+        """Met en cache le corps d'une réponse HTTP avec ses validateurs"""
+        self.store(
+            key,
+            response.text,
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified')
+        )
+
+    def mark_revalidated(self, key):
+        """Prolonge une entrée après une réponse 304 Not Modified"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry['expires_at'] = time.monotonic() + self.ttl
+            self.revalidations += 1
+            return entry
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Headers If-None-Match / If-Modified-Since pour revalider une entrée"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def invalidate(self, key):
+        """Retire une entrée du cache"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_stats(self):
+        """Statistiques du cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidations': self.revalidations,
+                'hit_rate': (self.hits / lookups * 100) if lookups else 0.0,
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_episodes_cache():
+    """
+    Retourne le cache episodes.js partagé par le processus
+    Configurable via EPISODES_CACHE_TTL (secondes) et EPISODES_CACHE_SIZE
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = EpisodesCache(
+                max_entries=int(os.getenv('EPISODES_CACHE_SIZE', 128)),
+                ttl=float(os.getenv('EPISODES_CACHE_TTL', 600))
+            )
+        return _shared_cache
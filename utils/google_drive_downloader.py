@@ -4,39 +4,61 @@ Module spécialisé pour le téléchargement d'images depuis Google Drive
 Intégré au système hybride de contournement
 """
 
+import os
 import re
 import requests
-import time
-import random
+from collections import ChainMap
+from types import MappingProxyType
 from urllib.parse import urlparse, parse_qs
 from utils.beautiful_progress import BeautifulLogger
+from utils.drive_route_cache import url_shape
+from utils.retry_policy import get_shared_retry_policy, retry_after_from, RetryAfterError, THROTTLING_STATUS_CODES
+
+# Taille minimale d'une image valide et taille maximale d'une page HTML exploitable
+MIN_IMAGE_SIZE = 500
+MAX_HTML_PAGE_SIZE = 50000
+
+# Les premiers octets suffisent à distinguer une page HTML d'une image
+SNIFF_SIZE = 2048
+CHUNK_SIZE = 8192
+HTML_MARKERS = (b'<!doctype html', b'<html', b'<head', b'<body', b'<script')
+
+# Premier délai entre deux tours de stratégies
+RETRY_BASE_DELAY = 2.0
+
+# Headers spécialisés pour Google Drive, partagés par tous les threads et boucles asyncio
+GDRIVE_HEADERS = MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"Windows"'
+})
 
 class GoogleDriveDownloader:
     """
     Téléchargeur spécialisé pour les images stockées sur Google Drive
+    Les décisions (stratégies, headers, détection des pages HTML) sont partagées
+    avec AsyncImageDownloader pour garder la même logique de reprise
     """
     
-    def __init__(self, session, verbose=False):
+    def __init__(self, session, verbose=False, route_cache=None, retry_policy=None):
         self.session = session
         self.verbose = verbose
+        self.route_cache = route_cache  # DriveRouteCache partagé, ou None
+        self.retry_policy = retry_policy or get_shared_retry_policy()
         
-        # Headers spécialisés pour Google Drive
-        self.gdrive_headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Sec-Fetch-User': '?1',
-            'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-            'sec-ch-ua-mobile': '?0',
-            'sec-ch-ua-platform': '"Windows"'
-        }
+        # Profil de headers partagé en lecture seule : jamais modifié par requête
+        self.gdrive_headers = GDRIVE_HEADERS
     
     def is_google_drive_url(self, url):
         """
@@ -76,6 +98,16 @@ class GoogleDriveDownloader:
             BeautifulLogger.warning(f"Impossible d'extraire l'ID de: {drive_url}")
         return None
     
+    def page_key(self, url):
+        """
+        Clé stable d'une page : l'ID Google Drive (quelle que soit la forme de l'URL), sinon l'URL
+        """
+        if self.is_google_drive_url(url):
+            file_id = self.extract_file_id(url)
+            if file_id:
+                return ('gdrive', file_id)
+        return ('url', url)
+    
     def build_direct_download_url(self, file_id):
         """
         Construit l'URL de téléchargement direct Google Drive
@@ -88,6 +120,109 @@ class GoogleDriveDownloader:
         """
         return f"https://drive.google.com/file/d/{file_id}/view"
     
+    def build_strategies(self, file_id, drive_url):
+        """
+        Stratégies de téléchargement dans l'ordre de priorité
+        La stratégie gagnante pour cette forme d'URL passe en tête
+        
+        Returns:
+            list: Liste de (nom_stratégie, url)
+        """
+        strategies = [
+            ('direct_download', self.build_direct_download_url(file_id)),
+            ('view_page', self.build_view_url(file_id)),
+            ('original_url', drive_url)
+        ]
+        if self.route_cache is not None:
+            preferred = self.route_cache.preferred_strategy(url_shape(drive_url, file_id))
+            if preferred:
+                strategies.sort(key=lambda strategy: strategy[0] != preferred)
+        return strategies
+    
+    def known_route(self, file_id):
+        """Chemin (stratégie, url) qui a déjà livré ce fichier, ou None"""
+        if self.route_cache is None:
+            return None
+        return self.route_cache.route_for(file_id)
+    
+    def forget_route(self, file_id):
+        """Oublie le chemin mémorisé d'un fichier après un échec"""
+        if self.route_cache is not None:
+            self.route_cache.forget(file_id)
+    
+    def remember_route(self, file_id, drive_url, strategy_name, resolved):
+        """Mémorise la stratégie et l'URL résolue qui ont livré le fichier"""
+        if self.route_cache is not None:
+            self.route_cache.record(file_id, url_shape(drive_url, file_id), strategy_name, resolved)
+    
+    def strategy_headers(self, strategy_name, file_id):
+        """
+        Headers à envoyer pour une stratégie, passés via headers= à chaque requête
+        
+        Returns:
+            Mapping: Profil immuable, complété du Referer pour le téléchargement direct
+        """
+        if strategy_name == 'direct_download':
+            # Le Referer est superposé au profil, sans copier ce dernier
+            return ChainMap({'Referer': self.build_view_url(file_id)}, self.gdrive_headers)
+        return self.gdrive_headers
+    
+    @staticmethod
+    def is_html_response(content_type, head):
+        """
+        Vrai si la réponse est une page HTML (interstitiel, avertissement) et non une image
+        
+        Args:
+            content_type (str): Header Content-Type
+            head (bytes): Premiers octets du corps (SNIFF_SIZE suffisent)
+        """
+        sample = head[:SNIFF_SIZE].lstrip().lower()
+        if not sample.startswith(b'<'):
+            return False
+        return 'text/html' in content_type.lower() or any(marker in sample for marker in HTML_MARKERS)
+    
+    @staticmethod
+    def read_head(chunks, size=SNIFF_SIZE, head=b''):
+        """
+        Lit au moins size octets (ou tout le corps s'il est plus court) depuis un itérateur de morceaux
+        
+        Returns:
+            tuple: (octets lus, True si le corps est terminé)
+        """
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= size:
+                return head, False
+        return head, True
+    
+    @staticmethod
+    def is_confirmation_page(final_url, text=""):
+        """Vrai si Google a redirigé vers une connexion ou une page d'avertissement"""
+        return 'accounts.google.com' in final_url or 'warning' in text.lower()
+    
+    def find_direct_download_url(self, html_content, file_id):
+        """
+        Cherche l'URL de téléchargement direct dans le HTML de Google Drive
+        
+        Returns:
+            str: URL nettoyée, ou None si aucune n'est trouvée
+        """
+        # Patterns pour trouver l'URL directe
+        patterns = [
+            r'"downloadUrl":"([^"]+)"',
+            r'&export=download&id=' + re.escape(file_id) + r'[^"]*',
+            r'https://drive\.google\.com/uc\?export=download&id=' + re.escape(file_id),
+            r'"([^"]*uc\?export=download[^"]*' + re.escape(file_id) + '[^"]*)"'
+        ]
+        
+        for pattern in patterns:
+            matches = re.findall(pattern, html_content)
+            for match in matches:
+                if 'export=download' in match and file_id in match:
+                    # Nettoyer l'URL
+                    return match.replace('\\u003d', '=').replace('\\u0026', '&')
+        return None
+    
     def download_from_google_drive(self, drive_url, filepath, max_retries=5):
         """
         Télécharge une image depuis Google Drive avec plusieurs stratégies
@@ -97,6 +232,26 @@ class GoogleDriveDownloader:
             filepath (str): Chemin local pour sauvegarder
             max_retries (int): Nombre max de tentatives
             
+        Returns:
+            bool: True si succès, False sinon
+        """
+        with open(filepath, 'wb') as f:
+            success = self.download_to_stream(drive_url, f, max_retries)
+        
+        if not success and os.path.exists(filepath):
+            os.remove(filepath)
+        return success
+    
+    def download_to_stream(self, drive_url, stream, max_retries=5, retry_budget=None):
+        """
+        Télécharge une image Google Drive dans un flux binaire (sans fichier intermédiaire)
+        
+        Args:
+            drive_url (str): URL Google Drive
+            stream (file-like): Flux binaire seekable, rembobiné à chaque tentative
+            max_retries (int): Nombre max de tentatives
+            retry_budget (RetryBudget): Budget d'attente du job, ou None
+            
         Returns:
             bool: True si succès, False sinon
         """
@@ -114,160 +269,179 @@ class GoogleDriveDownloader:
         if self.verbose:
             BeautifulLogger.info(f"Téléchargement GDrive ID: {file_id}")
         
+        retry = self.retry_policy.start(RETRY_BASE_DELAY, retry_budget)
+        
+        # Chemin déjà résolu pour ce fichier : une seule requête, sans page HTML
+        route = self.known_route(file_id)
+        if route:
+            try:
+                if self._attempt_download_strategy(route[1], stream, route[0], file_id):
+                    return True
+                self.forget_route(file_id)
+            except RetryAfterError as e:
+                if not retry.sleep(e.retry_after):
+                    return False
+        
         # Stratégies de téléchargement dans l'ordre de priorité
-        strategies = [
-            ('direct_download', self.build_direct_download_url(file_id)),
-            ('view_page', self.build_view_url(file_id)),
-            ('original_url', drive_url)
-        ]
+        strategies = self.build_strategies(file_id, drive_url)
         
         for attempt in range(max_retries):
+            retry_after = None
             for strategy_name, url in strategies:
                 try:
                     if self.verbose and attempt > 0:
                         BeautifulLogger.info(f"Tentative {attempt + 1}: {strategy_name}")
                     
-                    success = self._attempt_download_strategy(url, filepath, strategy_name, file_id)
-                    if success:
+                    resolved = self._attempt_download_strategy(url, stream, strategy_name, file_id)
+                    if resolved:
+                        self.remember_route(file_id, drive_url, strategy_name, resolved)
                         if self.verbose:
                             BeautifulLogger.success(f"Téléchargé via {strategy_name}")
                         return True
                 
+                except RetryAfterError as e:
+                    # Google limite le débit : les autres stratégies échoueraient aussi
+                    if self.verbose:
+                        BeautifulLogger.warning(f"Limitation de débit ({e.status_code}) sur {strategy_name}")
+                    retry_after = e.retry_after
+                    break
+                
                 except Exception as e:
                     if self.verbose:
                         BeautifulLogger.warning(f"Erreur {strategy_name}: {str(e)}")
                     continue
             
-            # Délai entre tentatives
-            if attempt < max_retries - 1:
-                delay = random.uniform(2, 5)
-                if self.verbose:
-                    BeautifulLogger.info(f"Délai avant nouvelle tentative: {delay:.1f}s")
-                time.sleep(delay)
+            # Délai entre tentatives, borné par le budget du job
+            if attempt < max_retries - 1 and not retry.sleep(retry_after):
+                break
         
         if self.verbose:
             BeautifulLogger.error(f"Échec téléchargement Google Drive: {file_id}")
         return False
     
-    def _attempt_download_strategy(self, url, filepath, strategy_name, file_id):
+    def _attempt_download_strategy(self, url, stream, strategy_name, file_id, follow_html=True):
         """
         Tente une stratégie de téléchargement spécifique
+        Une petite page HTML est suivie une seule fois (follow_html) vers l'URL directe
+        
+        Returns:
+            tuple: (stratégie, url) de la requête qui a livré l'image, ou False
         """
         # Préparer les headers pour cette stratégie
-        headers = self.gdrive_headers.copy()
+        headers = self.strategy_headers(strategy_name, file_id)
         
-        if strategy_name == 'direct_download':
-            # Headers pour téléchargement direct
-            headers['Referer'] = f'https://drive.google.com/file/d/{file_id}/view'
-            
-        elif strategy_name == 'view_page':
+        if strategy_name == 'view_page':
             # D'abord obtenir la page de visualisation pour extraire l'URL directe
-            return self._download_via_view_page(url, filepath, file_id)
-        
-        # Mise à jour temporaire des headers de session
-        original_headers = self.session.headers.copy()
-        self.session.headers.update(headers)
+            return self._download_via_view_page(url, stream, file_id)
         
+        response = None
         try:
-            response = self.session.get(url, stream=True, timeout=30)
+            # Headers composés par requête : la session partagée n'est jamais modifiée
+            response = self.session.get(url, headers=headers, stream=True, timeout=30)
             
-            # Vérifier si c'est une redirection vers une page de confirmation
-            if 'accounts.google.com' in response.url or 'warning' in response.text.lower():
+            # Vérifier si c'est une redirection vers une page de connexion
+            if self.is_confirmation_page(response.url):
                 if self.verbose:
                     BeautifulLogger.warning("Redirection vers page de confirmation détectée")
                 return False
             
-            # Vérifier si c'est du contenu binaire (image)
+            if response.status_code in THROTTLING_STATUS_CODES:
+                raise RetryAfterError(response.status_code, retry_after_from(response))
+            
+            if response.status_code != 200:
+                return False
+            
+            # Inspecter les premiers octets seulement : le corps n'est jamais chargé en entier
+            chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+            head, finished = self.read_head(chunks)
             content_type = response.headers.get('Content-Type', '')
-            if not (content_type.startswith('image/') or 'application/octet-stream' in content_type):
-                # Peut-être une page HTML, essayer d'extraire l'URL directe
-                if response.status_code == 200 and len(response.content) < 50000:  # Petite page
-                    return self._extract_direct_url_from_html(response.text, filepath, file_id)
             
-            if response.status_code == 200:
-                # Écrire le contenu
-                with open(filepath, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                
-                # Vérifier que le fichier a une taille raisonnable
-                import os
-                file_size = os.path.getsize(filepath)
-                if file_size > 500:  # Au moins 500 bytes pour une image
-                    return True
-                else:
+            if self.is_html_response(content_type, head):
+                # Interstitiel HTML : lire la page, bornée, pour y chercher l'URL directe
+                if not finished:
+                    head, finished = self.read_head(chunks, MAX_HTML_PAGE_SIZE, head)
+                if not follow_html or not finished:
+                    return False
+                html_content = head.decode('utf-8', errors='replace')
+                if self.is_confirmation_page(response.url, html_content):
                     if self.verbose:
-                        BeautifulLogger.warning(f"Fichier trop petit: {file_size} bytes")
-                    os.remove(filepath)
+                        BeautifulLogger.warning("Page d'avertissement Google Drive détectée")
                     return False
+                return self._extract_direct_url_from_html(html_content, stream, file_id)
             
-            return False
+            # Image : écrire les octets inspectés puis le reste du flux, morceau par morceau
+            stream.seek(0)
+            stream.truncate()
+            stream.write(head)
+            for chunk in chunks:
+                if chunk:
+                    stream.write(chunk)
+            
+            # Vérifier que le fichier a une taille raisonnable
+            file_size = stream.tell()
+            if file_size > MIN_IMAGE_SIZE:  # Au moins 500 bytes pour une image
+                return (strategy_name, url)
+            else:
+                if self.verbose:
+                    BeautifulLogger.warning(f"Fichier trop petit: {file_size} bytes")
+                stream.seek(0)
+                stream.truncate()
+                return False
             
+        except RetryAfterError:
+            raise
         except Exception as e:
             if self.verbose:
                 BeautifulLogger.warning(f"Erreur téléchargement: {str(e)}")
             return False
         finally:
-            # Restaurer les headers originaux
-            self.session.headers = original_headers
+            if response is not None:
+                response.close()
     
-    def _download_via_view_page(self, view_url, filepath, file_id):
+    def _download_via_view_page(self, view_url, stream, file_id):
         """
         Télécharge en passant par la page de visualisation pour extraire l'URL directe
         """
-        original_headers = self.session.headers.copy()
         try:
             # Obtenir la page de visualisation
-            headers = self.gdrive_headers.copy()
-            self.session.headers.update(headers)
+            response = self.session.get(view_url, headers=self.gdrive_headers, timeout=20)
             
-            response = self.session.get(view_url, timeout=20)
+            if response.status_code in THROTTLING_STATUS_CODES:
+                raise RetryAfterError(response.status_code, retry_after_from(response))
             
             if response.status_code == 200:
                 # Chercher l'URL directe dans le HTML
-                direct_url = self._extract_direct_url_from_html(response.text, filepath, file_id)
+                direct_url = self._extract_direct_url_from_html(response.text, stream, file_id)
                 return direct_url
             
             return False
             
+        except RetryAfterError:
+            raise
         except Exception as e:
             if self.verbose:
                 BeautifulLogger.warning(f"Erreur page de visualisation: {str(e)}")
             return False
-        finally:
-            self.session.headers = original_headers
     
-    def _extract_direct_url_from_html(self, html_content, filepath, file_id):
+    def _extract_direct_url_from_html(self, html_content, stream, file_id):
         """
         Extrait l'URL de téléchargement direct depuis le HTML de Google Drive
         """
         try:
-            # Patterns pour trouver l'URL directe
-            patterns = [
-                r'"downloadUrl":"([^"]+)"',
-                r'&export=download&id=' + re.escape(file_id) + r'[^"]*',
-                r'https://drive\.google\.com/uc\?export=download&id=' + re.escape(file_id),
-                r'"([^"]*uc\?export=download[^"]*' + re.escape(file_id) + '[^"]*)"'
-            ]
-            
-            for pattern in patterns:
-                matches = re.findall(pattern, html_content)
-                for match in matches:
-                    if 'export=download' in match and file_id in match:
-                        # Nettoyer l'URL
-                        clean_url = match.replace('\\u003d', '=').replace('\\u0026', '&')
-                        
-                        if self.verbose:
-                            BeautifulLogger.info(f"URL directe extraite: {clean_url[:100]}...")
-                        
-                        # Télécharger avec cette URL
-                        return self._attempt_download_strategy(clean_url, filepath, 'extracted_url', file_id)
+            clean_url = self.find_direct_download_url(html_content, file_id)
+            if clean_url:
+                if self.verbose:
+                    BeautifulLogger.info(f"URL directe extraite: {clean_url[:100]}...")
+                
+                # Télécharger avec cette URL
+                return self._attempt_download_strategy(clean_url, stream, 'extracted_url', file_id, follow_html=False)
             
             # Si aucune URL trouvée, essayer avec l'URL de base
             base_download_url = f"https://drive.google.com/uc?export=download&id={file_id}"
-            return self._attempt_download_strategy(base_download_url, filepath, 'base_download', file_id)
+            return self._attempt_download_strategy(base_download_url, stream, 'base_download', file_id, follow_html=False)
             
+        except RetryAfterError:
+            raise
         except Exception as e:
             if self.verbose:
                 BeautifulLogger.warning(f"Erreur extraction URL: {str(e)}")
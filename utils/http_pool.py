@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Pools de connexions HTTP partagés par les sessions requests
+Des pools plus larges évitent de jeter des connexions TLS encore chaudes
+quand plusieurs pages et plusieurs jobs tournent en parallèle
+"""
+
+import os
+import requests
+from requests.adapters import HTTPAdapter
+
+# Nombre d'hôtes gardés en pool (anime-sama, drive.google.com, googleusercontent...)
+DEFAULT_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 10))
+
+# Connexions gardées ouvertes par hôte : au moins le nombre de pages en vol
+DEFAULT_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 20))
+
+
+def mount_pooled_adapters(session, pool_connections=None, pool_maxsize=None, max_retries=0):
+    """
+    Monte des adaptateurs HTTP/HTTPS à pool élargi sur une session
+
+    Args:
+        session (requests.Session): Session à configurer
+        pool_connections (int): Nombre d'hôtes en pool (défaut: HTTP_POOL_CONNECTIONS)
+        pool_maxsize (int): Connexions par hôte (défaut: HTTP_POOL_MAXSIZE)
+        max_retries (int): Tentatives de connexion de urllib3
+
+    Returns:
+        requests.Session: La session configurée
+    """
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections or DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or DEFAULT_POOL_MAXSIZE,
+        max_retries=max_retries
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def create_pooled_session(pool_connections=None, pool_maxsize=None):
+    """Crée une session requests avec des pools de connexions élargis"""
+    return mount_pooled_adapters(requests.Session(), pool_connections, pool_maxsize)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Transports HTTP asynchrones pour le téléchargement des pages
+AsyncImageDownloader ne dépend que de l'interface AsyncTransport : l'implémentation
+httpx garde des centaines de requêtes en vol sur une seule boucle asyncio
+"""
+
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+
+try:
+    import httpx
+except ImportError:  # Dépendance optionnelle : le moteur 'threads' reste disponible
+    httpx = None
+
+from utils.http_pool import DEFAULT_POOL_MAXSIZE
+from utils.retry_policy import retry_after_from
+
+
+class TransportError(Exception):
+    """Erreur réseau ou réponse HTTP en échec (status_code et Retry-After renseignés dans ce cas)"""
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TransportResponse(ABC):
+    """
+    Réponse en flux exposée par un transport
+    Les implémentations renseignent status_code, headers et url, et fournissent aread() et aiter_bytes()
+    """
+
+    status_code = 0
+    headers = {}
+    url = ""
+
+    def raise_for_status(self):
+        """Lève TransportError pour les codes 4xx/5xx"""
+        if self.status_code >= 400:
+            raise TransportError(f"HTTP {self.status_code} pour {self.url}", self.status_code, retry_after_from(self))
+
+    @abstractmethod
+    async def aread(self):
+        """Corps complet de la réponse"""
+
+    @abstractmethod
+    def aiter_bytes(self, chunk_size=8192):
+        """Corps de la réponse par morceaux (itérateur asynchrone)"""
+
+
+class AsyncTransport(ABC):
+    """
+    Interface des transports : stream() est un gestionnaire de contexte asynchrone
+    produisant une TransportResponse, fermée en sortie de bloc
+    """
+
+    @abstractmethod
+    def stream(self, url, headers=None, timeout=30):
+        """Gestionnaire de contexte asynchrone produisant la TransportResponse de url"""
+
+    async def aclose(self):
+        """Libère les connexions du transport"""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+class _HttpxResponse(TransportResponse):
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+
+    async def aread(self):
+        try:
+            return await self._response.aread()
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+
+    async def aiter_bytes(self, chunk_size=8192):
+        try:
+            async for chunk in self._response.aiter_bytes(chunk_size):
+                yield chunk
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+
+
+class HttpxTransport(AsyncTransport):
+    """
+    Transport natif asyncio basé sur httpx.AsyncClient
+    Le pool de connexions est dimensionné sur le nombre de requêtes en vol
+    """
+
+    def __init__(self, max_connections=None, headers=None):
+        if httpx is None:
+            raise RuntimeError("httpx n'est pas installé (pip install httpx)")
+
+        max_connections = max_connections or DEFAULT_POOL_MAXSIZE
+        self.client = httpx.AsyncClient(
+            headers=_clean_headers(headers),
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+
+    @staticmethod
+    def is_available():
+        """Vrai si httpx est installé"""
+        return httpx is not None
+
+    @asynccontextmanager
+    async def stream(self, url, headers=None, timeout=30):
+        try:
+            async with self.client.stream('GET', url, headers=_clean_headers(headers), timeout=timeout) as response:
+                yield _HttpxResponse(response)
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def _clean_headers(headers):
+    """Retire les headers à None (acceptés par requests, refusés par httpx)"""
+    if not headers:
+        return None
+    return {key: value for key, value in headers.items() if value is not None}
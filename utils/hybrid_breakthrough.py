@@ -5,14 +5,20 @@ Rotation automatique des méthodes selon l'environnement et les échecs
 """
 
 import requests
-import time
-import random
 import os
+import threading
 from utils.beautiful_progress import BeautifulLogger
 from utils.advanced_bypass import AdvancedAntiDetectionBypass
 from utils.railway_bypass import RailwayOptimizedBypass
 from utils.railway_enhanced_bypass import EnhancedRailwayBypass
 from utils.google_drive_downloader import GoogleDriveDownloader
+from utils.http_pool import create_pooled_session
+from utils.retry_policy import get_shared_retry_policy
+from utils.circuit_breaker import get_shared_circuit_breaker, is_host_failure, MISSING_STATUS_CODES
+
+# Délai entre deux cycles de stratégies : 3 à 8 s, comme avant la politique de reprise partagée
+CYCLE_BASE_DELAY = 3.0
+CYCLE_MAX_DELAY = 8.0
 
 class HybridBreakthroughSystem:
     """
@@ -39,23 +45,49 @@ class HybridBreakthroughSystem:
         # Session principale pour Google Drive
         self.current_session = None
         
+        # Session de la stratégie directe, gardée pour réutiliser ses connexions
+        self.direct_session = None
+        
         # Stratégies selon échecs
         self.current_strategy = 'auto'
         
-    def breakthrough_request(self, url, max_global_retries=9):
+        # Délais entre cycles (gigue décorrélée, statistiques communes)
+        self.retry_policy = get_shared_retry_policy()
+        
+        # Hôtes en panne : échec immédiat plutôt que des cycles complets de stratégies
+        self.circuit_breaker = get_shared_circuit_breaker()
+        
+        # Système partagé par les jobs : verrou de l'état ci-dessus (échecs, sessions retenues) ;
+        # chaque système de contournement protège sa propre session (bypass.lock)
+        self._lock = threading.Lock()
+        
+    def breakthrough_request(self, url, max_global_retries=9, retry_budget=None):
         """
         Requête avec rotation automatique des techniques
+        Seul un cycle où l'hôte n'a pas répondu (erreurs réseau, 5xx/429, 403 partout)
+        compte pour le disjoncteur ; une réponse 404/410 est retournée immédiatement
+        
+        Args:
+            retry_budget (RetryBudget): Budget d'attente du job ; les cycles s'arrêtent quand il est épuisé
+        
+        Raises:
+            CircuitOpenError: Si l'hôte est connu indisponible (avant ou pendant les cycles)
         """
         if self.verbose:
             BeautifulLogger.info("Démarrage système hybride révolutionnaire...", "🔥")
         
         # Stratégies à tester dans l'ordre
         strategies = self._get_strategies_order()
+        retry = self.retry_policy.start(CYCLE_BASE_DELAY, retry_budget, max_delay=CYCLE_MAX_DELAY)
+        
+        # Hôte connu indisponible : aucune stratégie n'est tentée
+        self.circuit_breaker.before_request(url)
         
         for global_attempt in range(max_global_retries):
             if self.verbose:
                 BeautifulLogger.info(f"Tentative globale {global_attempt + 1}/{max_global_retries}", "🎯")
             
+            host_answered = False
             for strategy in strategies:
                 try:
                     if self.verbose:
@@ -69,38 +101,69 @@ class HybridBreakthroughSystem:
                             BeautifulLogger.success(f"Stratégie {strategy} réussie !")
                         
                         # Marquer succès et garder la session pour Google Drive
-                        self.last_successful_method = strategy
-                        self.method_failures[strategy] = 0
-                        self.current_session = self._get_session_from_strategy(strategy)
+                        session = self._get_session_from_strategy(strategy)
+                        with self._lock:
+                            self.last_successful_method = strategy
+                            self.method_failures[strategy] = 0
+                            self.current_session = session
+                        self.circuit_breaker.record_success(url)
                         return response
                     
-                    else:
-                        # Marquer échec
-                        self.method_failures[strategy] += 1
+                    if response is not None and response.status_code in MISSING_STATUS_CODES:
+                        # Ressource absente (nom de manga erroné) : l'hôte fonctionne, inutile d'insister
                         if self.verbose:
-                            BeautifulLogger.warning(f"Stratégie {strategy} échouée")
+                            BeautifulLogger.warning(f"Ressource introuvable ({response.status_code})")
+                        self.circuit_breaker.record_success(url)
+                        return response
+                    
+                    if response is not None and not is_host_failure(response.status_code):
+                        host_answered = True
+                    
+                    # Marquer échec
+                    self._record_failure(strategy)
+                    if self.verbose:
+                        BeautifulLogger.warning(f"Stratégie {strategy} échouée")
                 
                 except Exception as e:
                     if self.verbose:
                         BeautifulLogger.warning(f"Erreur stratégie {strategy}: {e}")
-                    self.method_failures[strategy] += 1
+                    self._record_failure(strategy)
+            
+            # Le cycle qui fait ouvrir le circuit est le dernier, sans délai supplémentaire
+            if host_answered:
+                # L'hôte répond : le circuit reste fermé (et la requête de test d'un demi-ouvert est libérée)
+                self.circuit_breaker.record_success(url)
+            else:
+                self.circuit_breaker.record_failure(url)
+                self.circuit_breaker.before_request(url)
             
             # Délai entre cycles complets
             if global_attempt < max_global_retries - 1:
-                delay = random.uniform(3, 8)
                 if self.verbose:
-                    BeautifulLogger.info(f"Rotation cycle - Délai: {delay:.1f}s")
-                time.sleep(delay)
+                    BeautifulLogger.info("Rotation cycle - Nouvelle tentative après délai")
+                if not retry.sleep():
+                    break
         
         if self.verbose:
             BeautifulLogger.error("Toutes les stratégies hybrides ont échoué")
         return None
     
+    def _record_failure(self, strategy):
+        with self._lock:
+            self.method_failures[strategy] += 1
+    
+    def _has_failed(self, strategy):
+        """Vrai si la dernière tentative de la stratégie a échoué (sa session est alors recréée)"""
+        with self._lock:
+            return self.method_failures[strategy] > 0
+    
     def _get_strategies_order(self):
         """
         Détermine l'ordre des stratégies selon l'environnement et l'historique
         """
-        base_strategies = ['advanced', 'railway', 'direct']
+        with self._lock:
+            last_successful_method = self.last_successful_method
+            method_failures = self.method_failures.copy()
         
         # Si Railway, prioriser Railway
         if self.is_railway:
@@ -109,12 +172,12 @@ class HybridBreakthroughSystem:
             strategies = ['advanced', 'railway', 'direct']
         
         # Réorganiser selon les succès passés
-        if self.last_successful_method:
-            strategies.remove(self.last_successful_method)
-            strategies.insert(0, self.last_successful_method)
+        if last_successful_method:
+            strategies.remove(last_successful_method)
+            strategies.insert(0, last_successful_method)
         
         # Réorganiser selon les échecs
-        strategies.sort(key=lambda x: self.method_failures.get(x, 0))
+        strategies.sort(key=lambda x: method_failures.get(x, 0))
         
         return strategies
     
@@ -136,9 +199,11 @@ class HybridBreakthroughSystem:
         Tentative avec système avancé
         """
         try:
-            # Recréer session si nécessaire
-            self.advanced_bypass.create_stealth_session()
-            return self.advanced_bypass.bypass_request(url, max_retries=2)
+            # Nouvelle empreinte seulement après un échec : sinon on garde les connexions chaudes
+            with self.advanced_bypass.lock:
+                if self.advanced_bypass.session is None or self._has_failed('advanced'):
+                    self.advanced_bypass.create_stealth_session()
+                return self.advanced_bypass.bypass_request(url, max_retries=2)
         except Exception as e:
             if self.verbose:
                 BeautifulLogger.warning(f"Erreur advanced: {e}")
@@ -149,9 +214,11 @@ class HybridBreakthroughSystem:
         Tentative avec système Railway
         """
         try:
-            # Recréer session Railway
-            self.railway_bypass.create_railway_session()
-            return self.railway_bypass.railway_request(url, max_retries=2)
+            # Nouvelle session Railway seulement après un échec
+            with self.railway_bypass.lock:
+                if self.railway_bypass.session is None or self._has_failed('railway'):
+                    self.railway_bypass.create_railway_session()
+                return self.railway_bypass.railway_request(url, max_retries=2)
         except Exception as e:
             if self.verbose:
                 BeautifulLogger.warning(f"Erreur railway: {e}")
@@ -162,23 +229,28 @@ class HybridBreakthroughSystem:
         Tentative directe simplifiée
         """
         try:
-            session = requests.Session()
-            
-            # Headers simples mais efficaces
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.7',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Cache-Control': 'max-age=0',
-            }
-            
-            session.headers.update(headers)
+            with self._lock:
+                if self.direct_session is None or self.method_failures['direct'] > 0:
+                    session = create_pooled_session()
+                    
+                    # Headers simples mais efficaces
+                    headers = {
+                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
+                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                        'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.7',
+                        'Accept-Encoding': 'gzip, deflate, br',
+                        'Connection': 'keep-alive',
+                        'Cache-Control': 'max-age=0',
+                    }
+                    
+                    session.headers.update(headers)
+                    self.direct_session = session
+                # Session lue sous verrou, requête hors verrou (ses headers ne changent plus)
+                session = self.direct_session
             
             # Requête simple
-            response = session.get(url, timeout=(10, 30))
-            return response if response.status_code == 200 else None
+            # Réponse rendue quel que soit son statut : un 404 prouve que l'hôte répond
+            return session.get(url, timeout=(10, 30))
             
         except Exception as e:
             if self.verbose:
@@ -202,20 +274,19 @@ class HybridBreakthroughSystem:
         Obtenir une session optimisée pour Google Drive
         """
         # Utiliser la dernière session réussie ou en créer une nouvelle
-        if self.current_session:
-            return self.current_session
+        with self._lock:
+            if self.current_session:
+                return self.current_session
+            last_successful_method = self.last_successful_method
         
         # Si pas de session, utiliser la méthode la plus fiable
-        if self.last_successful_method == 'advanced':
-            self.advanced_bypass.create_stealth_session()
-            return getattr(self.advanced_bypass, 'session', None)
-        elif self.last_successful_method == 'railway':
-            self.railway_bypass.create_railway_session()
-            return getattr(self.railway_bypass, 'session', None)
+        if last_successful_method == 'advanced':
+            return self.advanced_bypass.create_stealth_session()
+        elif last_successful_method == 'railway':
+            return self.railway_bypass.create_railway_session()
         
         # Fallback: créer une session basique
-        import requests
-        session = requests.Session()
+        session = create_pooled_session()
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
@@ -225,8 +296,11 @@ class HybridBreakthroughSystem:
             'Connection': 'keep-alive',
         }
         session.headers.update(headers)
-        self.current_session = session
-        return session
+        with self._lock:
+            # Un autre job a pu retenir une session entre-temps : elle est réutilisée
+            if self.current_session is None:
+                self.current_session = session
+            return self.current_session
 
     def download_from_google_drive(self, drive_url, filepath, max_retries=5):
         """
@@ -248,13 +322,13 @@ class HybridBreakthroughSystem:
         # Tentative de téléchargement
         success = gdrive_downloader.download_from_google_drive(drive_url, filepath, max_retries)
         
-        if success:
-            self.method_failures['gdrive'] = 0
-            if self.verbose:
+        with self._lock:
+            self.method_failures['gdrive'] = 0 if success else self.method_failures['gdrive'] + 1
+        
+        if self.verbose:
+            if success:
                 BeautifulLogger.success("Google Drive téléchargé via système hybride")
-        else:
-            self.method_failures['gdrive'] += 1
-            if self.verbose:
+            else:
                 BeautifulLogger.error("Échec Google Drive avec système hybride")
         
         return success
@@ -263,9 +337,10 @@ class HybridBreakthroughSystem:
         """
         Statistiques du système hybride
         """
-        return {
-            'last_successful': self.last_successful_method,
-            'failures': self.method_failures.copy(),
-            'environment': 'railway' if self.is_railway else 'local',
-            'has_gdrive_session': self.current_session is not None
-        }
\ No newline at end of file
+        with self._lock:
+            return {
+                'last_successful': self.last_successful_method,
+                'failures': self.method_failures.copy(),
+                'environment': 'railway' if self.is_railway else 'local',
+                'has_gdrive_session': self.current_session is not None
+            }
\ No newline at end of file
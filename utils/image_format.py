@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Détection du format d'une image à partir de ses premiers octets (signature)
+Utilisée par les téléchargeurs (validation des pages) et par la politique de compression
+"""
+
+IMAGE_SIGNATURES = {
+    b'\xff\xd8\xff': 'JPEG',
+    b'\x89PNG\r\n\x1a\n': 'PNG',
+    b'GIF87a': 'GIF',
+    b'GIF89a': 'GIF',
+    b'RIFF': 'WEBP',  # Les fichiers WEBP commencent par RIFF
+    b'BM': 'BMP'
+}
+
+
+def detect_image_format(header):
+    """
+    Identifie le format d'une image d'après ses premiers octets
+
+    Args:
+        header (bytes): Premiers octets du fichier (16 suffisent)
+
+    Returns:
+        str: Nom du format ('JPEG', 'PNG', ...) ou None si inconnu
+    """
+    for sig, format_name in IMAGE_SIGNATURES.items():
+        if header.startswith(sig):
+            return format_name
+    return None
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Cache disque des pages, adressé par l'ID de fichier Google Drive
+Éviction LRU bornée en taille et écritures atomiques
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from utils.beautiful_progress import BeautifulLogger
+
+
+class PageCache:
+    """
+    Cache persistant des pages : un fichier par ID Google Drive
+    """
+
+    FILE_ID_PATTERN = re.compile(r'^[a-zA-Z0-9_-]+$')
+
+    def __init__(self, cache_dir, max_size_bytes, verbose=False):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.verbose = verbose
+
+        self._entries = OrderedDict()  # file_id -> taille, du moins au plus récent
+        self._total_size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._load_index()
+
+    @property
+    def enabled(self):
+        return self.max_size_bytes > 0
+
+    def _entry_path(self, file_id):
+        return os.path.join(self.cache_dir, file_id[:2], file_id)
+
+    def _load_index(self):
+        """Reconstruit l'index LRU depuis le disque (ordre des dates d'accès)"""
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.startswith('.') or not self.FILE_ID_PATTERN.match(name):
+                    # Fichier temporaire d'une écriture interrompue
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                found.append((stat.st_mtime, name, stat.st_size))
+
+        for _, file_id, size in sorted(found):
+            self._entries[file_id] = size
+            self._total_size += size
+
+        self._evict_locked()
+
+    def _is_valid_id(self, file_id):
+        return bool(file_id) and bool(self.FILE_ID_PATTERN.match(file_id))
+
+    def contains(self, file_id):
+        """True si la page est en cache (sans la lire ni compter de hit)"""
+        with self._lock:
+            return file_id in self._entries
+
+    def copy_to(self, file_id, filepath):
+        """
+        Copie une page en cache vers filepath
+
+        Returns:
+            bool: True si la page était en cache
+        """
+        with open(filepath, 'wb') as f:
+            found = self.read_into(file_id, f)
+        if not found:
+            os.remove(filepath)
+        return found
+
+    def read_into(self, file_id, stream):
+        """
+        Écrit une page en cache dans un flux binaire (rembobiné au préalable)
+
+        Returns:
+            bool: True si la page était en cache
+        """
+        if not self.enabled or not self._is_valid_id(file_id):
+            return False
+
+        with self._lock:
+            size = self._entries.get(file_id)
+            if size is None:
+                self.misses += 1
+                return False
+            self._entries.move_to_end(file_id)
+
+        entry_path = self._entry_path(file_id)
+        try:
+            with open(entry_path, 'rb') as cached:
+                stream.seek(0)
+                stream.truncate()
+                shutil.copyfileobj(cached, stream)
+            # La date de modification sert d'horodatage LRU entre deux démarrages
+            os.utime(entry_path)
+        except OSError:
+            # Évincée entre-temps par un autre thread
+            with self._lock:
+                self.misses += 1
+            return False
+
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += size
+
+        if self.verbose:
+            BeautifulLogger.info(f"Page servie depuis le cache: {file_id}", "💾")
+        return True
+
+    def store_file(self, file_id, filepath):
+        """Ajoute une page téléchargée au cache (écriture atomique)"""
+        try:
+            with open(filepath, 'rb') as f:
+                return self.store_stream(file_id, f)
+        except OSError:
+            return False
+
+    def store_stream(self, file_id, stream):
+        """
+        Ajoute au cache le contenu complet d'un flux binaire (écriture atomique)
+        La position du flux est restaurée après la copie
+        """
+        if not self.enabled or not self._is_valid_id(file_id):
+            return False
+
+        position = stream.tell()
+        try:
+            stream.seek(0, os.SEEK_END)
+            size = stream.tell()
+            if size <= 0 or size > self.max_size_bytes:
+                return False
+
+            entry_path = self._entry_path(file_id)
+            entry_dir = os.path.dirname(entry_path)
+            os.makedirs(entry_dir, exist_ok=True)
+
+            # Copie vers un fichier temporaire du même répertoire puis renommage atomique
+            fd, tmp_path = tempfile.mkstemp(dir=entry_dir, prefix='.tmp_')
+            try:
+                with os.fdopen(fd, 'wb') as tmp_file:
+                    stream.seek(0)
+                    shutil.copyfileobj(stream, tmp_file)
+                os.replace(tmp_path, entry_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        except OSError as e:
+            if self.verbose:
+                BeautifulLogger.warning(f"Impossible de mettre la page en cache: {e}")
+            return False
+        finally:
+            stream.seek(position)
+
+        with self._lock:
+            previous = self._entries.pop(file_id, None)
+            if previous is not None:
+                self._total_size -= previous
+            self._entries[file_id] = size
+            self._total_size += size
+            self._evict_locked()
+
+        return True
+
+    def _evict_locked(self):
+        """Supprime les pages les moins récemment utilisées (verrou déjà pris)"""
+        while self._total_size > self.max_size_bytes and self._entries:
+            file_id, size = self._entries.popitem(last=False)
+            self._total_size -= size
+            try:
+                os.remove(self._entry_path(file_id))
+            except OSError:
+                pass
+
+    def get_stats(self):
+        """Statistiques du cache de pages"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'size_mb': self._total_size / (1024 * 1024),
+                'max_size_mb': self.max_size_bytes / (1024 * 1024),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups * 100) if lookups else 0.0,
+                'bytes_saved_mb': self.bytes_saved / (1024 * 1024),
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_page_cache():
+    """
+    Retourne le cache de pages partagé par le processus
+    Configurable via PAGE_CACHE_DIR et PAGE_CACHE_MAX_MB (0 = désactivé)
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            max_mb = float(os.getenv('PAGE_CACHE_MAX_MB', 512))
+            _shared_cache = PageCache(
+                cache_dir=os.getenv('PAGE_CACHE_DIR', './cache/pages'),
+                max_size_bytes=int(max_mb * 1024 * 1024)
+            )
+        return _shared_cache
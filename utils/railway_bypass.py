@@ -8,7 +8,10 @@ import requests
 import time
 import random
 import os
+import threading
 from utils.beautiful_progress import BeautifulLogger
+from utils.http_pool import create_pooled_session
+from utils.circuit_breaker import MISSING_STATUS_CODES
 
 class RailwayOptimizedBypass:
     """
@@ -19,6 +22,8 @@ class RailwayOptimizedBypass:
         self.verbose = verbose
         self.session = None
         self.base_url = "https://anime-sama.fr"
+        # Session partagée et renouvelée en cours de requête : une requête à la fois
+        self.lock = threading.RLock()
         
         # Configuration Railway détectée
         self.is_railway = os.environ.get('RAILWAY_ENVIRONMENT') is not None
@@ -37,7 +42,7 @@ class RailwayOptimizedBypass:
         if self.verbose:
             BeautifulLogger.info("Session Railway ultra-rapide...", "🚄")
         
-        session = requests.Session()
+        session = create_pooled_session()
         
         # Headers ultra-légers et efficaces
         headers = {
@@ -65,7 +70,8 @@ class RailwayOptimizedBypass:
         
         session.headers.update(headers)
         
-        self.session = session
+        with self.lock:
+            self.session = session
         return session
     
     def _get_french_ip(self):
@@ -85,10 +91,16 @@ class RailwayOptimizedBypass:
     def railway_request(self, url, max_retries=5):
         """
         Requête ultra-optimisée Railway avec gestion avancée 403
+        Retourne la dernière réponse obtenue (même en erreur), None si aucune réponse
         """
+        with self.lock:
+            return self._railway_request(url, max_retries)
+    
+    def _railway_request(self, url, max_retries):
         if not self.session:
             self.create_railway_session()
         
+        last_response = None
         for attempt in range(max_retries):
             try:
                 if self.verbose:
@@ -116,6 +128,9 @@ class RailwayOptimizedBypass:
                     # Essais suivants : avec navigation préalable
                     response = self._stealth_railway_request(url)
                 
+                if response is None:
+                    continue
+                last_response = response
                 if self.verbose:
                     BeautifulLogger.info(f"Railway réponse: {response.status_code}")
                 
@@ -124,6 +139,10 @@ class RailwayOptimizedBypass:
                         BeautifulLogger.success("Railway bypass réussi !")
                     return response
                 
+                elif response.status_code in MISSING_STATUS_CODES:
+                    # Ressource absente : inutile de changer d'identité
+                    return response
+                
                 elif response.status_code == 403:
                     if self.verbose:
                         BeautifulLogger.warning("403 détecté - Rotation complète d'identité...")
@@ -150,7 +169,7 @@ class RailwayOptimizedBypass:
         
         if self.verbose:
             BeautifulLogger.error("Railway bypass échoué après toutes tentatives")
-        return None
+        return last_response
     
     def _advanced_railway_rotate(self):
         """
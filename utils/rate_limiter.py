@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Limiteur de débit par hôte, partagé entre les threads de téléchargement
+Remplace les pauses fixes après chaque page
+"""
+
+import time
+import asyncio
+import threading
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """
+    Espace les requêtes vers un même hôte d'au moins min_interval secondes
+    """
+
+    def __init__(self, min_interval=0.2):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+        self.total_wait = 0.0
+
+    def reserve(self, url):
+        """
+        Réserve le prochain créneau libre pour l'hôte de l'URL, sans attendre
+
+        Returns:
+            float: Temps à attendre avant d'envoyer la requête, en secondes
+        """
+        if self.min_interval <= 0:
+            return 0.0
+
+        host = urlparse(url).netloc
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+            delay = slot - now
+            self.total_wait += delay
+        return delay
+
+    def wait(self, url):
+        """
+        Bloque jusqu'au prochain créneau libre pour l'hôte de l'URL
+
+        Returns:
+            float: Temps d'attente effectif en secondes
+        """
+        # Réserver le créneau sous verrou, dormir en dehors
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def async_wait(self, url):
+        """Comme wait(), sans bloquer la boucle asyncio"""
+        delay = self.reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
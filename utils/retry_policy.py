@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Politique de reprise commune à tous les téléchargeurs
+Backoff à gigue décorrélée, budget de temps d'attente par job et respect de Retry-After
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from utils.beautiful_progress import BeautifulLogger
+
+# Codes HTTP pour lesquels le serveur peut indiquer quand revenir
+THROTTLING_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value):
+    """
+    Interprète un header Retry-After (secondes ou date HTTP)
+
+    Returns:
+        float: Délai en secondes, ou None si absent ou illisible
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def retry_after_from(response):
+    """Délai Retry-After d'une réponse 429/503, ou None"""
+    if response is None or response.status_code not in THROTTLING_STATUS_CODES:
+        return None
+    return parse_retry_after(response.headers.get('Retry-After'))
+
+
+class RetryAfterError(Exception):
+    """Le serveur limite le débit : attendre retry_after secondes avant de réessayer"""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}, Retry-After: {retry_after}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RetryBudget:
+    """
+    Temps d'attente total accordé à un job, partagé par toutes ses pages et tentatives
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.slept = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self):
+        with self._lock:
+            return max(0.0, self.seconds - self.slept)
+
+    def take(self, delay):
+        """
+        Réserve delay secondes d'attente
+
+        Returns:
+            bool: False si le budget ne suffit plus (le job doit abandonner la reprise)
+        """
+        with self._lock:
+            if self.slept + delay > self.seconds:
+                return False
+            self.slept += delay
+            return True
+
+
+class RetryState:
+    """
+    Suite des délais d'une opération (une page, une requête)
+    Créée par RetryPolicy.start()
+    """
+
+    def __init__(self, policy, budget, base_delay, max_delay=None):
+        self.policy = policy
+        self.budget = budget
+        self.base_delay = base_delay
+        self.max_delay = policy.max_delay if max_delay is None else min(max_delay, policy.max_delay)
+        self._previous = base_delay
+
+    def next_delay(self, min_delay=None):
+        """
+        Délai suivant : gigue décorrélée, min(max_delay, uniform(base, 3 × précédent))
+
+        Args:
+            min_delay (float): Plancher imposé (Retry-After, blocage 403)
+        """
+        delay = min(self.max_delay, random.uniform(self.base_delay, self._previous * 3))
+        self._previous = delay
+        if min_delay is not None:
+            delay = max(delay, min(min_delay, self.policy.max_retry_after))
+        return delay
+
+    def _reserve(self, min_delay):
+        delay = self.next_delay(min_delay)
+        if self.budget is not None and not self.budget.take(delay):
+            self.policy._record_exhausted()
+            return None
+        self.policy._record_sleep(delay, min_delay is not None)
+        return delay
+
+    def sleep(self, min_delay=None):
+        """
+        Attend avant la tentative suivante
+
+        Returns:
+            bool: False si le budget du job est épuisé (ne pas réessayer)
+        """
+        delay = self._reserve(min_delay)
+        if delay is None:
+            return False
+        time.sleep(delay)
+        return True
+
+    async def async_sleep(self, min_delay=None):
+        """Comme sleep(), sans bloquer la boucle asyncio"""
+        delay = self._reserve(min_delay)
+        if delay is None:
+            return False
+        await asyncio.sleep(delay)
+        return True
+
+
+class RetryPolicy:
+    """
+    Paramètres de reprise et statistiques d'attente partagés par le processus
+    """
+
+    def __init__(self, max_delay=30.0, max_retry_after=120.0, job_budget=300.0, verbose=False):
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.job_budget = job_budget
+        self.verbose = verbose
+
+        self._lock = threading.Lock()
+        self.sleeps = 0
+        self.total_sleep = 0.0
+        self.floored_sleeps = 0
+        self.budget_exhausted = 0
+
+    def new_budget(self, seconds=None):
+        """Budget d'attente d'un nouveau job"""
+        return RetryBudget(self.job_budget if seconds is None else seconds)
+
+    def start(self, base_delay=0.5, budget=None, max_delay=None):
+        """
+        Nouvelle suite de délais pour une opération
+
+        Args:
+            base_delay (float): Premier délai minimal
+            budget (RetryBudget): Budget du job, ou None pour ne pas borner
+            max_delay (float): Plafond propre à l'opération (au plus celui de la politique)
+        """
+        return RetryState(self, budget, base_delay, max_delay)
+
+    def _record_sleep(self, delay, floored):
+        with self._lock:
+            self.sleeps += 1
+            self.total_sleep += delay
+            if floored:
+                self.floored_sleeps += 1
+
+    def _record_exhausted(self):
+        with self._lock:
+            self.budget_exhausted += 1
+        if self.verbose:
+            BeautifulLogger.warning("Budget d'attente du job épuisé, abandon des reprises")
+
+    def get_stats(self):
+        """Statistiques des attentes de reprise"""
+        with self._lock:
+            return {
+                'sleeps': self.sleeps,
+                'total_sleep': self.total_sleep,
+                'floored_sleeps': self.floored_sleeps,
+                'budget_exhausted': self.budget_exhausted,
+            }
+
+
+_shared_policy = None
+_shared_policy_lock = threading.Lock()
+
+
+def get_shared_retry_policy():
+    """
+    Retourne la politique de reprise partagée par le processus
+    Configurable via RETRY_MAX_DELAY et RETRY_JOB_BUDGET (secondes)
+    """
+    global _shared_policy
+    with _shared_policy_lock:
+        if _shared_policy is None:
+            _shared_policy = RetryPolicy(
+                max_delay=float(os.getenv('RETRY_MAX_DELAY', 30)),
+                job_budget=float(os.getenv('RETRY_JOB_BUDGET', 300))
+            )
+        return _shared_policy
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Fusion des opérations identiques simultanées (single-flight)
+Le premier appelant d'une clé exécute l'opération ; les appelants concurrents de la
+même clé attendent son résultat au lieu de relancer la même requête
+Fonctionne entre threads et entre boucles asyncio (un futur concurrent par clé)
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Opérations en vol par clé ; le résultat (ou l'exception) est partagé par tous les
+    appelants arrivés pendant l'exécution, puis la clé est libérée
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.leaders = 0
+        self.shared = 0
+
+    def _join(self, key):
+        """
+        Returns:
+            tuple: (futur de l'opération, True si l'appelant doit l'exécuter)
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        # Libérer la clé avant de publier : un appel ultérieur relance l'opération
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Exécute fn(*args, **kwargs), ou attend l'exécution en cours pour la même clé
+
+        Returns:
+            Le résultat de l'opération, partagé par les appelants concurrents
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        """Comme do(), pour une fonction coroutine ; attend sans bloquer la boucle"""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def get_stats(self):
+        """Opérations exécutées, appels fusionnés et opérations en cours"""
+        with self._lock:
+            return {
+                'leaders': self.leaders,
+                'shared': self.shared,
+                'in_flight': len(self._calls),
+            }
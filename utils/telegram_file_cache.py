@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Cache persistant des documents déjà envoyés sur Telegram
+Associe (manga, chapitre, format) au file_id Telegram pour un renvoi instantané
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from scraper.url_builder import URLBuilder
+from utils.beautiful_progress import BeautifulLogger
+
+
+class TelegramFileCache:
+    """
+    Mapping persistant (manga, chapitre, format) -> file_id Telegram
+    """
+
+    def __init__(self, path, verbose=False):
+        self.path = path
+        self.verbose = verbose
+        self.url_builder = URLBuilder()
+
+        self._entries = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._load()
+
+    def _make_key(self, manga_name, chapter, file_format):
+        # L'URL du manga normalise les variantes d'écriture ("Blue Lock", "blue-lock"...)
+        manga_url = self.url_builder.build_chapter_url(manga_name, chapter)
+        return f"{manga_url}|{chapter}|{file_format}"
+
+    def _load(self):
+        """Charge le cache depuis le disque"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError) as e:
+            BeautifulLogger.warning(f"Cache des file_id illisible, réinitialisation: {e}")
+            self._entries = {}
+
+    def _save_locked(self):
+        """Sauvegarde atomique du cache (verrou déjà pris)"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            BeautifulLogger.warning(f"Impossible de sauvegarder le cache des file_id: {e}")
+
+    def get(self, manga_name, chapter, file_format):
+        """
+        Retourne l'entrée d'un document déjà envoyé
+
+        Returns:
+            dict: {'file_id', 'file_size', 'cbz_path', 'stored_at'} ou None
+        """
+        key = self._make_key(manga_name, chapter, file_format)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            # Le CBZ archivé a pu être supprimé depuis
+            if entry.get('cbz_path') and not os.path.exists(entry['cbz_path']):
+                entry['cbz_path'] = None
+
+            self.hits += 1
+            return dict(entry)
+
+    def find(self, manga_name, chapter, file_formats=('cbz', 'zip')):
+        """
+        Cherche un document envoyé sous l'un des formats donnés
+
+        Returns:
+            tuple: (file_format, entry) ou (None, None)
+        """
+        for file_format in file_formats:
+            key = self._make_key(manga_name, chapter, file_format)
+            with self._lock:
+                present = key in self._entries
+            if present:
+                return file_format, self.get(manga_name, chapter, file_format)
+
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    def put(self, manga_name, chapter, file_format, file_id, file_size=None, cbz_path=None, complete=True):
+        """
+        Enregistre le file_id d'un document envoyé
+        Un file_id est renvoyé indéfiniment : celui d'un chapitre incomplet (pages
+        manquantes) n'est pas mémorisé
+        """
+        if not file_id:
+            return
+        if not complete:
+            if self.verbose:
+                BeautifulLogger.warning(f"Chapitre {chapter} incomplet, file_id non mémorisé")
+            return
+
+        key = self._make_key(manga_name, chapter, file_format)
+        with self._lock:
+            self._entries[key] = {
+                'file_id': file_id,
+                'file_size': file_size,
+                'cbz_path': cbz_path,
+                'stored_at': time.time(),
+            }
+            self._save_locked()
+
+    def remember_message(self, manga_name, chapter, file_format, message, cbz_path=None, complete=True):
+        """Enregistre le document d'un message retourné par reply_document (voir put)"""
+        document = getattr(message, 'document', None)
+        if document is None:
+            return
+        self.put(manga_name, chapter, file_format, document.file_id, document.file_size, cbz_path, complete)
+
+    def invalidate(self, manga_name, chapter, file_format):
+        """Supprime une entrée (file_id refusé par Telegram)"""
+        key = self._make_key(manga_name, chapter, file_format)
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save_locked()
+
+    def get_stats(self):
+        """Statistiques du cache des file_id"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / lookups * 100) if lookups else 0.0,
+            }
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_file_cache():
+    """
+    Retourne le cache des file_id partagé par le processus
+    Emplacement configurable via FILE_ID_CACHE_PATH
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = TelegramFileCache(
+                os.getenv('FILE_ID_CACHE_PATH', './cache/telegram_files.json')
+            )
+        return _shared_cache
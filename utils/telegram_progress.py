@@ -6,6 +6,7 @@ Affiche des barres de progression qui se mettent à jour automatiquement
 
 import asyncio
 import time
+import threading
 from typing import Optional
 
 class TelegramProgressBar:
@@ -13,11 +14,14 @@ class TelegramProgressBar:
     Barre de progression qui se met à jour automatiquement sur Telegram
     """
     
-    def __init__(self, update, total_items: int, task_name: str = "Téléchargement", auto_update_interval: float = 2.0):
+    def __init__(self, update, total_items: int, task_name: str = "Téléchargement", auto_update_interval: float = 2.0,
+                 sender=None):
         self.update = update
         self.total_items = total_items
         self.task_name = task_name
         self.auto_update_interval = auto_update_interval
+        # Répartiteur d'envois (TelegramSender) ; appels directs sinon
+        self.sender = sender
         
         self.current_progress = 0
         self.start_time = time.time()
@@ -29,10 +33,13 @@ class TelegramProgressBar:
     async def initialize(self):
         """Initialise la barre de progression avec le premier message"""
         progress_text = self._generate_progress_text()
-        self.message = await self.update.message.reply_text(
-            progress_text,
-            parse_mode='HTML'
-        )
+        if self.sender:
+            self.message = await self.sender.reply_text(self.update.message, progress_text, parse_mode='HTML')
+        else:
+            self.message = await self.update.message.reply_text(
+                progress_text,
+                parse_mode='HTML'
+            )
         self.last_update_time = time.time()
     
     async def update_progress(self, current: int, item_name: str = ""):
@@ -63,10 +70,14 @@ class TelegramProgressBar:
             
         try:
             progress_text = self._generate_progress_text()
-            await self.message.edit_text(
-                progress_text,
-                parse_mode='HTML'
-            )
+            if self.sender:
+                # Édition fusionnée avec celles en attente, après les documents
+                await self.sender.edit_text(self.message, progress_text, parse_mode='HTML')
+            else:
+                await self.message.edit_text(
+                    progress_text,
+                    parse_mode='HTML'
+                )
         except Exception:
             # Ignore les erreurs de mise à jour (message trop ancien, etc.)
             pass
@@ -137,14 +148,29 @@ class TelegramDownloadProgress:
     Gestionnaire de progression spécialisé pour les téléchargements de manga
     """
     
-    def __init__(self, update, manga_name: str, chapter_range: str = ""):
+    def __init__(self, update, manga_name: str, chapter_range: str = "", total_chapters: int = 1, sender=None):
         self.update = update
+        self.sender = sender
         self.manga_name = manga_name
         self.chapter_range = chapter_range
+        self.total_chapters = total_chapters
         self.phases = []
         self.current_phase = 0
         self.progress_bar = None
         
+        # Événements du scraper (émis depuis ses threads)
+        self._events = None
+        self._consumer_task = None
+        self.pages_done = 0
+        self.pages_ok = 0
+        self.bytes_downloaded = 0
+        self.chapters_finished = 0
+        
+        # Nombre de pages par chapitre, relevé dès l'émission (avant la remise du CBZ)
+        self._page_totals = {}
+        self._complete_chapters = set()
+        self._counts_lock = threading.Lock()
+        
     async def start_download(self, total_images: int):
         """Démarre la progression de téléchargement"""
         task_name = f"📚 {self.manga_name}"
@@ -155,7 +181,8 @@ class TelegramDownloadProgress:
             self.update, 
             total_images, 
             task_name,
-            auto_update_interval=1.5  # Mise à jour plus rapide pour téléchargements
+            auto_update_interval=1.5,  # Mise à jour plus rapide pour téléchargements
+            sender=self.sender
         )
         await self.progress_bar.initialize()
     
@@ -181,6 +208,103 @@ class TelegramDownloadProgress:
             
         await self.progress_bar.complete(final_message)
 
+    def event_callback(self):
+        """
+        Retourne le callback à passer au scraper (progress_callback)
+        
+        Le callback est thread-safe : il transmet les événements à la boucle
+        asyncio, où ils sont appliqués à la barre de progression. Doit être
+        appelé depuis la boucle d'événements.
+        """
+        loop = asyncio.get_running_loop()
+        self._events = asyncio.Queue()
+        self._consumer_task = loop.create_task(self._consume_events())
+        
+        def callback(event):
+            self._record_page_counts(event)
+            loop.call_soon_threadsafe(self._events.put_nowait, event)
+        
+        return callback
+    
+    def _record_page_counts(self, event):
+        """Relève dans le thread du scraper les chapitres terminés avec toutes leurs pages"""
+        chapter = event.get('chapter')
+        with self._counts_lock:
+            if event.get('type') == 'pages_found':
+                self._page_totals[chapter] = event['total']
+            elif event.get('type') == 'cbz_finished':
+                total = self._page_totals.get(chapter)
+                if event.get('success') and total and event.get('pages') == total:
+                    self._complete_chapters.add(chapter)
+                else:
+                    self._complete_chapters.discard(chapter)
+    
+    def is_chapter_complete(self, chapter):
+        """
+        Vrai si le chapitre a été livré avec toutes les pages annoncées par le scraper
+        Utilisable depuis n'importe quel thread, sans attendre la consommation des événements
+        """
+        with self._counts_lock:
+            return chapter in self._complete_chapters
+    
+    async def close_events(self):
+        """Applique les derniers événements reçus puis arrête leur consommation"""
+        if self._consumer_task is None:
+            return
+        # Via la boucle, pour passer après les événements déjà programmés
+        asyncio.get_running_loop().call_soon(self._events.put_nowait, None)
+        await self._consumer_task
+        self._consumer_task = None
+        
+        # Téléchargement interrompu : la barre ne reste pas figée en cours
+        if self.progress_bar and not self.progress_bar.is_complete:
+            await self.complete_download(
+                self.pages_ok, self.progress_bar.total_items, self.bytes_downloaded / (1024 * 1024)
+            )
+    
+    async def _consume_events(self):
+        while True:
+            event = await self._events.get()
+            if event is None:
+                return
+            try:
+                await self.handle_event(event)
+            except Exception:
+                # Une erreur d'affichage n'interrompt pas le suivi
+                pass
+    
+    async def handle_event(self, event: dict):
+        """Applique un événement de progression du scraper (voir AnimeSamaScraper._emit_progress)"""
+        event_type = event.get('type')
+        
+        if event_type == 'pages_found':
+            if self.progress_bar is None:
+                await self.start_download(event['total'])
+            else:
+                # Plusieurs chapitres : le total grandit à chaque chapitre analysé
+                self.progress_bar.total_items += event['total']
+        
+        elif event_type == 'page_done':
+            self.pages_done += 1
+            self.bytes_downloaded += event.get('bytes', 0)
+            if event.get('success'):
+                self.pages_ok += 1
+            page_label = f"Page {event['page']}"
+            if event.get('bytes'):
+                page_label += f" ({event['bytes'] / 1024:.0f} KB)"
+            await self.update_image_progress(self.pages_done, page_label, event.get('success', False))
+        
+        elif event_type == 'cbz_started':
+            if self.progress_bar:
+                await self.progress_bar.update_progress(self.pages_done, "📦 Création du fichier CBZ...")
+        
+        elif event_type == 'cbz_finished':
+            self.chapters_finished += 1
+            if self.progress_bar and self.chapters_finished >= self.total_chapters:
+                await self.complete_download(
+                    self.pages_ok, self.progress_bar.total_items, self.bytes_downloaded / (1024 * 1024)
+                )
+
 def format_clean_message(text: str) -> str:
     """
     Nettoie un message Telegram en retirant les astérisques et en formatant proprement
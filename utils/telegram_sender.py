@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Répartiteur des envois Telegram
+Tous les messages, documents et éditions passent par une file unique, cadencée par
+des seaux à jetons (global et par conversation) calés sur les limites de la Bot API.
+Les RetryAfter sont respectés, les documents passent avant les éditions de progression
+et une édition en attente est remplacée par la plus récente du même message
+"""
+
+import os
+import time
+import asyncio
+import threading
+from contextlib import ExitStack
+from telegram import InputMediaDocument
+from telegram.error import RetryAfter
+from utils.beautiful_progress import BeautifulLogger
+
+# Messages et documents : ordre conservé dans chaque conversation
+PRIORITY_SEND = 0
+# Éditions de progression : après les envois, fusionnées par message
+PRIORITY_EDIT = 1
+# Documents par album (limite de sendMediaGroup)
+MEDIA_GROUP_SIZE = 10
+
+
+class TokenBucket:
+    """
+    Seau à jetons : rate jetons par seconde, au plus capacity d'avance
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now):
+        """Secondes avant qu'un jeton soit disponible (0 si disponible)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now, cost=1):
+        self._refill(now)
+        self.tokens -= cost
+
+    def pause(self, seconds, now):
+        """Vide le seau : aucun jeton avant seconds secondes (RetryAfter)"""
+        self._refill(now)
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+    def is_full(self, now):
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Request:
+    __slots__ = ('priority', 'seq', 'chat_id', 'factory', 'future', 'coalesce_key', 'cost', 'attempts')
+
+    def __init__(self, priority, seq, chat_id, factory, future, coalesce_key, cost):
+        self.priority = priority
+        self.seq = seq
+        self.chat_id = chat_id
+        self.factory = factory
+        self.future = future
+        self.coalesce_key = coalesce_key
+        self.cost = cost
+        self.attempts = 0
+
+    def sort_key(self):
+        return (self.priority, self.seq)
+
+
+class TelegramSender:
+    """
+    File d'envoi unique vers la Bot API
+    Une requête au plus en cours par conversation : les messages arrivent dans l'ordre
+    """
+
+    def __init__(self, global_rate=30.0, global_burst=30, chat_rate=1.0, chat_burst=3,
+                 group_rate=20 / 60, group_burst=3, max_retries=5, max_chat_buckets=10000, verbose=False):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.max_retries = max_retries
+        self.max_chat_buckets = max_chat_buckets
+        self.verbose = verbose
+
+        self._global_bucket = TokenBucket(global_rate, global_burst)
+        self._chat_buckets = {}
+        self._pending = []
+        self._edits = {}  # clé de fusion -> requête en attente
+        self._busy_chats = set()
+        self._seq = 0
+
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+
+        self.sent = 0
+        self.retry_after = 0
+        self.coalesced_edits = 0
+        self.failed = 0
+
+    def _ensure_started(self):
+        """Démarre le répartiteur dans la boucle courante au premier envoi"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and self._loop is loop and not self._task.done():
+            return
+        # Nouvelle boucle (redémarrage) : les requêtes de l'ancienne sont abandonnées
+        self._loop = loop
+        self._pending = []
+        self._edits = {}
+        self._busy_chats = set()
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._dispatch())
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= self.max_chat_buckets:
+                # Conversations inactives : leur seau plein n'apporte aucune information
+                now = time.monotonic()
+                for idle_chat in [c for c, b in self._chat_buckets.items() if b.is_full(now)]:
+                    del self._chat_buckets[idle_chat]
+            # Les groupes (identifiants négatifs) ont une limite par minute
+            if isinstance(chat_id, int) and chat_id < 0:
+                bucket = TokenBucket(self.group_rate, self.group_burst)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    async def submit(self, chat_id, factory, priority=PRIORITY_SEND, coalesce_key=None, cost=1):
+        """
+        Met un appel à la Bot API en file et attend son résultat
+
+        Args:
+            chat_id: Conversation destinataire (seau à jetons et ordre d'envoi)
+            factory (callable): Fonction sans argument retournant la coroutine de l'appel,
+                rappelée après un RetryAfter
+            priority (int): PRIORITY_SEND ou PRIORITY_EDIT
+            coalesce_key: Une requête en attente de même clé est remplacée par celle-ci
+            cost (int): Messages comptés par Telegram pour cet appel (un album en compte plusieurs)
+
+        Returns:
+            Le résultat de l'appel, ou None si une requête plus récente l'a remplacée
+        """
+        self._ensure_started()
+
+        pending = self._edits.get(coalesce_key) if coalesce_key is not None else None
+        if pending is not None:
+            # Seule la dernière édition compte : la précédente n'est jamais envoyée
+            superseded = pending.future
+            pending.factory = factory
+            pending.future = self._loop.create_future()
+            if not superseded.done():
+                superseded.set_result(None)
+            self.coalesced_edits += 1
+            return await pending.future
+
+        self._seq += 1
+        request = _Request(priority, self._seq, chat_id, factory, self._loop.create_future(), coalesce_key, cost)
+        self._pending.append(request)
+        if coalesce_key is not None:
+            self._edits[coalesce_key] = request
+        self._wakeup.set()
+        return await request.future
+
+    def _next_ready(self):
+        """
+        Returns:
+            tuple: (requête à envoyer ou None, délai avant la prochaine possible ou None)
+        """
+        now = time.monotonic()
+        global_delay = self._global_bucket.delay(now)
+        if global_delay > 0:
+            return None, global_delay
+
+        next_delay = None
+        waiting_chats = set()
+        for request in sorted(self._pending, key=_Request.sort_key):
+            chat_id = request.chat_id
+            # Une conversation occupée ou en attente garde ses requêtes suivantes
+            if chat_id in self._busy_chats or chat_id in waiting_chats:
+                continue
+            bucket = self._chat_bucket(chat_id)
+            delay = bucket.delay(now)
+            if delay > 0:
+                waiting_chats.add(chat_id)
+                next_delay = delay if next_delay is None else min(next_delay, delay)
+                continue
+
+            bucket.consume(now, request.cost)
+            self._global_bucket.consume(now, request.cost)
+            self._pending.remove(request)
+            if request.coalesce_key is not None and self._edits.get(request.coalesce_key) is request:
+                del self._edits[request.coalesce_key]
+            return request, 0.0
+        return None, next_delay
+
+    async def _dispatch(self):
+        while True:
+            request, delay = self._next_ready()
+            if request is not None:
+                self._busy_chats.add(request.chat_id)
+                self._loop.create_task(self._run(request))
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, request):
+        try:
+            result = await request.factory()
+        except RetryAfter as e:
+            self.retry_after += 1
+            self._chat_bucket(request.chat_id).pause(float(e.retry_after), time.monotonic())
+            if self.verbose:
+                BeautifulLogger.warning(f"Limite Telegram atteinte, reprise dans {e.retry_after}s")
+            self._retry(request, e)
+        except Exception as e:
+            self.failed += 1
+            if not request.future.done():
+                request.future.set_exception(e)
+        else:
+            self.sent += 1
+            if not request.future.done():
+                request.future.set_result(result)
+        finally:
+            self._busy_chats.discard(request.chat_id)
+            self._wakeup.set()
+
+    def _retry(self, request, error):
+        """Remet une requête limitée en file, à sa place d'origine"""
+        key = request.coalesce_key
+        if key is not None and key in self._edits:
+            # Une édition plus récente du même message attend déjà
+            if not request.future.done():
+                request.future.set_result(None)
+            return
+
+        request.attempts += 1
+        if request.attempts > self.max_retries:
+            self.failed += 1
+            if not request.future.done():
+                request.future.set_exception(error)
+            return
+
+        self._pending.append(request)
+        if key is not None:
+            self._edits[key] = request
+
+    async def reply_text(self, message, text, **kwargs):
+        """message.reply_text() via la file d'envoi"""
+        return await self.submit(_chat_id(message), lambda: message.reply_text(text, **kwargs))
+
+    async def reply_document(self, message, path=None, **kwargs):
+        """
+        message.reply_document() via la file d'envoi
+
+        Args:
+            path (str): Fichier à envoyer, rouvert à chaque tentative ; sinon document=
+                (file_id) est transmis tel quel
+        """
+        if path is None:
+            return await self.submit(_chat_id(message), lambda: message.reply_document(**kwargs))
+
+        async def send_file():
+            with open(path, 'rb') as document:
+                return await message.reply_document(document=document, **kwargs)
+
+        return await self.submit(_chat_id(message), send_file)
+
+    async def reply_media_group(self, message, documents, parse_mode=None, **kwargs):
+        """
+        Envoie plusieurs fichiers en un seul album (sendMediaGroup) via la file d'envoi
+
+        Args:
+            documents (list): Tuples (chemin, nom de fichier, légende), au plus MEDIA_GROUP_SIZE
+            parse_mode: Format des légendes
+
+        Returns:
+            tuple: Un message par document, dans l'ordre
+        """
+        if not 2 <= len(documents) <= MEDIA_GROUP_SIZE:
+            raise ValueError(f"Un album contient de 2 à {MEDIA_GROUP_SIZE} documents")
+
+        async def send_album():
+            # Fichiers rouverts à chaque tentative, comme reply_document()
+            with ExitStack() as stack:
+                media = [
+                    InputMediaDocument(
+                        stack.enter_context(open(path, 'rb')),
+                        filename=filename, caption=caption, parse_mode=parse_mode
+                    )
+                    for path, filename, caption in documents
+                ]
+                return await message.reply_media_group(media=media, **kwargs)
+
+        return await self.submit(_chat_id(message), send_album, cost=len(documents))
+
+    async def edit_text(self, message, text, **kwargs):
+        """message.edit_text() via la file d'envoi, fusionnée avec les éditions en attente"""
+        chat_id = _chat_id(message)
+        return await self.submit(
+            chat_id, lambda: message.edit_text(text, **kwargs),
+            priority=PRIORITY_EDIT, coalesce_key=(chat_id, getattr(message, 'message_id', id(message)))
+        )
+
+    def get_stats(self):
+        """Statistiques d'envoi"""
+        return {
+            'queued': len(self._pending),
+            'sent': self.sent,
+            'retry_after': self.retry_after,
+            'coalesced_edits': self.coalesced_edits,
+            'failed': self.failed,
+        }
+
+
+def _chat_id(message):
+    return getattr(message, 'chat_id', None)
+
+
+_shared_sender = None
+_shared_sender_lock = threading.Lock()
+
+
+def get_shared_telegram_sender():
+    """
+    Retourne le répartiteur d'envois partagé par le bot
+    Configurable via TELEGRAM_GLOBAL_RATE (messages/s, tous chats) et TELEGRAM_CHAT_RATE (messages/s par chat)
+    """
+    global _shared_sender
+    with _shared_sender_lock:
+        if _shared_sender is None:
+            _shared_sender = TelegramSender(
+                global_rate=float(os.getenv('TELEGRAM_GLOBAL_RATE', 30)),
+                chat_rate=float(os.getenv('TELEGRAM_CHAT_RATE', 1))
+            )
+        return _shared_sender
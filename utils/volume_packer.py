@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Découpage des tomes en volumes ZIP compatibles Telegram
+Les CBZ sont stockés sans recompression et répartis en plusieurs archives,
+chacune garantie sous ZipCompressor.TELEGRAM_MAX_SIZE
+"""
+
+import os
+import shutil
+import zipfile
+from utils.beautiful_progress import BeautifulLogger
+from utils.zip_compressor import ZipCompressor
+
+# Tailles fixes des structures ZIP (hors nom de fichier)
+LOCAL_HEADER_SIZE = 30
+CENTRAL_HEADER_SIZE = 46
+END_RECORD_SIZE = 22
+
+# Marge par entrée pour les champs extra (zip64, horodatage) et par archive
+# pour les enregistrements de fin zip64
+ENTRY_EXTRA_MARGIN = 64
+ARCHIVE_MARGIN = 128
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class VolumePacker:
+    """
+    Répartit des fichiers dans des archives ZIP de taille bornée
+    """
+
+    def __init__(self, max_size=ZipCompressor.TELEGRAM_MAX_SIZE, verbose=False):
+        self.max_size = max_size
+        self.verbose = verbose
+
+    @staticmethod
+    def entry_overhead(arcname):
+        """Octets ajoutés par une entrée stockée, en-têtes local et central compris"""
+        name_size = len(arcname.encode('utf-8'))
+        return LOCAL_HEADER_SIZE + CENTRAL_HEADER_SIZE + 2 * name_size + ENTRY_EXTRA_MARGIN
+
+    @property
+    def entry_budget(self):
+        """Octets disponibles pour les entrées d'une archive"""
+        return self.max_size - END_RECORD_SIZE - ARCHIVE_MARGIN
+
+    def plan_volumes(self, entries):
+        """
+        Répartit des entrées dans des volumes, dans l'ordre, sans dépasser la limite
+
+        Args:
+            entries (list): Liste de (arcname, taille, source)
+
+        Returns:
+            list: Volumes, chacun étant une liste d'entrées
+
+        Raises:
+            ValueError: Si une entrée ne tient dans aucun volume
+        """
+        budget = self.entry_budget
+        volumes = []
+        current = []
+        used = 0
+
+        for entry in entries:
+            arcname, size, _ = entry
+            cost = size + self.entry_overhead(arcname)
+            if cost > budget:
+                raise ValueError(f"{arcname} ({size / (1024 * 1024):.1f} MB) dépasse la taille d'un volume")
+
+            if current and used + cost > budget:
+                volumes.append(current)
+                current = []
+                used = 0
+
+            current.append(entry)
+            used += cost
+
+        if current:
+            volumes.append(current)
+        return volumes
+
+    def split_cbz(self, cbz_path, output_dir, max_size):
+        """
+        Découpe un CBZ trop volumineux en plusieurs CBZ, page par page
+
+        Args:
+            cbz_path (str): CBZ source
+            output_dir (str): Répertoire des morceaux
+            max_size (int): Taille maximale d'un morceau
+
+        Returns:
+            list: Chemins des morceaux, dans l'ordre des pages
+        """
+        base_name = os.path.splitext(os.path.basename(cbz_path))[0]
+        page_packer = VolumePacker(max_size=max_size, verbose=self.verbose)
+
+        with zipfile.ZipFile(cbz_path) as source:
+            pages = [(info.filename, info.file_size, info) for info in source.infolist() if not info.is_dir()]
+            volumes = page_packer.plan_volumes(pages)
+
+            piece_paths = []
+            for index, volume in enumerate(volumes, 1):
+                piece_path = os.path.join(output_dir, f"{base_name}_partie_{index}.cbz")
+                with zipfile.ZipFile(piece_path, 'w', zipfile.ZIP_STORED) as piece:
+                    for arcname, _, info in volume:
+                        # Copie en flux : la page n'est jamais entièrement chargée en mémoire
+                        with source.open(info) as src, piece.open(arcname, 'w') as dst:
+                            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                piece_paths.append(piece_path)
+
+        if self.verbose:
+            BeautifulLogger.warning(f"{os.path.basename(cbz_path)} découpé en {len(piece_paths)} morceaux")
+        return piece_paths
+
+    def pack_files(self, file_paths, base_name, output_dir):
+        """
+        Range des fichiers (CBZ) dans des volumes ZIP sous la limite Telegram
+
+        Un CBZ qui dépasse à lui seul la limite est découpé par pages ; un autre
+        fichier trop gros lève ValueError. En cas d'erreur, les volumes et morceaux
+        déjà écrits sont supprimés.
+
+        Args:
+            file_paths (list): Fichiers à ranger, dans l'ordre
+            base_name (str): Nom de base des volumes (sans extension)
+            output_dir (str): Répertoire de sortie
+
+        Returns:
+            list: Un dict par volume {'path', 'part', 'parts', 'size_mb', 'files'}
+
+        Raises:
+            ValueError: Si un fichier ou un volume ne tient pas sous la limite
+        """
+        written = []
+        try:
+            return self._pack_files(file_paths, base_name, output_dir, written)
+        except BaseException:
+            # Aucun volume partiel laissé derrière : l'appelant n'a rien à nettoyer
+            for path in written:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+
+    def _pack_files(self, file_paths, base_name, output_dir, written):
+        """Corps de pack_files() ; chaque fichier créé est ajouté à written"""
+        entries = []
+        for file_path in file_paths:
+            if not os.path.exists(file_path):
+                continue
+
+            arcname = os.path.basename(file_path)
+            size = os.path.getsize(file_path)
+            if size + self.entry_overhead(arcname) <= self.entry_budget or not zipfile.is_zipfile(file_path):
+                entries.append((arcname, size, file_path))
+                continue
+
+            # Le morceau doit lui-même tenir dans un volume avec son en-tête
+            piece_max_size = self.entry_budget - self.entry_overhead(f"{os.path.splitext(arcname)[0]}_partie_999.cbz")
+            for piece_path in self.split_cbz(file_path, output_dir, piece_max_size):
+                written.append(piece_path)
+                entries.append((os.path.basename(piece_path), os.path.getsize(piece_path), piece_path))
+
+        volumes = self.plan_volumes(entries)
+        total_parts = len(volumes)
+        results = []
+
+        for part, volume in enumerate(volumes, 1):
+            if total_parts == 1:
+                volume_name = f"{base_name}.zip"
+            else:
+                volume_name = f"{base_name}_partie_{part}-{total_parts}.zip"
+            volume_path = os.path.join(output_dir, volume_name)
+            written.append(volume_path)
+
+            with zipfile.ZipFile(volume_path, 'w', zipfile.ZIP_STORED) as zip_file:
+                for arcname, _, source_path in volume:
+                    zip_file.write(source_path, arcname)
+
+            volume_size = os.path.getsize(volume_path)
+            if volume_size > self.max_size:
+                # Ne devrait jamais arriver : le plan majore chaque en-tête
+                raise ValueError(f"{volume_name} dépasse la limite ({volume_size} octets)")
+
+            results.append({
+                'path': volume_path,
+                'part': part,
+                'parts': total_parts,
+                'size_mb': volume_size / (1024 * 1024),
+                'files': [arcname for arcname, _, _ in volume],
+            })
+
+            if self.verbose:
+                BeautifulLogger.info(f"Volume {part}/{total_parts}: {len(volume)} fichiers ({volume_size / (1024 * 1024):.1f} MB)", "📦")
+
+        return results
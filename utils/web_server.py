@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Serveur HTTP minimal sur asyncio, dans la boucle d'événements du bot
+Reçoit les mises à jour Telegram (webhook) et répond aux contrôles de santé,
+sans thread ni serveur web externe
+"""
+
+import json
+import hmac
+import asyncio
+from urllib.parse import urlsplit
+from telegram import Update
+from utils.beautiful_progress import BeautifulLogger
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    403: 'Forbidden',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+class HttpRequest:
+    """Requête HTTP reçue : méthode, chemin, en-têtes (en minuscules) et corps"""
+
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body.decode('utf-8'))
+
+
+class WebServer:
+    """
+    Serveur HTTP/1.1 asyncio avec une table de routes
+    Les handlers sont des coroutines handler(request) retournant (statut, corps) ;
+    un corps dict/list est servi en JSON, une chaîne en texte brut
+    """
+
+    MAX_BODY_SIZE = 1024 * 1024
+    IDLE_TIMEOUT = 30.0
+
+    def __init__(self, host='0.0.0.0', port=5000, verbose=False):
+        self.host = host
+        self.port = port
+        self.verbose = verbose
+        self._routes = {}
+        self._server = None
+
+        self.requests = 0
+
+    def route(self, method, path, handler):
+        """Associe une coroutine à une méthode et un chemin exacts"""
+        self._routes[(method.upper(), path)] = handler
+
+    async def start(self):
+        """Ouvre le port d'écoute (port 0 : port libre, relu dans self.port)"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.verbose:
+            BeautifulLogger.success(f"Serveur HTTP à l'écoute sur le port {self.port}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader, writer)
+                if request is None:
+                    break
+                status, body = await self._dispatch(request)
+                keep_alive = request.headers.get('connection', '').lower() != 'close'
+                await self._write_response(writer, status, body, keep_alive, head_only=request.method == 'HEAD')
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader, writer):
+        """
+        Returns:
+            HttpRequest: La requête suivante de la connexion, ou None (fermée ou invalide)
+        """
+        request_line = await asyncio.wait_for(reader.readline(), self.IDLE_TIMEOUT)
+        if not request_line:
+            return None
+        try:
+            method, target, _version = request_line.decode('latin-1').split()
+        except ValueError:
+            await self._write_response(writer, 400, "Requête invalide", False)
+            return None
+
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), self.IDLE_TIMEOUT)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        # Corps à longueur déclarée uniquement (Telegram n'envoie pas de corps découpé)
+        if 'transfer-encoding' in headers:
+            await self._write_response(writer, 411, "Content-Length requis", False)
+            return None
+        raw_length = headers.get('content-length', '0')
+        if not raw_length.isdigit():
+            await self._write_response(writer, 400, "Content-Length invalide", False)
+            return None
+        length = int(raw_length)
+        if length > self.MAX_BODY_SIZE:
+            await self._write_response(writer, 413, "Corps trop volumineux", False)
+            return None
+        body = await asyncio.wait_for(reader.readexactly(length), self.IDLE_TIMEOUT) if length else b''
+
+        url = urlsplit(target)
+        return HttpRequest(method.upper(), url.path, url.query, headers, body)
+
+    async def _dispatch(self, request):
+        self.requests += 1
+        handler = self._routes.get((request.method, request.path))
+        if handler is None:
+            if request.method == 'HEAD':
+                handler = self._routes.get(('GET', request.path))
+            if handler is None:
+                known_path = any(path == request.path for _, path in self._routes)
+                return (405, "Méthode non autorisée") if known_path else (404, "Introuvable")
+        try:
+            return await handler(request)
+        except Exception as e:
+            BeautifulLogger.error(f"Erreur du serveur HTTP sur {request.path}: {e}")
+            return 500, "Erreur interne"
+
+    async def _write_response(self, writer, status, body, keep_alive, head_only=False):
+        if isinstance(body, (dict, list)):
+            payload = json.dumps(body).encode('utf-8')
+            content_type = 'application/json'
+        else:
+            payload = str(body).encode('utf-8')
+            content_type = 'text/plain; charset=utf-8'
+
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + (b'' if head_only else payload))
+        await writer.drain()
+
+
+def telegram_webhook_handler(application, secret_token=None):
+    """
+    Handler de la route webhook : chaque mise à jour est placée dans application.update_queue,
+    traitée par l'Application dans la même boucle que le serveur
+
+    Args:
+        application: Application python-telegram-bot démarrée
+        secret_token (str): Valeur attendue dans l'en-tête X-Telegram-Bot-Api-Secret-Token
+    """
+    async def handle(request):
+        if secret_token:
+            received = request.headers.get('x-telegram-bot-api-secret-token', '')
+            if not hmac.compare_digest(received.encode(), secret_token.encode()):
+                return 403, "Jeton secret invalide"
+        try:
+            update = Update.de_json(request.json(), application.bot)
+        except (ValueError, TypeError, KeyError, AttributeError):
+            update = None
+        if update is None:
+            return 400, "Mise à jour invalide"
+        await application.update_queue.put(update)
+        return 200, "ok"
+
+    return handle
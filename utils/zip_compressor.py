@@ -8,6 +8,7 @@ import os
 import zipfile
 import shutil
 from utils.beautiful_progress import BeautifulLogger
+from utils.compression_policy import compress_type_for_file
 
 
 class ZipCompressor:
@@ -61,7 +62,8 @@ class ZipCompressor:
         try:
             # Créer le fichier ZIP avec compression maximale
             with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=compression_level) as zip_file:
-                zip_file.write(file_path, os.path.basename(file_path))
+                # Un CBZ est déjà un ZIP d'images compressées : stocké sans recompression
+                zip_file.write(file_path, os.path.basename(file_path), compress_type=compress_type_for_file(file_path))
             
             # Calculer la compression
             compressed_size = os.path.getsize(zip_path)
@@ -109,7 +111,7 @@ class ZipCompressor:
                         file_count += 1
                         
                         # Ajouter le fichier au ZIP
-                        zip_file.write(file_path, os.path.basename(file_path))
+                        zip_file.write(file_path, os.path.basename(file_path), compress_type=compress_type_for_file(file_path))
                         BeautifulLogger.info(f"Ajouté: {os.path.basename(file_path)} ({file_size / (1024*1024):.1f} MB)")
             
             # Calculer les statistiques finales